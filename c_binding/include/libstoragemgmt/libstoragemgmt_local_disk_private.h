@@ -0,0 +1,56 @@
+/*
+ * Copyright (C) 2015-2016 Red Hat, Inc.
+ * This library is free software; you can redistribute it and/or
+ * modify it under the terms of the GNU Lesser General Public
+ * License as published by the Free Software Foundation; either
+ * version 2.1 of the License, or (at your option) any later version.
+ *
+ * This library is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+ * Lesser General Public License for more details.
+ *
+ * You should have received a copy of the GNU Lesser General Public
+ * License along with this library; If not, see <http://www.gnu.org/licenses/>.
+ *
+ */
+
+/*
+ * Not installed: internal interface between the C library and the python
+ * binding, could be changed without notice.
+ */
+
+#ifndef LIBSTORAGEMGMT_LOCAL_DISK_PRIVATE_H
+#define LIBSTORAGEMGMT_LOCAL_DISK_PRIVATE_H
+
+#include "libstoragemgmt_common.h"
+#include "libstoragemgmt_types.h"
+#include "libstoragemgmt_error.h"
+
+#ifdef __cplusplus
+extern "C" {
+#endif
+
+/*
+ * Query the VPD83 NAA ID, RPM, link type, serial number and LED status of
+ * given disk path with the disk opened once and each of the SCSI VPD 0x00,
+ * 0x80, 0x83 and 0xb1 pages retrieved once.
+ * The VPD83 NAA ID and serial number are retrieved the same way as
+ * lsm_local_disk_vpd83_get() and lsm_local_disk_serial_num_get().
+ * A property not supported by the disk(LSM_ERR_NO_SUPPORT) is left untouched
+ * in the output, hence the caller should initialize them; 'vpd83' and
+ * 'serial_num' are set to NULL in that case. Memory of 'vpd83' and
+ * 'serial_num' should be freed by free().
+ * Any other error stops the query and is returned.
+ */
+int LSM_DLL_EXPORT _lsm_local_disk_info_get(const char *disk_path,
+                                            char **vpd83, int32_t *rpm,
+                                            lsm_disk_link_type *link_type,
+                                            char **serial_num,
+                                            uint32_t *led_status,
+                                            lsm_error **lsm_err);
+
+#ifdef __cplusplus
+}
+#endif
+#endif                          /* LIBSTORAGEMGMT_LOCAL_DISK_PRIVATE_H */
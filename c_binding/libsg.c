@@ -760,17 +760,32 @@ int _sg_io_send_diag(char *err_msg, int fd, uint8_t *data, uint16_t data_len)
 int _sg_tp_sas_addr_of_disk(char *err_msg, int fd, char *tp_sas_addr)
 {
     int rc = LSM_ERR_OK;
-    struct _sg_t10_vpd83_dp **dps = NULL;
     uint8_t vpd_di_data[_SG_T10_SPC_VPD_MAX_LEN];
+
+    assert(err_msg != NULL);
+    assert(fd >= 0);
+    assert(tp_sas_addr != NULL);
+
+    rc = _sg_io_vpd(err_msg, fd, _SG_T10_SPC_VPD_DI, vpd_di_data);
+    if (rc != LSM_ERR_OK)
+        return rc;
+
+    return _sg_tp_sas_addr_of_vpd83(err_msg, vpd_di_data, tp_sas_addr);
+}
+
+int _sg_tp_sas_addr_of_vpd83(char *err_msg, uint8_t *vpd_di_data,
+                             char *tp_sas_addr)
+{
+    int rc = LSM_ERR_OK;
+    struct _sg_t10_vpd83_dp **dps = NULL;
     uint16_t dp_count = 0;
     uint16_t i = 0;
     struct _sg_t10_vpd83_naa_header *naa_header = NULL;
 
     assert(err_msg != NULL);
-    assert(fd >= 0);
+    assert(vpd_di_data != NULL);
     assert(tp_sas_addr != NULL);
 
-    _good(_sg_io_vpd(err_msg, fd, _SG_T10_SPC_VPD_DI, vpd_di_data), rc, out);
     _good(_sg_parse_vpd_83(err_msg, vpd_di_data, &dps, &dp_count), rc, out);
 
     memset(tp_sas_addr, 0, _SG_T10_SPL_SAS_ADDR_LEN);
@@ -179,6 +179,19 @@ LSM_DLL_LOCAL int _sg_io_open_rw(char *err_msg, const char *disk_path, int *fd);
 LSM_DLL_LOCAL int _sg_tp_sas_addr_of_disk(char *err_msg, int fd,
                                           char *tp_sas_addr);
 
+/*
+ * Same as _sg_tp_sas_addr_of_disk(), but parse already retrieved SCSI Device
+ * Identification VPD page.
+ * Preconditions:
+ *  err_msg != NULL
+ *  vpd_di_data != NULL
+ *  vpd_di_data is uint8_t[_SG_T10_SPC_VPD_MAX_LEN]
+ *  tp_sas_addr != NULL
+ *  tp_sas_addr is char[_SG_T10_SPL_SAS_ADDR_LEN]
+ */
+LSM_DLL_LOCAL int _sg_tp_sas_addr_of_vpd83(char *err_msg, uint8_t *vpd_di_data,
+                                           char *tp_sas_addr);
+
 /*
  * Preconditions:
  *  err_msg != NULL
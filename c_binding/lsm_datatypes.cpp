@@ -254,7 +254,7 @@ static int connection_establish(lsm_connect * c, const char *password,
         params["flags"] = Value(flags);
         Value p(params);
 
-        c->tp->rpc("plugin_register", p);
+        c->tp->registerRpc(p);
     }
     catch(const ValueException & ve) {
         *e = lsm_error_create(LSM_ERR_TRANSPORT_SERIALIZATION,
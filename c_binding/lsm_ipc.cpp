@@ -24,6 +24,7 @@
 #include <errno.h>
 #include <sys/un.h>
 #include <sys/socket.h>
+#include <sys/uio.h>
 #include <string.h>
 #include <iomanip>
 #include <sstream>
@@ -52,63 +53,106 @@ static std::string zero_pad_num(unsigned int num)
     return ss.str();
 }
 
-Transport::Transport():s(-1)
+static std::string binary_hdr(uint64_t num)
+{
+    char buff[Transport::BIN_HDR_LEN];
+
+    for (int i = Transport::BIN_HDR_LEN - 1; i >= 0; --i) {
+        buff[i] = (char) (num & 0xFF);
+        num >>= 8;
+    }
+    return std::string(buff, sizeof(buff));
+}
+
+Transport::Transport():s(-1), binary_frame(false)
 {
 }
 
-Transport::Transport(int socket_desc):s(socket_desc)
+Transport::Transport(int socket_desc):s(socket_desc), binary_frame(false)
 {
 }
 
+void Transport::binaryFrameSet(bool enable)
+{
+    binary_frame = enable;
+}
+
 int Transport::msg_send(const std::string & msg, int &error_code)
 {
     int rc = -1;
     error_code = 0;
 
     if (msg.size() > 0) {
-        ssize_t written = 0;
         //fprintf(stderr, ">>> %s\n", msg.c_str());
-        std::string data = zero_pad_num(msg.size()) + msg;
-        ssize_t msg_size = data.size();
-
-        while (written < msg_size) {
-            int wrote = send(s, data.c_str() + written, (msg_size - written),
-                             MSG_NOSIGNAL); //Prevent SIGPIPE on write
-            if (wrote != -1) {
-                written += wrote;
-            } else {
+        std::string hdr = (binary_frame) ? binary_hdr(msg.size()) :
+            zero_pad_num(msg.size());
+        size_t remaining = hdr.size() + msg.size();
+        struct iovec iov[2];
+        struct msghdr mh;
+
+        /* Header and payload are sent without concatenating them. */
+        iov[0].iov_base = (void *) hdr.data();
+        iov[0].iov_len = hdr.size();
+        iov[1].iov_base = (void *) msg.data();
+        iov[1].iov_len = msg.size();
+        memset(&mh, 0, sizeof(mh));
+        mh.msg_iov = iov;
+        mh.msg_iovlen = 2;
+
+        while (remaining > 0) {
+            ssize_t wrote = sendmsg(s, &mh, MSG_NOSIGNAL);  //Prevent SIGPIPE
+            if (wrote == -1) {
                 error_code = errno;
                 break;
             }
+
+            remaining -= wrote;
+            while (mh.msg_iovlen > 0 &&
+                   (size_t) wrote >= mh.msg_iov[0].iov_len) {
+                wrote -= mh.msg_iov[0].iov_len;
+                mh.msg_iov++;
+                mh.msg_iovlen--;
+            }
+            if (wrote > 0) {
+                mh.msg_iov[0].iov_base =
+                    (char *) mh.msg_iov[0].iov_base + wrote;
+                mh.msg_iov[0].iov_len -= wrote;
+            }
         }
 
-        if ((written == msg_size) && error_code == 0) {
+        if (remaining == 0 && error_code == 0) {
             rc = 0;
         }
     }
     return rc;
 }
 
+/*
+ * The length header comes from the peer, so the buffer is only grown by this
+ * much ahead of the data actually received.
+ */
+#define STRING_READ_CHUNK_MAX (1024 * 1024)
+
 static std::string string_read(int fd, size_t count, int &error_code)
 {
-    char buff[4096];
     size_t amount_read = 0;
-    std::string rc = "";
+    std::string rc;
 
     error_code = 0;
 
     while (amount_read < count) {
-        ssize_t rd = recv(fd, buff, std::min(sizeof(buff),
-                                             (count - amount_read)),
-                          MSG_WAITALL);
+        size_t chunk = std::min((size_t) STRING_READ_CHUNK_MAX,
+                                count - amount_read);
+        rc.resize(amount_read + chunk);
+        ssize_t rd = recv(fd, &rc[amount_read], chunk, MSG_WAITALL);
         if (rd > 0) {
             amount_read += rd;
-            rc += std::string(buff, rd);
         } else {
             error_code = errno;
             break;
         }
     }
+    rc.resize(amount_read);
 
     if ((amount_read == count) && (error_code == 0))
         return rc;
@@ -120,10 +164,17 @@ std::string Transport::msg_recv(int &error_code)
 {
     std::string msg;
     error_code = 0;
-    unsigned long int payload_len = 0;
-    std::string len = string_read(s, HDR_LEN, error_code);  //Read the length
+    uint64_t payload_len = 0;
+    int hdr_len = (binary_frame) ? BIN_HDR_LEN : HDR_LEN;
+    std::string len = string_read(s, hdr_len, error_code);  //Read the length
     if (len.size() && error_code == 0) {
-        payload_len = strtoul(len.c_str(), NULL, 10);
+        if (binary_frame) {
+            for (int i = 0; i < BIN_HDR_LEN; ++i) {
+                payload_len = (payload_len << 8) | (unsigned char) len[i];
+            }
+        } else {
+            payload_len = strtoul(len.c_str(), NULL, 10);
+        }
         if (payload_len < 0x80000000) { /* Should be big enough */
             msg = string_read(s, payload_len, error_code);
         }
@@ -789,15 +840,116 @@ Value Payload::deserialize(const std::string & json)
     return Value();
 }
 
-Ipc::Ipc()
+#define ENCODING_COLUMNAR "columnar"
+#define ENCODING_BINARY_FRAME "binary_frame"
+
+/*
+ * Returns the columnar form of an array of two or more objects of the same
+ * class and keys, else the value unchanged.
+ */
+static Value columnar_encode(Value v)
 {
+    if (Value::array_t != v.valueType()) {
+        return v;
+    }
+
+    std::vector < Value > objs = v.asArray();
+    if (objs.size() < 2) {
+        return v;
+    }
+
+    std::string class_name;
+    std::vector < Value > columns;
+    std::vector < Value > rows;
+
+    for (size_t i = 0; i < objs.size(); ++i) {
+        if (Value::object_t != objs[i].valueType() ||
+            Value::string_t != objs[i].getValue("class").valueType()) {
+            return v;
+        }
+
+        std::map < std::string, Value > obj = objs[i].asObject();
+        std::map < std::string, Value >::iterator iter;
+
+        if (i == 0) {
+            class_name = obj["class"].asString();
+            for (iter = obj.begin(); iter != obj.end(); ++iter) {
+                if (iter->first != "class") {
+                    columns.push_back(Value(iter->first));
+                }
+            }
+        } else if (obj["class"].asString() != class_name ||
+                   obj.size() != columns.size() + 1) {
+            return v;
+        }
+
+        std::vector < Value > row;
+        for (size_t j = 0; j < columns.size(); ++j) {
+            iter = obj.find(columns[j].asString());
+            if (iter == obj.end()) {
+                return v;
+            }
+            row.push_back(iter->second);
+        }
+        rows.push_back(Value(row));
+    }
+
+    std::map < std::string, Value > rc;
+    rc["column_class"] = Value(class_name);
+    rc["columns"] = Value(columns);
+    rc["rows"] = Value(rows);
+    return Value(rc);
 }
 
-Ipc::Ipc(int fd):t(fd)
+/*
+ * Returns the array of objects of the columnar form, else the value
+ * unchanged.
+ */
+static Value columnar_decode(Value v)
+{
+    if (Value::object_t != v.valueType() || !v.hasKey("column_class")) {
+        return v;
+    }
+
+    Value class_name = v["column_class"];
+    std::vector < Value > columns = v["columns"].asArray();
+    std::vector < Value > rows = v["rows"].asArray();
+    std::vector < Value > objs;
+
+    for (size_t i = 0; i < rows.size(); ++i) {
+        std::vector < Value > row = rows[i].asArray();
+        std::map < std::string, Value > obj;
+
+        if (row.size() != columns.size()) {
+            throw ValueException("Columnar row size mismatch");
+        }
+
+        obj["class"] = class_name;
+        for (size_t j = 0; j < columns.size(); ++j) {
+            obj[columns[j].asString()] = row[j];
+        }
+        objs.push_back(Value(obj));
+    }
+    return Value(objs);
+}
+
+Value Ipc::encodingsSupported(void)
+{
+    std::vector < Value > encodings;
+    encodings.push_back(Value(ENCODING_COLUMNAR));
+    encodings.push_back(Value(ENCODING_BINARY_FRAME));
+    return Value(encodings);
+}
+
+Ipc::Ipc():columnar(false)
+{
+}
+
+Ipc::Ipc(int fd):t(fd), columnar(false)
 {
 }
 
-Ipc::Ipc(std::string socket_path)
+Ipc::Ipc(std::string socket_path):columnar(false)
 {
     int e = 0;
     int fd = Transport::socket_get(socket_path, e);
@@ -812,7 +964,7 @@ Ipc::~Ipc()
 }
 
 void Ipc::requestSend(const std::string request, const Value & params,
-                      int32_t id)
+                      int32_t id, const Value & encodings)
 {
     int rc = 0;
     int ec = 0;
@@ -822,6 +974,10 @@ void Ipc::requestSend(const std::string request, const Value & params,
     v["id"] = Value(id);
     v["params"] = params;
 
+    if (Value::null_t != encodings.valueType()) {
+        v["encodings"] = encodings;
+    }
+
     Value req(v);
     rc = t.msg_send(Payload::serialize(req), ec);
 
@@ -865,13 +1021,57 @@ Value Ipc::readRequest(void)
 }
 
 void Ipc::responseSend(const Value & response, uint32_t id)
+{
+    responseMsgSend(response, id, Value());
+}
+
+void Ipc::registerResponseSend(const Value & response, Value & requested,
+                               uint32_t id)
+{
+    std::vector < Value > accepted;
+    bool columnar_accepted = false;
+    bool binary_frame = false;
+
+    if (Value::array_t == requested.valueType()) {
+        std::vector < Value > encodings = requested.asArray();
+
+        for (size_t i = 0; i < encodings.size(); ++i) {
+            if (Value::string_t != encodings[i].valueType()) {
+                continue;
+            }
+            if (encodings[i].asString() == ENCODING_COLUMNAR) {
+                columnar_accepted = true;
+                accepted.push_back(encodings[i]);
+            } else if (encodings[i].asString() == ENCODING_BINARY_FRAME) {
+                binary_frame = true;
+                accepted.push_back(encodings[i]);
+            }
+        }
+    }
+
+    responseMsgSend(response, id, Value(accepted));
+    columnar = columnar_accepted;
+    /* The response above is still sent with the ASCII header. */
+    t.binaryFrameSet(binary_frame);
+}
+
+void Ipc::responseMsgSend(const Value & response, uint32_t id,
+                          const Value & encodings)
 {
     int rc;
     int ec;
     std::map < std::string, Value > v;
 
     v["id"] = id;
-    v["result"] = response;
+    if (columnar) {
+        v["result"] = columnar_encode(response);
+    } else {
+        v["result"] = response;
+    }
+
+    if (Value::null_t != encodings.valueType()) {
+        v["encodings"] = encodings;
+    }
 
     Value resp(v);
     rc = t.msg_send(Payload::serialize(resp), ec);
@@ -884,10 +1084,15 @@ void Ipc::responseSend(const Value & response, uint32_t id)
 }
 
 Value Ipc::responseRead()
+{
+    return columnar_decode(responseMsgRead().getValue("result"));
+}
+
+Value Ipc::responseMsgRead()
 {
     Value r = readRequest();
     if (r.hasKey(std::string("result"))) {
-        return r.getValue("result");
+        return r;
     } else {
         std::map < std::string, Value > rp = r.asObject();
         std::map < std::string, Value > error = rp["error"].asObject();
@@ -903,3 +1108,27 @@ Value Ipc::rpc(const std::string & request, const Value & params, int32_t id)
     requestSend(request, params, id);
     return responseRead();
 }
+
+Value Ipc::registerRpc(const Value & params)
+{
+    requestSend("plugin_register", params, 100, encodingsSupported());
+
+    Value r = responseMsgRead();
+    Value accepted = r.getValue("encodings");
+
+    /*
+     * Older plug-ins do not reply the encodings. Columnar responses are
+     * always decoded, only the framing needs to be switched.
+     */
+    if (Value::array_t == accepted.valueType()) {
+        std::vector < Value > encodings = accepted.asArray();
+
+        for (size_t i = 0; i < encodings.size(); ++i) {
+            if (Value::string_t == encodings[i].valueType() &&
+                encodings[i].asString() == ENCODING_BINARY_FRAME) {
+                t.binaryFrameSet(true);
+            }
+        }
+    }
+    return columnar_decode(r.getValue("result"));
+}
@@ -44,6 +44,12 @@ class LSM_DLL_LOCAL Transport {
      */
     const static int HDR_LEN = 10;
 
+    /**
+     * Size of the binary header, a big endian unsigned 64 bits integer,
+     * used instead once negotiated.
+     */
+    const static int BIN_HDR_LEN = 8;
+
     /**
      * Empty ctor.
      * @return
@@ -92,8 +98,15 @@ class LSM_DLL_LOCAL Transport {
      */
     void close();
 
+    /**
+     * Use the binary length header for the following messages.
+     * @param enable    True for binary header, false for ASCII header
+     */
+    void binaryFrameSet(bool enable);
+
   private:
     int s;                      //Socket descriptor
+    bool binary_frame;          //Binary length header in use
 };
 
 /**
@@ -433,9 +446,11 @@ class LSM_DLL_LOCAL Ipc {
      * @param request       IPC function name
      * @param params        Parameters
      * @param id            Request ID
+     * @param encodings     Encodings requested, array of strings, only sent
+     *                      with plugin_register when not null
      */
     void requestSend(const std::string request, const Value & params,
-                     int32_t id = 100);
+                     int32_t id = 100, const Value & encodings = Value());
     /**
      * Reads a request
      * @returns Value
@@ -449,6 +464,16 @@ class LSM_DLL_LOCAL Ipc {
      */
     void responseSend(const Value & response, uint32_t id = 100);
 
+    /**
+     * Send the response of plugin_register along with the accepted
+     * encodings, which are used for the following responses.
+     * @param response      Response value
+     * @param requested     Encodings requested by the client
+     * @param id            Id that matches request
+     */
+    void registerResponseSend(const Value & response, Value & requested,
+                              uint32_t id = 100);
+
     /**
      * Read a response
      * @return Value of response
@@ -475,9 +500,34 @@ class LSM_DLL_LOCAL Ipc {
     Value rpc(const std::string & request, const Value & params,
               int32_t id = 100);
 
+    /**
+     * Do the plugin_register remote procedure call, negotiating the
+     * optional encodings of the following responses.
+     * @param params            plugin_register parameters
+     * @return Result of the operation.
+     */
+    Value registerRpc(const Value & params);
+
+    /**
+     * Encodings supported, could be requested by client and accepted by
+     * plug-in during plugin_register:
+     * "columnar" sends a response array of two or more objects of the same
+     * class and keys as
+     *   {"column_class": <class>, "columns": [<key>, ...],
+     *    "rows": [[<value>, ...], ...]}
+     * "binary_frame" uses Transport::BIN_HDR_LEN bytes binary length header
+     * in both directions after the plugin_register response.
+     * @return Array of encoding names.
+     */
+    static Value encodingsSupported(void);
 
   private:
     Transport t;
+    bool columnar;              //Columnar encoding of responses negotiated
+
+    void responseMsgSend(const Value & response, uint32_t id,
+                         const Value & encodings);
+    Value responseMsgRead();
 };
 
 #endif
@@ -37,6 +37,7 @@
 #include "libstoragemgmt/libstoragemgmt.h"
 #include "libstoragemgmt/libstoragemgmt_error.h"
 #include "libstoragemgmt/libstoragemgmt_plug_interface.h"
+#include "libstoragemgmt/libstoragemgmt_local_disk_private.h"
 #include "utils.h"
 #include "libsg.h"
 #include "libses.h"
@@ -80,6 +81,35 @@ struct t10_sbc_vpd_bdc {
 
 #pragma pack(pop)
 
+#define _LOCAL_DISK_VPD_PAGE_COUNT 4
+/* ^ VPD pages used by _lsm_local_disk_info_get(): 0x00, 0x80, 0x83, 0xb1 */
+
+struct _local_disk_vpd_page {
+    uint8_t page_code;
+    bool sysfs_done;
+    int sysfs_rc;
+    bool sg_done;
+    int sg_rc;
+    char err_msg[_LSM_ERR_MSG_LEN];
+    uint8_t data[_SG_T10_SPC_VPD_MAX_LEN];
+};
+
+/*
+ * State of _lsm_local_disk_info_get(): the disk is opened at most once and
+ * every VPD page is retrieved at most once, no matter how many properties
+ * are parsed out of it.
+ */
+struct _local_disk_query {
+    const char *disk_path;
+    const char *sd_name;
+    /* ^ NULL if disk_path is not a SCSI disk */
+    int fd;
+    bool open_done;
+    int open_rc;
+    char open_err_msg[_LSM_ERR_MSG_LEN];
+    struct _local_disk_vpd_page pages[_LOCAL_DISK_VPD_PAGE_COUNT];
+};
+
 static int _sysfs_serial_num_of_sd_name(char *err_msg,
                                         const char *sd_name,
                                         uint8_t *serial_num);
@@ -91,6 +121,23 @@ static int _udev_vpd83_of_sd_name(char *err_msg, const char *sd_name,
                                   char *vpd83);
 static int _sysfs_vpd_pg83_data_get(char *err_msg, const char *sd_name,
                                     uint8_t *vpd_data, ssize_t *read_size);
+
+/*
+ * Parsers of VPD page data shared by the single property queries and
+ * _lsm_local_disk_info_get().
+ * No argument checker here, assume all non-NULL and vpd_data is
+ * uint8_t[_SG_T10_SPC_VPD_MAX_LEN].
+ */
+static int _vpd83_naa_parse(char *err_msg, uint8_t *vpd_data, char *vpd83);
+static int _serial_num_parse(char *err_msg, uint8_t *vpd_data,
+                             uint8_t *serial_num);
+static int _serial_num_dup(char *err_msg, uint8_t *tmp_serial_num,
+                           char **serial_num);
+static int _rpm_parse(char *err_msg, uint8_t *vpd_data, int32_t *rpm);
+static int _link_type_of_vpd83(char *err_msg, uint8_t *vpd_di_data,
+                               lsm_disk_link_type *link_type);
+static int _led_status_of_sas_addr(char *err_msg, const char *tp_sas_addr,
+                                   uint32_t *led_status);
 /*
  * Use /sys/block/sdx/device/sas_address to retrieve sas address of certain
  * disk.
@@ -226,24 +273,33 @@ static int _sysfs_vpd83_naa_of_sd_name(char *err_msg, const char *sd_name,
                                        char *vpd83)
 {
     ssize_t read_size = 0;
-    struct _sg_t10_vpd83_naa_header *naa_header = NULL;
     int rc = LSM_ERR_OK;
     uint8_t vpd_data[_SG_T10_SPC_VPD_MAX_LEN];
-    struct _sg_t10_vpd83_dp **dps = NULL;
-    uint16_t dp_count = 0;
-    uint16_t i = 0;
 
     memset(vpd83, 0, _LSM_MAX_VPD83_ID_LEN);
 
     if (sd_name == NULL) {
         _lsm_err_msg_set(err_msg, "_sysfs_vpd83_naa_of_sd_name(): "
                          "Input sd_name argument is NULL");
-        rc = LSM_ERR_LIB_BUG;
-        goto out;
+        return LSM_ERR_LIB_BUG;
     }
 
-    _good(_sysfs_vpd_pg83_data_get(err_msg, sd_name, vpd_data, &read_size),
-          rc, out);
+    rc = _sysfs_vpd_pg83_data_get(err_msg, sd_name, vpd_data, &read_size);
+    if (rc != LSM_ERR_OK)
+        return rc;
+
+    return _vpd83_naa_parse(err_msg, vpd_data, vpd83);
+}
+
+static int _vpd83_naa_parse(char *err_msg, uint8_t *vpd_data, char *vpd83)
+{
+    struct _sg_t10_vpd83_naa_header *naa_header = NULL;
+    int rc = LSM_ERR_OK;
+    struct _sg_t10_vpd83_dp **dps = NULL;
+    uint16_t dp_count = 0;
+    uint16_t i = 0;
+
+    memset(vpd83, 0, _LSM_MAX_VPD83_ID_LEN);
 
     _good(_sg_parse_vpd_83(err_msg, vpd_data, &dps, &dp_count), rc, out);
 
@@ -315,19 +371,58 @@ static int _sysfs_serial_num_of_sd_name(char *err_msg,
     _good(_sysfs_vpd_pg80_data_get(err_msg, sd_name, vpd_data, &read_size),
           rc, out);
 
-    _good(_sg_parse_vpd_80(err_msg, vpd_data, serial_num,
-                           _LSM_MAX_SERIAL_NUM_LEN), rc, out);
+    rc = _serial_num_parse(err_msg, vpd_data, serial_num);
+
+ out:
+    return rc;
+}
+
+static int _serial_num_parse(char *err_msg, uint8_t *vpd_data,
+                             uint8_t *serial_num)
+{
+    int rc = LSM_ERR_OK;
+
+    rc = _sg_parse_vpd_80(err_msg, vpd_data, serial_num,
+                          _LSM_MAX_SERIAL_NUM_LEN);
+    if (rc != LSM_ERR_OK)
+        return rc;
 
     if (serial_num[0] == '\0') {
         rc = LSM_ERR_NO_SUPPORT;
         _lsm_err_msg_set(err_msg,
                          "SCSI VPD 80 serial number is not supported");
     }
-
- out:
     return rc;
 }
 
+static int _serial_num_dup(char *err_msg, uint8_t *tmp_serial_num,
+                           char **serial_num)
+{
+    char *trimmed_serial_num = NULL;
+
+    if (tmp_serial_num[0] == '\0') {
+        _lsm_err_msg_set(err_msg, "no characters in vpd80 serial "
+                         "number field");
+        return LSM_ERR_NO_SUPPORT;
+    }
+
+    //ensure that the string being trimmed is NULL terminated
+    tmp_serial_num[_LSM_MAX_SERIAL_NUM_LEN - 1] = '\0';
+
+    trimmed_serial_num = _trim_spaces((char *) tmp_serial_num);
+    if (trimmed_serial_num == NULL) {
+        _lsm_err_msg_set(err_msg, "failed to trim vpd80 "
+                         "serial number field");
+        return LSM_ERR_NO_SUPPORT;
+    }
+
+    *serial_num = strdup(trimmed_serial_num);
+    if (*serial_num == NULL)
+        return LSM_ERR_NO_MEMORY;
+
+    return LSM_ERR_OK;
+}
+
 /*
  * Try to parse /sys/block/sda/device/vpd_pg83 for VPD83 NAA ID first.
  * This sysfs file is missing in some older kernel(like RHEL6), we use udev
@@ -492,7 +587,6 @@ int lsm_local_disk_serial_num_get(const char *disk_path, char **serial_num,
                                   lsm_error **lsm_err)
 {
     uint8_t tmp_serial_num[_LSM_MAX_SERIAL_NUM_LEN];
-    char *trimmed_serial_num = NULL;
     const char *sd_name = NULL;
     int rc = LSM_ERR_OK;
     char err_msg[_LSM_ERR_MSG_LEN];
@@ -531,26 +625,7 @@ int lsm_local_disk_serial_num_get(const char *disk_path, char **serial_num,
     if (rc != LSM_ERR_OK)
         goto out;
 
-    if (tmp_serial_num[0] != '\0') {
-        //ensure that the string being trimmed is NULL terminated
-        tmp_serial_num[_LSM_MAX_SERIAL_NUM_LEN - 1] = '\0';
-
-        trimmed_serial_num = _trim_spaces((char *) tmp_serial_num);
-        if (trimmed_serial_num == NULL) {
-            rc = LSM_ERR_NO_SUPPORT;
-            _lsm_err_msg_set(err_msg, "failed to trim vpd80 "
-                             "serial number field");
-            goto out;
-        }
-
-        *serial_num = strdup(trimmed_serial_num);
-        if (*serial_num == NULL)
-            rc = LSM_ERR_NO_MEMORY;
-    } else {
-        rc = LSM_ERR_NO_SUPPORT;
-        _lsm_err_msg_set(err_msg, "no characters in vpd80 serial "
-                         "number field");
-    }
+    rc = _serial_num_dup(err_msg, tmp_serial_num, serial_num);
 
  out:
     if (rc != LSM_ERR_OK) {
@@ -638,7 +713,6 @@ int lsm_local_disk_rpm_get(const char *disk_path, int32_t *rpm,
     int fd = -1;
     char err_msg[_LSM_ERR_MSG_LEN];
     int rc = LSM_ERR_OK;
-    struct t10_sbc_vpd_bdc *bdc = NULL;
 
     rc = _check_null_ptr(err_msg, 3 /* arg_count */, disk_path, rpm, lsm_err);
     if (rc != LSM_ERR_OK) {
@@ -651,23 +725,7 @@ int lsm_local_disk_rpm_get(const char *disk_path, int32_t *rpm,
     _good(_sg_io_vpd(err_msg, fd, _SG_T10_SBC_VPD_BLK_DEV_CHA,  vpd_data),
           rc, out);
 
-    bdc = (struct t10_sbc_vpd_bdc *) vpd_data;
-    if (bdc->pg_code != _SG_T10_SBC_VPD_BLK_DEV_CHA) {
-        rc = LSM_ERR_LIB_BUG;
-        _lsm_err_msg_set(err_msg, "Got corrupted SCSI SBC "
-                         "Device Characteristics VPD page, expected page code "
-                         "is %d but got %" PRIu8 "",
-                         _SG_T10_SBC_VPD_BLK_DEV_CHA, bdc->pg_code);
-        goto out;
-    }
-
-    *rpm = be16toh(bdc->medium_rotation_rate_be);
-    if (((*rpm >= 2) && (*rpm <= 0x400)) || (*rpm == 0xffff) ||
-        (*rpm == _SG_T10_SBC_MEDIUM_ROTATION_NO_SUPPORT))
-        *rpm = LSM_DISK_RPM_NO_SUPPORT;
-
-    if (*rpm == _SG_T10_SBC_MEDIUM_ROTATION_SSD)
-        *rpm = LSM_DISK_RPM_NON_ROTATING_MEDIUM;
+    rc = _rpm_parse(err_msg, vpd_data, rpm);
 
  out:
     if (fd >= 0)
@@ -818,10 +876,6 @@ int lsm_local_disk_link_type_get(const char *disk_path,
     int fd = -1;
     char err_msg[_LSM_ERR_MSG_LEN];
     int rc = LSM_ERR_OK;
-    struct _sg_t10_vpd83_dp **dps = NULL;
-    uint16_t dp_count = 0;
-    uint8_t protocol_id = _SG_T10_SPC_PROTOCOL_ID_OBSOLETE;
-    uint16_t i = 0;
 
     _lsm_err_msg_clear(err_msg);
 
@@ -844,31 +898,12 @@ int lsm_local_disk_link_type_get(const char *disk_path,
 
     _good(_sg_io_vpd(err_msg, fd, _SG_T10_SPC_VPD_DI, vpd_di_data), rc, out);
 
-    _good(_sg_parse_vpd_83(err_msg, vpd_di_data, &dps, &dp_count), rc, out);
-
-    for (; i < dp_count; ++i) {
-        if ((dps[i]->header.association != _SG_T10_SPC_ASSOCIATION_TGT_PORT) ||
-            (dps[i]->header.piv != 1))
-            continue;
-        protocol_id = dps[i]->header.protocol_id;
-        if ((protocol_id == _SG_T10_SPC_PROTOCOL_ID_OBSOLETE) ||
-            (protocol_id >= _SG_T10_SPC_PROTOCOL_ID_RESERVED)) {
-            rc = LSM_ERR_LIB_BUG;
-            _lsm_err_msg_set(err_msg, "Got unknown protocol ID: %02x",
-                             protocol_id);
-            goto out;
-        }
-        *link_type = protocol_id;
-        break;
-    }
+    rc = _link_type_of_vpd83(err_msg, vpd_di_data, link_type);
 
  out:
     if (fd >= 0)
         close(fd);
 
-    if (dps != NULL)
-        _sg_t10_vpd83_dp_array_free(dps, dp_count);
-
     if (rc != LSM_ERR_OK) {
         if (lsm_err != NULL)
             *lsm_err = LSM_ERROR_CREATE_PLUGIN_MSG(rc, err_msg);
@@ -1009,7 +1044,6 @@ int LSM_DLL_EXPORT lsm_local_disk_led_status_get(const char *disk_path,
     int rc = LSM_ERR_OK;
     char err_msg[_LSM_ERR_MSG_LEN];
     char tp_sas_addr[_SG_T10_SPL_SAS_ADDR_LEN];
-    struct _ses_dev_slot_status status;
 
     _lsm_err_msg_clear(err_msg);
 
@@ -1019,7 +1053,86 @@ int LSM_DLL_EXPORT lsm_local_disk_led_status_get(const char *disk_path,
 
     _good(_sas_addr_get(err_msg, disk_path, tp_sas_addr), rc, out);
 
-    _good(_ses_status_get(err_msg, tp_sas_addr, &status), rc, out);
+    rc = _led_status_of_sas_addr(err_msg, tp_sas_addr, led_status);
+
+ out:
+    if (rc != LSM_ERR_OK) {
+        if (led_status != NULL)
+            *led_status = LSM_DISK_LED_STATUS_UNKNOWN;
+        if (lsm_err != NULL)
+            *lsm_err = LSM_ERROR_CREATE_PLUGIN_MSG(rc, err_msg);
+    }
+    return rc;
+}
+
+
+static int _rpm_parse(char *err_msg, uint8_t *vpd_data, int32_t *rpm)
+{
+    struct t10_sbc_vpd_bdc *bdc = NULL;
+
+    bdc = (struct t10_sbc_vpd_bdc *) vpd_data;
+    if (bdc->pg_code != _SG_T10_SBC_VPD_BLK_DEV_CHA) {
+        _lsm_err_msg_set(err_msg, "Got corrupted SCSI SBC "
+                         "Device Characteristics VPD page, expected page code "
+                         "is %d but got %" PRIu8 "",
+                         _SG_T10_SBC_VPD_BLK_DEV_CHA, bdc->pg_code);
+        return LSM_ERR_LIB_BUG;
+    }
+
+    *rpm = be16toh(bdc->medium_rotation_rate_be);
+    if (((*rpm >= 2) && (*rpm <= 0x400)) || (*rpm == 0xffff) ||
+        (*rpm == _SG_T10_SBC_MEDIUM_ROTATION_NO_SUPPORT))
+        *rpm = LSM_DISK_RPM_NO_SUPPORT;
+
+    if (*rpm == _SG_T10_SBC_MEDIUM_ROTATION_SSD)
+        *rpm = LSM_DISK_RPM_NON_ROTATING_MEDIUM;
+
+    return LSM_ERR_OK;
+}
+
+static int _link_type_of_vpd83(char *err_msg, uint8_t *vpd_di_data,
+                               lsm_disk_link_type *link_type)
+{
+    int rc = LSM_ERR_OK;
+    struct _sg_t10_vpd83_dp **dps = NULL;
+    uint16_t dp_count = 0;
+    uint8_t protocol_id = _SG_T10_SPC_PROTOCOL_ID_OBSOLETE;
+    uint16_t i = 0;
+
+    _good(_sg_parse_vpd_83(err_msg, vpd_di_data, &dps, &dp_count), rc, out);
+
+    for (; i < dp_count; ++i) {
+        if ((dps[i]->header.association != _SG_T10_SPC_ASSOCIATION_TGT_PORT) ||
+            (dps[i]->header.piv != 1))
+            continue;
+        protocol_id = dps[i]->header.protocol_id;
+        if ((protocol_id == _SG_T10_SPC_PROTOCOL_ID_OBSOLETE) ||
+            (protocol_id >= _SG_T10_SPC_PROTOCOL_ID_RESERVED)) {
+            rc = LSM_ERR_LIB_BUG;
+            _lsm_err_msg_set(err_msg, "Got unknown protocol ID: %02x",
+                             protocol_id);
+            goto out;
+        }
+        *link_type = protocol_id;
+        break;
+    }
+
+ out:
+    if (dps != NULL)
+        _sg_t10_vpd83_dp_array_free(dps, dp_count);
+
+    return rc;
+}
+
+static int _led_status_of_sas_addr(char *err_msg, const char *tp_sas_addr,
+                                   uint32_t *led_status)
+{
+    int rc = LSM_ERR_OK;
+    struct _ses_dev_slot_status status;
+
+    rc = _ses_status_get(err_msg, tp_sas_addr, &status);
+    if (rc != LSM_ERR_OK)
+        return rc;
 
     *led_status = 0;
 
@@ -1033,12 +1146,299 @@ int LSM_DLL_EXPORT lsm_local_disk_led_status_get(const char *disk_path,
     else
         *led_status |= LSM_DISK_LED_STATUS_IDENT_OFF;
 
+    return LSM_ERR_OK;
+}
+
+static int _ldq_fd_get(char *err_msg, struct _local_disk_query *q)
+{
+    if (! q->open_done) {
+        q->open_rc = _sg_io_open_ro(q->open_err_msg, q->disk_path, &q->fd);
+        q->open_done = true;
+    }
+    if (q->open_rc != LSM_ERR_OK)
+        memcpy(err_msg, q->open_err_msg, _LSM_ERR_MSG_LEN);
+    return q->open_rc;
+}
+
+/*
+ * Store the pointer to the data of requested VPD page into 'data'.
+ * Like the single property queries, the unit serial number and device
+ * identification pages are read from sysfs for SCSI disks. With 'sysfs_only'
+ * set to false, SG_IO is used when sysfs does not provide the page.
+ * The outcome of each retrieval is cached in 'q', including failures.
+ */
+static int _ldq_vpd_get(char *err_msg, struct _local_disk_query *q,
+                        uint8_t page_code, bool sysfs_only, uint8_t **data)
+{
+    struct _local_disk_vpd_page *page = NULL;
+    ssize_t read_size = 0;
+    uint8_t i = 0;
+
+    for (; i < _LOCAL_DISK_VPD_PAGE_COUNT; ++i) {
+        if (q->pages[i].page_code == page_code) {
+            page = &q->pages[i];
+            break;
+        }
+    }
+    assert(page != NULL);
+    *data = page->data;
+
+    if ((q->sd_name != NULL) && (! page->sysfs_done)) {
+        if (page_code == _SG_T10_SPC_VPD_UNIT_SN) {
+            page->sysfs_rc = _sysfs_vpd_pg80_data_get(page->err_msg,
+                                                      q->sd_name, page->data,
+                                                      &read_size);
+            page->sysfs_done = true;
+        } else if (page_code == _SG_T10_SPC_VPD_DI) {
+            page->sysfs_rc = _sysfs_vpd_pg83_data_get(page->err_msg,
+                                                      q->sd_name, page->data,
+                                                      &read_size);
+            page->sysfs_done = true;
+        }
+    }
+
+    if (page->sysfs_done) {
+        if ((page->sysfs_rc == LSM_ERR_OK) || sysfs_only) {
+            if (page->sysfs_rc != LSM_ERR_OK)
+                memcpy(err_msg, page->err_msg, _LSM_ERR_MSG_LEN);
+            return page->sysfs_rc;
+        }
+    } else if (sysfs_only) {
+        _lsm_err_msg_set(err_msg, "VPD 0x%02x page is not available in sysfs "
+                         "for disk %s", page_code, q->disk_path);
+        return LSM_ERR_NO_SUPPORT;
+    }
+
+    if (! page->sg_done) {
+        page->sg_rc = _ldq_fd_get(page->err_msg, q);
+        if (page->sg_rc == LSM_ERR_OK)
+            page->sg_rc = _sg_io_vpd(page->err_msg, q->fd, page_code,
+                                     page->data);
+        page->sg_done = true;
+    }
+    if (page->sg_rc != LSM_ERR_OK)
+        memcpy(err_msg, page->err_msg, _LSM_ERR_MSG_LEN);
+    return page->sg_rc;
+}
+
+static int _ldq_vpd83_get(char *err_msg, struct _local_disk_query *q,
+                          char *vpd83)
+{
+    int rc = LSM_ERR_OK;
+    uint8_t *vpd_data = NULL;
+
+    memset(vpd83, 0, _LSM_MAX_VPD83_ID_LEN);
+
+    if (q->sd_name == NULL) {
+        _lsm_err_msg_set(err_msg, "Only support disk path start with "
+                         "'/dev/sd' yet");
+        return LSM_ERR_NO_SUPPORT;
+    }
+
+    rc = _ldq_vpd_get(err_msg, q, _SG_T10_SPC_VPD_DI, true, &vpd_data);
+    if (rc == LSM_ERR_OK)
+        rc = _vpd83_naa_parse(err_msg, vpd_data, vpd83);
+
+    if (rc == LSM_ERR_NO_SUPPORT)
+        /* Try udev if kernel does not expose vpd83 */
+        rc = _udev_vpd83_of_sd_name(err_msg, q->sd_name, vpd83);
+
+    return rc;
+}
+
+static int _ldq_serial_num_get(char *err_msg, struct _local_disk_query *q,
+                               char **serial_num)
+{
+    uint8_t tmp_serial_num[_LSM_MAX_SERIAL_NUM_LEN];
+    int rc = LSM_ERR_OK;
+    uint8_t *vpd_data = NULL;
+
+    if (q->sd_name == NULL) {
+        _lsm_err_msg_set(err_msg, "we only support disk path start with "
+                         "'/dev/sd' today");
+        return LSM_ERR_NO_SUPPORT;
+    }
+
+    _good(_ldq_vpd_get(err_msg, q, _SG_T10_SPC_VPD_UNIT_SN, true, &vpd_data),
+          rc, out);
+    _good(_serial_num_parse(err_msg, vpd_data, tmp_serial_num), rc, out);
+    rc = _serial_num_dup(err_msg, tmp_serial_num, serial_num);
+
+ out:
+    return rc;
+}
+
+static int _ldq_rpm_get(char *err_msg, struct _local_disk_query *q,
+                        int32_t *rpm)
+{
+    int rc = LSM_ERR_OK;
+    uint8_t *vpd_data = NULL;
+
+    rc = _ldq_vpd_get(err_msg, q, _SG_T10_SBC_VPD_BLK_DEV_CHA, false,
+                      &vpd_data);
+    if (rc != LSM_ERR_OK)
+        return rc;
+
+    return _rpm_parse(err_msg, vpd_data, rpm);
+}
+
+static int _ldq_link_type_get(char *err_msg, struct _local_disk_query *q,
+                              lsm_disk_link_type *link_type)
+{
+    int rc = LSM_ERR_OK;
+    uint8_t *vpd_sup_data = NULL;
+    uint8_t *vpd_di_data = NULL;
+
+    rc = _ldq_vpd_get(err_msg, q, _SG_T10_SPC_VPD_SUP_VPD_PGS, false,
+                      &vpd_sup_data);
+    if (rc != LSM_ERR_OK)
+        return rc;
+
+    /* See lsm_local_disk_link_type_get() for the workflow */
+    if (_sg_is_vpd_page_supported(vpd_sup_data,
+                                  _SG_T10_SPC_VPD_ATA_INFO) == true) {
+        *link_type = LSM_DISK_LINK_TYPE_ATA;
+        return LSM_ERR_OK;
+    }
+
+    rc = _ldq_vpd_get(err_msg, q, _SG_T10_SPC_VPD_DI, false, &vpd_di_data);
+    if (rc != LSM_ERR_OK)
+        return rc;
+
+    *link_type = LSM_DISK_LINK_TYPE_NO_SUPPORT;
+    return _link_type_of_vpd83(err_msg, vpd_di_data, link_type);
+}
+
+static int _ldq_led_status_get(char *err_msg, struct _local_disk_query *q,
+                               uint32_t *led_status)
+{
+    int rc = LSM_ERR_OK;
+    char tp_sas_addr[_SG_T10_SPL_SAS_ADDR_LEN];
+    uint8_t *vpd_di_data = NULL;
+
+    memset(tp_sas_addr, 0, _SG_T10_SPL_SAS_ADDR_LEN);
+
+    if (q->sd_name != NULL)
+        _sysfs_sas_addr_get(q->sd_name, tp_sas_addr);
+
+    if (tp_sas_addr[0] == '\0') {
+        _good(_ldq_vpd_get(err_msg, q, _SG_T10_SPC_VPD_DI, false, &vpd_di_data),
+              rc, out);
+        _good(_sg_tp_sas_addr_of_vpd83(err_msg, vpd_di_data, tp_sas_addr),
+              rc, out);
+    }
+
+    rc = _led_status_of_sas_addr(err_msg, tp_sas_addr, led_status);
+
  out:
+    return rc;
+}
+
+int _lsm_local_disk_info_get(const char *disk_path, char **vpd83,
+                             int32_t *rpm, lsm_disk_link_type *link_type,
+                             char **serial_num, uint32_t *led_status,
+                             lsm_error **lsm_err)
+{
+    int rc = LSM_ERR_OK;
+    char err_msg[_LSM_ERR_MSG_LEN];
+    char tmp_vpd83[_LSM_MAX_VPD83_ID_LEN];
+    int32_t tmp_rpm = LSM_DISK_RPM_UNKNOWN;
+    lsm_disk_link_type tmp_link_type = LSM_DISK_LINK_TYPE_UNKNOWN;
+    uint32_t tmp_led_status = LSM_DISK_LED_STATUS_UNKNOWN;
+    struct _local_disk_query *q = NULL;
+    const uint8_t page_codes[_LOCAL_DISK_VPD_PAGE_COUNT] = {
+        _SG_T10_SPC_VPD_SUP_VPD_PGS, _SG_T10_SPC_VPD_UNIT_SN,
+        _SG_T10_SPC_VPD_DI, _SG_T10_SBC_VPD_BLK_DEV_CHA,
+    };
+    uint8_t i = 0;
+
+    _lsm_err_msg_clear(err_msg);
+
+    rc = _check_null_ptr(err_msg, 7 /* arg_count */, disk_path, vpd83, rpm,
+                         link_type, serial_num, led_status, lsm_err);
+    if (rc != LSM_ERR_OK) {
+        if (vpd83 != NULL)
+            *vpd83 = NULL;
+        if (serial_num != NULL)
+            *serial_num = NULL;
+        goto out;
+    }
+
+    *vpd83 = NULL;
+    *serial_num = NULL;
+    *lsm_err = NULL;
+
+    if (! _file_exists(disk_path)) {
+        rc = LSM_ERR_NOT_FOUND_DISK;
+        _lsm_err_msg_set(err_msg, "Disk %s not found", disk_path);
+        goto out;
+    }
+
+    q = (struct _local_disk_query *) calloc(1, sizeof(struct _local_disk_query));
+    if (q == NULL) {
+        rc = LSM_ERR_NO_MEMORY;
+        goto out;
+    }
+    q->disk_path = disk_path;
+    q->fd = -1;
+    if (strncmp(disk_path, "/dev/sd", strlen("/dev/sd")) == 0)
+        q->sd_name = disk_path + strlen("/dev/");
+    for (; i < _LOCAL_DISK_VPD_PAGE_COUNT; ++i)
+        q->pages[i].page_code = page_codes[i];
+
+    /* Each property not supported by the disk is left untouched. */
+    rc = _ldq_vpd83_get(err_msg, q, tmp_vpd83);
+    if ((rc == LSM_ERR_OK) && (tmp_vpd83[0] != '\0')) {
+        *vpd83 = strdup(tmp_vpd83);
+        if (*vpd83 == NULL)
+            rc = LSM_ERR_NO_MEMORY;
+    }
+    if ((rc != LSM_ERR_OK) && (rc != LSM_ERR_NO_SUPPORT))
+        goto out;
+
+    rc = _ldq_rpm_get(err_msg, q, &tmp_rpm);
+    if (rc == LSM_ERR_OK)
+        *rpm = tmp_rpm;
+    else if (rc != LSM_ERR_NO_SUPPORT)
+        goto out;
+
+    rc = _ldq_link_type_get(err_msg, q, &tmp_link_type);
+    if (rc == LSM_ERR_OK)
+        *link_type = tmp_link_type;
+    else if (rc != LSM_ERR_NO_SUPPORT)
+        goto out;
+
+    rc = _ldq_serial_num_get(err_msg, q, serial_num);
+    if ((rc != LSM_ERR_OK) && (rc != LSM_ERR_NO_SUPPORT))
+        goto out;
+
+    rc = _ldq_led_status_get(err_msg, q, &tmp_led_status);
+    if (rc == LSM_ERR_OK)
+        *led_status = tmp_led_status;
+    else if (rc != LSM_ERR_NO_SUPPORT)
+        goto out;
+
+    rc = LSM_ERR_OK;
+
+ out:
+    if (q != NULL) {
+        if (q->fd >= 0)
+            close(q->fd);
+        free(q);
+    }
+
     if (rc != LSM_ERR_OK) {
-        if (led_status != NULL)
-            *led_status = LSM_DISK_LED_STATUS_UNKNOWN;
         if (lsm_err != NULL)
             *lsm_err = LSM_ERROR_CREATE_PLUGIN_MSG(rc, err_msg);
+        if (vpd83 != NULL) {
+            free(*vpd83);
+            *vpd83 = NULL;
+        }
+        if (serial_num != NULL) {
+            free(*serial_num);
+            *serial_num = NULL;
+        }
     }
+
     return rc;
 }
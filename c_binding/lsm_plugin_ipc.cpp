@@ -2558,7 +2558,13 @@ static int lsm_plugin_run(lsm_plugin_ptr p)
                     rc = process_request(p, method, req, resp);
 
                     if (LSM_ERR_OK == rc || LSM_ERR_JOB_STARTED == rc) {
-                        p->tp->responseSend(resp);
+                        if (method == "plugin_register" &&
+                            req.hasKey("encodings")) {
+                            p->tp->registerResponseSend(resp,
+                                                        req["encodings"]);
+                        } else {
+                            p->tp->responseSend(resp);
+                        }
                     } else {
                         error_send(p, rc);
                     }
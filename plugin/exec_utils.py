@@ -0,0 +1,306 @@
+# Copyright (C) 2016 Red Hat, Inc.
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; If not, see <http://www.gnu.org/licenses/>.
+
+import codecs
+import collections
+import errno
+import io
+import locale
+import os
+import select
+import subprocess
+import time
+
+# Size of each os.read() on the command pipes.
+_CHUNK_SIZE = 65536
+
+# Only the most recent executions are kept for profiling.
+_STATS_MAX = 256
+
+_EXEC_STATS = collections.deque(maxlen=_STATS_MAX)
+
+_POLL_IN = select.POLLIN | select.POLLPRI
+
+
+class ExecError(Exception):
+    def __init__(self, cmd, errno, stdout, stderr, *args, **kwargs):
+        Exception.__init__(self, *args, **kwargs)
+        self.cmd = cmd
+        self.errno = errno
+        self.stdout = stdout
+        self.stderr = stderr
+
+    def __str__(self):
+        return "cmd: '%s', errno: %d, stdout: '%s', stderr: '%s'" % \
+            (self.cmd, self.errno, self.stdout, self.stderr)
+
+
+class ExecTimeout(ExecError):
+    def __init__(self, cmd, timeout, stdout, stderr, *args, **kwargs):
+        ExecError.__init__(self, cmd, -1, stdout, stderr, *args, **kwargs)
+        self.timeout = timeout
+
+    def __str__(self):
+        return "cmd: '%s', timeout after %s seconds, stdout: '%s', " \
+            "stderr: '%s'" % (self.cmd, self.timeout, self.stdout,
+                              self.stderr)
+
+
+class _PipeReader(object):
+    """
+    Decode the output of a pipe incrementally, either into an internal
+    buffer or by feeding every decoded chunk into the consumer.
+    """
+    def __init__(self, pipe, consumer=None):
+        self.fd = pipe.fileno()
+        self.byte_count = 0
+        self._consumer = consumer
+        self._buff = io.StringIO()
+        self._decoder = io.IncrementalNewlineDecoder(
+            codecs.getincrementaldecoder(
+                locale.getpreferredencoding(False))(errors='replace'),
+            translate=True)
+
+    def _feed(self, data, final=False):
+        text = self._decoder.decode(data, final)
+        if not text:
+            return
+        if self._consumer is None:
+            self._buff.write(text)
+        else:
+            self._consumer(text)
+
+    def read(self):
+        """
+        Read what is available on the pipe. Return False on EOF.
+        """
+        data = os.read(self.fd, _CHUNK_SIZE)
+        if not data:
+            self._feed(b'', True)
+            return False
+        self.byte_count += len(data)
+        self._feed(data)
+        return True
+
+    def output(self):
+        return self._buff.getvalue().strip()
+
+
+def _pipes_read(readers, timeout):
+    """
+    Read all the pipes concurrently until EOF.
+    Return False if timeout(in seconds) expired before all pipes closed.
+    """
+    poller = select.poll()
+    fd_to_reader = {}
+    for reader in readers:
+        poller.register(reader.fd, _POLL_IN)
+        fd_to_reader[reader.fd] = reader
+
+    deadline = None
+    if timeout is not None:
+        deadline = time.time() + timeout
+
+    while fd_to_reader:
+        poll_tmo = None
+        if deadline is not None:
+            poll_tmo = int((deadline - time.time()) * 1000)
+            if poll_tmo <= 0:
+                return False
+        try:
+            events = poller.poll(poll_tmo)
+        except select.error as select_error:
+            if select_error.args[0] == errno.EINTR:
+                continue
+            raise
+        for fd, event in events:
+            # On POLLHUP, keep reading until EOF as data might still be
+            # pending in the pipe.
+            if fd_to_reader[fd].read():
+                continue
+            poller.unregister(fd)
+            del fd_to_reader[fd]
+    return True
+
+
+def cmd_exec(cmds, timeout=None, stdout_consumer=None):
+    """
+    Execute provided command and return the STDOUT as string.
+    Raise ExecError if command return code is not zero.
+    Raise ExecTimeout(subclass of ExecError) if command does not finish
+    in 'timeout' seconds, the command will be killed.
+
+    STDOUT and STDERR are read concurrently, so a command flooding STDERR
+    cannot block itself. If stdout_consumer is defined, it will be invoked
+    with each decoded chunk of STDOUT as it arrives and empty string will
+    be returned instead of the full STDOUT.
+
+    The duration and output size of each execution are recorded, check
+    exec_stats().
+    """
+    start_time = time.time()
+    cmd_popen = subprocess.Popen(
+        cmds, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+        env={"PATH": os.getenv("PATH")})
+    stdout_reader = _PipeReader(cmd_popen.stdout, stdout_consumer)
+    stderr_reader = _PipeReader(cmd_popen.stderr)
+    finished = False
+    try:
+        finished = _pipes_read([stdout_reader, stderr_reader], timeout)
+    finally:
+        # Also on exception raised by stdout_consumer, the command should
+        # not be left running or unreaped.
+        if not finished and cmd_popen.poll() is None:
+            cmd_popen.kill()
+        ret_code = cmd_popen.wait()
+        cmd_popen.stdout.close()
+        cmd_popen.stderr.close()
+
+    str_stdout = stdout_reader.output()
+    str_stderr = stderr_reader.output()
+
+    _EXEC_STATS.append({
+        'cmd': " ".join(cmds),
+        'duration': time.time() - start_time,
+        'stdout_bytes': stdout_reader.byte_count,
+        'stderr_bytes': stderr_reader.byte_count,
+        'errno': ret_code,
+        'timeout': not finished,
+    })
+
+    if not finished:
+        raise ExecTimeout(" ".join(cmds), timeout, str_stdout, str_stderr)
+    if ret_code != 0:
+        raise ExecError(" ".join(cmds), ret_code, str_stdout, str_stderr)
+    return str_stdout
+
+
+def exec_stats():
+    """
+    Return a list of dictionaries for the most recent command executions,
+    oldest first:
+        {
+            'cmd': "<command line>",
+            'duration': <seconds as float>,
+            'stdout_bytes': <int>,
+            'stderr_bytes': <int>,
+            'errno': <command return code>,
+            'timeout': <True if command was killed by timeout>,
+        }
+    """
+    return list(_EXEC_STATS)
+
+
+def exec_stats_clear():
+    _EXEC_STATS.clear()
+
+
+# Test code is only defined when executed directly, hence importing this
+# module does not load unittest.
+if __name__ == "__main__":
+    import sys
+    import unittest
+
+    def _py_cmd(code):
+        return [sys.executable, '-c', code]
+
+    class _TestExec(unittest.TestCase):
+        def setUp(self):
+            exec_stats_clear()
+
+        def test_stdout(self):
+            self.assertEqual(cmd_exec(_py_cmd('print("a\\nb ")')), "a\nb")
+
+        def test_consumer(self):
+            chunks = []
+            self.assertEqual(
+                cmd_exec(_py_cmd('print("x" * 100000)'),
+                         stdout_consumer=chunks.append), "")
+            self.assertEqual("".join(chunks).strip(), "x" * 100000)
+
+        def test_stderr_flood(self):
+            # Far more than the pipe buffer, the command would block on
+            # STDERR if it was only read after STDOUT closed.
+            out = cmd_exec(
+                _py_cmd('import sys\n'
+                        'sys.stderr.write("e" * (4 << 20))\n'
+                        'sys.stderr.flush()\n'
+                        'sys.stdout.write("done")'),
+                timeout=60)
+            self.assertEqual(out, "done")
+            self.assertEqual(exec_stats()[-1]['stderr_bytes'], 4 << 20)
+
+        def test_error(self):
+            with self.assertRaises(ExecError) as cm:
+                cmd_exec(_py_cmd('import sys\n'
+                                 'sys.stderr.write("oops")\n'
+                                 'sys.exit(3)'))
+            self.assertFalse(isinstance(cm.exception, ExecTimeout))
+            self.assertEqual(cm.exception.errno, 3)
+            self.assertEqual(cm.exception.stderr, "oops")
+
+        def test_timeout(self):
+            start_time = time.time()
+            with self.assertRaises(ExecTimeout) as cm:
+                cmd_exec(_py_cmd('import sys, time\n'
+                                 'sys.stdout.write("partial")\n'
+                                 'sys.stdout.flush()\n'
+                                 'time.sleep(60)'),
+                         timeout=0.5)
+            self.assertTrue(time.time() - start_time < 30)
+            self.assertEqual(cm.exception.stdout, "partial")
+            self.assertEqual(cm.exception.timeout, 0.5)
+            stats = exec_stats()[-1]
+            self.assertTrue(stats['timeout'])
+            self.assertNotEqual(stats['errno'], 0)
+
+        def test_consumer_error(self):
+            pids = []
+
+            def _consumer(text):
+                pids.append(int(text))
+                raise ValueError("consumer failure")
+
+            self.assertRaises(
+                ValueError, cmd_exec,
+                _py_cmd('import os, sys, time\n'
+                        'sys.stdout.write(str(os.getpid()))\n'
+                        'sys.stdout.flush()\n'
+                        'time.sleep(60)'),
+                stdout_consumer=_consumer)
+            # The command is killed and reaped.
+            with self.assertRaises(OSError) as cm:
+                os.kill(pids[0], 0)
+            self.assertEqual(cm.exception.errno, errno.ESRCH)
+
+        def test_exec_stats(self):
+            cmd_exec(_py_cmd('print("1234")'))
+            self.assertRaises(ExecError, cmd_exec, _py_cmd('exit(1)'))
+            stats = exec_stats()
+            self.assertEqual(len(stats), 2)
+            self.assertEqual(stats[0]['stdout_bytes'], len("1234\n"))
+            self.assertEqual(stats[0]['errno'], 0)
+            self.assertFalse(stats[0]['timeout'])
+            self.assertTrue(stats[0]['duration'] >= 0)
+            self.assertEqual(stats[1]['errno'], 1)
+            self.assertTrue(stats[1]['cmd'].endswith("exit(1)"))
+
+            for _ in range(_STATS_MAX + 1):
+                cmd_exec(_py_cmd('pass'))
+            self.assertEqual(len(exec_stats()), _STATS_MAX)
+
+            exec_stats_clear()
+            self.assertEqual(exec_stats(), [])
+
+    unittest.main()
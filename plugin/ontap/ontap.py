@@ -140,7 +140,11 @@ def plugin_register(self, uri, password, timeout, flags=0):
         if u.scheme.lower() == 'ontap+ssl':
             ssl = True
 
-        self.f = na.Filer(u.hostname, u.username, password,
+        host = u.hostname
+        if u.port:
+            host = "%s:%d" % (host, u.port)
+
+        self.f = na.Filer(host, u.username, password,
                           int_div(timeout, Ontap.TMO_CONV), ssl)
         # Smoke test
         i = self.f.system_info()
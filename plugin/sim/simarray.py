@@ -25,7 +25,7 @@
 from lsm import (size_human_2_size_bytes)
 from lsm import (System, Volume, Disk, Pool, FileSystem, AccessGroup,
                  FsSnapshot, NfsExport, md5, LsmError, TargetPort,
-                 ErrorNumber, JobStatus, Battery, int_div)
+                 ErrorNumber, JobStatus, Battery, int_div, IPlugin)
 
 
 def _handle_errors(method):
@@ -129,9 +129,10 @@ def data_disk_count(raid_type, disk_count):
 
 
 class BackStore(object):
-    VERSION = "4.0"
+    VERSION = "4.1"
     VERSION_SIGNATURE = 'LSM_SIMULATOR_DATA_%s_%s' % (VERSION, md5(VERSION))
     JOB_DEFAULT_DURATION = 1
+    JOB_DEFAULT_RETENTION = 86400
     JOB_DATA_TYPE_VOL = 1
     JOB_DATA_TYPE_FS = 2
     JOB_DATA_TYPE_FS_SNAP = 3
@@ -148,6 +149,7 @@ class BackStore(object):
     _DEFAULT_READ_CACHE_PCT = 10
     _LIST_SPLITTER = '#'
     _ID_FMT_LEN = 5
+    _JOB_REAP_INTERVAL = 60
 
     SUPPORTED_VCR_RAID_TYPES = [
         Volume.RAID_TYPE_RAID0, Volume.RAID_TYPE_RAID1,
@@ -167,6 +169,10 @@ def __init__(self, statefile, timeout):
 
         self.statefile = statefile
         self.lastrowid = None
+        # sim_job_id => (timestamp, duration) of jobs queried by this
+        # process.
+        self._job_index = {}
+        self._job_reap_time = 0
         self.sql_conn = sqlite3.connect(
             statefile, timeout=int(int_div(timeout, 1000)), isolation_level="IMMEDIATE")
         self.sql_conn.row_factory = _dict_factory
@@ -210,12 +216,18 @@ def __init__(self, statefile, timeout):
             parent_pool_id INTEGER,
             member_type INTEGER,
             strip_size INTEGER,
-            total_space LONG);
+            total_space LONG,
+            consumed_space LONG NOT NULL DEFAULT 0);
             """
         # parent_pool_id:
         #   Indicate this pool is allocated from # other pool
         # total_space:
-        #   is only for sub-pool \pool from pool)
+        #   For sub-pool(pool from pool), it's the requested size.
+        #   For pool from disks, it's the sum of data disks size, set
+        #   by sim_pool_create_from_disk().
+        # consumed_space:
+        #   Space consumed by volumes, file systems and sub-pools,
+        #   maintained by the triggers defined below.
 
         sql_cmd += \
             """
@@ -377,12 +389,15 @@ def __init__(self, statefile, timeout):
         sql_cmd += \
             """
             CREATE TABLE jobs (
-            id INTEGER PRIMARY KEY,
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
             duration REAL NOT NULL,
             timestamp TEXT NOT NULL,
             data_type INTEGER,
             data_id INTEGER);
             """
+        # AUTOINCREMENT:
+        #   Job ID should never be reused, as ID of deleted job might still be
+        #   held by _job_index of other plugin process.
 
         sql_cmd += \
             """
@@ -393,9 +408,46 @@ def __init__(self, statefile, timeout):
             status INTEGER NOT NULL);
             """
 
+        # Keep pools.consumed_space updated, so checking free space of pool
+        # does not need to sum up all the volumes and file systems.
+        for table, size_column, pool_column in [
+                ('volumes', 'consumed_size', 'pool_id'),
+                ('fss', 'consumed_size', 'pool_id'),
+                ('pools', 'total_space', 'parent_pool_id')]:
+            sql_cmd += \
+                """
+                CREATE TRIGGER {table}_consumed_insert
+                    AFTER INSERT ON {table}
+                BEGIN
+                    UPDATE pools
+                        SET consumed_space = consumed_space + NEW.{size}
+                        WHERE id = NEW.{pool};
+                END;
+
+                CREATE TRIGGER {table}_consumed_delete
+                    AFTER DELETE ON {table}
+                BEGIN
+                    UPDATE pools
+                        SET consumed_space = consumed_space - OLD.{size}
+                        WHERE id = OLD.{pool};
+                END;
+
+                CREATE TRIGGER {table}_consumed_update
+                    AFTER UPDATE OF {size}, {pool} ON {table}
+                BEGIN
+                    UPDATE pools
+                        SET consumed_space = consumed_space - OLD.{size}
+                        WHERE id = OLD.{pool};
+                    UPDATE pools
+                        SET consumed_space = consumed_space + NEW.{size}
+                        WHERE id = NEW.{pool};
+                END;
+                """.format(table=table, size=size_column, pool=pool_column)
+
         # Create views, SUBSTR() used below is alternative way of PRINTF()
         # which only exists on sqlite 3.8+ while RHEL6 or Ubuntu 12.04 ships
-        # older version.
+        # older version. Like '%0*d', IDs are zero padded to _ID_FMT_LEN
+        # digits but never truncated, so they stay unique beyond 99999.
         sql_cmd += \
             """
             CREATE VIEW pools_view AS
@@ -403,7 +455,7 @@ def __init__(self, statefile, timeout):
                     pool0.id,
                         'POOL_ID_' ||
                             SUBSTR('{ID_PADDING}' || pool0.id,
-                                   -{ID_FMT_LEN}, {ID_FMT_LEN})
+                                   -MAX(LENGTH(pool0.id), {ID_FMT_LEN}))
                     lsm_pool_id,
                     pool0.name,
                     pool0.status,
@@ -415,14 +467,12 @@ def __init__(self, statefile, timeout):
                     pool0.parent_pool_id,
                         'POOL_ID_' ||
                             SUBSTR('{ID_PADDING}' || pool0.parent_pool_id,
-                                   -{ID_FMT_LEN}, {ID_FMT_LEN})
+                                   -MAX(LENGTH(pool0.parent_pool_id),
+                                        {ID_FMT_LEN}))
                     parent_lsm_pool_id,
                     pool0.strip_size,
-                    pool1.total_space total_space,
-                    pool1.total_space -
-                    pool2.vol_consumed_size  -
-                    pool3.fs_consumed_size -
-                    pool4.sub_pool_consumed_size free_space,
+                    pool0.total_space,
+                    pool0.total_space - pool0.consumed_space free_space,
                     pool1.data_disk_count,
                     pool5.disk_count
                 FROM
@@ -430,9 +480,6 @@ def __init__(self, statefile, timeout):
                         LEFT JOIN (
                             SELECT
                                 pool.id,
-                                    ifnull(pool.total_space,
-                                        ifnull(SUM(disk.total_space), 0))
-                                total_space,
                                 COUNT(disk.id) data_disk_count
                             FROM pools pool
                                 LEFT JOIN disks disk
@@ -442,6 +489,33 @@ def __init__(self, statefile, timeout):
                                 pool.id
                         ) pool1 ON pool0.id = pool1.id
 
+                        LEFT JOIN (
+                            SELECT
+                                pool.id,
+                                COUNT(disk.id) disk_count
+                            FROM pools pool
+                                LEFT JOIN disks disk
+                                    ON pool.id = disk.owner_pool_id
+                            GROUP BY
+                                pool.id
+                        ) pool5 ON pool0.id = pool5.id
+                GROUP BY
+                    pool0.id;
+            """
+
+        # Only used by sim_pool_space_check() to verify pools.consumed_space
+        # against the sum of actual space consumers.
+        sql_cmd += \
+            """
+            CREATE VIEW pools_space_check_view AS
+                SELECT
+                    pool0.id,
+                    pool0.consumed_space,
+                    pool2.vol_consumed_size +
+                    pool3.fs_consumed_size +
+                    pool4.sub_pool_consumed_size real_consumed_space
+                FROM
+                    pools pool0
                         LEFT JOIN (
                             SELECT
                                 pool.id,
@@ -477,16 +551,6 @@ def __init__(self, statefile, timeout):
                             GROUP BY
                                 pool.id
                         ) pool4 ON pool0.id = pool4.id
-                        LEFT JOIN (
-                            SELECT
-                                pool.id,
-                                COUNT(disk.id) disk_count
-                            FROM pools pool
-                                LEFT JOIN disks disk
-                                    ON pool.id = disk.owner_pool_id
-                            GROUP BY
-                                pool.id
-                        ) pool5 ON pool0.id = pool5.id
                 GROUP BY
                     pool0.id;
             """
@@ -498,7 +562,7 @@ def __init__(self, statefile, timeout):
                     id,
                         'TGT_PORT_ID_' ||
                             SUBSTR('{ID_PADDING}' || id,
-                                   -{ID_FMT_LEN}, {ID_FMT_LEN})
+                                   -MAX(LENGTH(id), {ID_FMT_LEN}))
                     lsm_tgt_id,
                     port_type,
                     service_address,
@@ -516,7 +580,7 @@ def __init__(self, statefile, timeout):
                     id,
                         'DISK_ID_' ||
                             SUBSTR('{ID_PADDING}' || id,
-                                   -{ID_FMT_LEN}, {ID_FMT_LEN})
+                                   -MAX(LENGTH(id), {ID_FMT_LEN}))
                     lsm_disk_id,
                         disk_prefix || '_' || id
                     name,
@@ -540,7 +604,7 @@ def __init__(self, statefile, timeout):
                     id,
                         'VOL_ID_' ||
                             SUBSTR('{ID_PADDING}' || id,
-                                   -{ID_FMT_LEN}, {ID_FMT_LEN})
+                                   -MAX(LENGTH(id), {ID_FMT_LEN}))
                     lsm_vol_id,
                     vpd83,
                     name,
@@ -554,7 +618,7 @@ def __init__(self, statefile, timeout):
                     pool_id,
                         'POOL_ID_' ||
                             SUBSTR('{ID_PADDING}' || pool_id,
-                                   -{ID_FMT_LEN}, {ID_FMT_LEN})
+                                   -MAX(LENGTH(pool_id), {ID_FMT_LEN}))
                     lsm_pool_id
                 FROM
                     volumes;
@@ -567,7 +631,7 @@ def __init__(self, statefile, timeout):
                     id,
                         'FS_ID_' ||
                             SUBSTR('{ID_PADDING}' || id,
-                                   -{ID_FMT_LEN}, {ID_FMT_LEN})
+                                   -MAX(LENGTH(id), {ID_FMT_LEN}))
                     lsm_fs_id,
                     name,
                     total_space,
@@ -576,7 +640,7 @@ def __init__(self, statefile, timeout):
                     pool_id,
                         'POOL_ID_' ||
                             SUBSTR('{ID_PADDING}' || pool_id,
-                                   -{ID_FMT_LEN}, {ID_FMT_LEN})
+                                   -MAX(LENGTH(pool_id), {ID_FMT_LEN}))
                     lsm_pool_id
                 FROM
                     fss;
@@ -589,7 +653,7 @@ def __init__(self, statefile, timeout):
                     id,
                         'BAT_ID_' ||
                             SUBSTR('{ID_PADDING}' || id,
-                                   -{ID_FMT_LEN}, {ID_FMT_LEN})
+                                   -MAX(LENGTH(id), {ID_FMT_LEN}))
                     lsm_bat_id,
                     name,
                     type,
@@ -604,14 +668,14 @@ def __init__(self, statefile, timeout):
                     id,
                         'FS_SNAP_ID_' ||
                             SUBSTR('{ID_PADDING}' || id,
-                                   -{ID_FMT_LEN}, {ID_FMT_LEN})
+                                   -MAX(LENGTH(id), {ID_FMT_LEN}))
                     lsm_fs_snap_id,
                     name,
                     timestamp,
                     fs_id,
                         'FS_ID_' ||
                             SUBSTR('{ID_PADDING}' || fs_id,
-                                   -{ID_FMT_LEN}, {ID_FMT_LEN})
+                                   -MAX(LENGTH(fs_id), {ID_FMT_LEN}))
                     lsm_fs_id
                 FROM
                     fs_snaps;
@@ -624,7 +688,7 @@ def __init__(self, statefile, timeout):
                     vol.id,
                         'VOL_ID_' ||
                             SUBSTR('{ID_PADDING}' || vol.id,
-                                   -{ID_FMT_LEN}, {ID_FMT_LEN})
+                                   -MAX(LENGTH(vol.id), {ID_FMT_LEN}))
                     lsm_vol_id,
                     vol.vpd83,
                     vol.name,
@@ -633,7 +697,7 @@ def __init__(self, statefile, timeout):
                     vol.pool_id,
                         'POOL_ID_' ||
                             SUBSTR('{ID_PADDING}' || vol.pool_id,
-                                   -{ID_FMT_LEN}, {ID_FMT_LEN})
+                                   -MAX(LENGTH(vol.pool_id), {ID_FMT_LEN}))
                     lsm_pool_id,
                     vol.admin_state,
                     vol.is_hw_raid_vol,
@@ -654,7 +718,7 @@ def __init__(self, statefile, timeout):
                     ag.id,
                         'AG_ID_' ||
                             SUBSTR('{ID_PADDING}' || ag.id,
-                                   -{ID_FMT_LEN}, {ID_FMT_LEN})
+                                   -MAX(LENGTH(ag.id), {ID_FMT_LEN}))
                     lsm_ag_id,
                     ag.name,
                         CASE
@@ -683,7 +747,7 @@ def __init__(self, statefile, timeout):
                     ag_new.id,
                         'AG_ID_' ||
                             SUBSTR('{ID_PADDING}' || ag_new.id,
-                                   -{ID_FMT_LEN}, {ID_FMT_LEN})
+                                   -MAX(LENGTH(ag_new.id), {ID_FMT_LEN}))
                     lsm_ag_id,
                     ag_new.name,
                     ag_new.init_type,
@@ -724,12 +788,12 @@ def __init__(self, statefile, timeout):
                     exp.id,
                         'EXP_ID_' ||
                             SUBSTR('{ID_PADDING}' || exp.id,
-                                   -{ID_FMT_LEN}, {ID_FMT_LEN})
+                                   -MAX(LENGTH(exp.id), {ID_FMT_LEN}))
                     lsm_exp_id,
                     exp.fs_id,
                         'FS_ID_' ||
                             SUBSTR('{ID_PADDING}' || exp.fs_id,
-                                   -{ID_FMT_LEN}, {ID_FMT_LEN})
+                                   -MAX(LENGTH(exp.fs_id), {ID_FMT_LEN}))
                     lsm_fs_id,
                     exp.exp_path,
                     exp.auth_type,
@@ -1079,10 +1143,45 @@ def _data_delete(self, table, condition):
         sql_cmd = "DELETE FROM %s WHERE %s;" % (table, condition)
         self._sql_exec(sql_cmd)
 
+    @staticmethod
+    def _job_retention():
+        """
+        Seconds to keep a job after it finished, defined by environment
+        variable LSM_SIM_JOB_RETENTION. Zero or negative means forever.
+        Invalid value is treated as JOB_DEFAULT_RETENTION.
+        """
+        try:
+            return float(os.getenv(
+                "LSM_SIM_JOB_RETENTION", BackStore.JOB_DEFAULT_RETENTION))
+        except ValueError:
+            return BackStore.JOB_DEFAULT_RETENTION
+
+    def _sim_jobs_reap(self):
+        """
+        Delete all expired jobs. Only done once per _JOB_REAP_INTERVAL
+        seconds.
+        """
+        now = time.time()
+        if now - self._job_reap_time < BackStore._JOB_REAP_INTERVAL:
+            return
+        self._job_reap_time = now
+
+        retention = BackStore._job_retention()
+        if retention <= 0:
+            return
+
+        expire_time = now - retention
+        self._data_delete(
+            'jobs', 'CAST(timestamp AS REAL) + duration < %f' % expire_time)
+        for sim_job_id, sim_job in list(self._job_index.items()):
+            if sim_job[0] + sim_job[1] < expire_time:
+                del self._job_index[sim_job_id]
+
     def sim_job_create(self, job_data_type=None, data_id=None):
         """
         Return a job id(Integer)
         """
+        self._sim_jobs_reap()
         self._data_add(
             "jobs",
             {
@@ -1095,21 +1194,44 @@ def sim_job_create(self, job_data_type=None, data_id=None):
         return self.lastrowid
 
     def sim_job_delete(self, sim_job_id):
+        self._job_index.pop(sim_job_id, None)
         self._data_delete('jobs', 'id="%s"' % sim_job_id)
 
+    def sim_job_finish_time(self, sim_job_id):
+        """
+        Return the time when the job will be finished.
+        """
+        if sim_job_id not in self._job_index:
+            self.sim_job_status(sim_job_id)
+        (timestamp, duration) = self._job_index[sim_job_id]
+        return timestamp + duration
+
     def sim_job_status(self, sim_job_id):
         """
         Return (progress, data_type, data) tuple.
         progress is the integer of percent.
+        Unfinished job is checked against _job_index without touching
+        the database once queried.
         """
+        now = time.time()
+        if sim_job_id in self._job_index:
+            (timestamp, duration) = self._job_index[sim_job_id]
+            progress = int((now - timestamp) / duration * 100)
+            if progress < 100:
+                return (max(progress, 0), None, None)
+
         sim_job = self._data_find('jobs', 'id=%s' % sim_job_id,
                                   flag_unique=True)
         if sim_job is None:
+            self._job_index.pop(sim_job_id, None)
             raise LsmError(
                 ErrorNumber.NOT_FOUND_JOB, "Job not found")
 
+        self._job_index[sim_job_id] = (
+            float(sim_job['timestamp']), sim_job['duration'])
+
         progress = int(
-            (time.time() - float(sim_job['timestamp'])) /
+            (now - float(sim_job['timestamp'])) /
             sim_job['duration'] * 100)
 
         data = None
@@ -1200,6 +1322,12 @@ def sim_pool_create_from_disk(self, name, sim_disk_ids, raid_type,
             self._data_update(
                 'disks', sim_disk_id, 'role', 'PARITY')
 
+        self._sql_exec(
+            "UPDATE pools SET total_space=("
+            "SELECT ifnull(SUM(total_space), 0) FROM disks "
+            "WHERE owner_pool_id=%s AND role='DATA') WHERE id=%s;" %
+            (sim_pool_id, sim_pool_id))
+
         return sim_pool_id
 
     def sim_pool_create_sub_pool(self, name, parent_pool_id, size,
@@ -1258,17 +1386,37 @@ def sim_vol_of_id(self, sim_vol_id):
             "volumes_view", sim_vol_id, ErrorNumber.NOT_FOUND_VOLUME,
             "Volume")
 
-    def _check_pool_free_space(self, sim_pool_id, size_bytes):
-        sim_pool = self.sim_pool_of_id(sim_pool_id)
+    def sim_pool_space_check(self):
+        """
+        Raise LsmError with ErrorNumber.PLUGIN_BUG if the consumed space
+        counter of any pool does not match the space actually consumed by
+        its volumes, file systems and sub-pools.
+        """
+        bad_pools = self._data_find(
+            'pools_space_check_view',
+            'consumed_space != real_consumed_space')
+        if bad_pools:
+            raise LsmError(
+                ErrorNumber.PLUGIN_BUG,
+                "sim_pool_space_check(): Got incorrect consumed space "
+                "counter: %s" % bad_pools)
+
+    def _sim_pool_free_space(self, sim_pool_id):
+        sim_pool = self._data_find(
+            'pools', 'id=%s' % sim_pool_id, flag_unique=True)
+        if sim_pool is None:
+            raise LsmError(ErrorNumber.NOT_FOUND_POOL, "Pool not found")
+        return sim_pool['total_space'] - sim_pool['consumed_space']
 
-        if (sim_pool['free_space'] < size_bytes):
+    def _check_pool_free_space(self, sim_pool_id, size_bytes):
+        if self._sim_pool_free_space(sim_pool_id) < size_bytes:
             raise LsmError(ErrorNumber.NOT_ENOUGH_SPACE,
                            "Insufficient space in pool")
 
     @staticmethod
     def _block_rounding(size_bytes):
-        return (size_bytes + BackStore.BLK_SIZE - 1) / \
-            BackStore.BLK_SIZE * BackStore.BLK_SIZE
+        return int_div(size_bytes + BackStore.BLK_SIZE - 1,
+                       BackStore.BLK_SIZE) * BackStore.BLK_SIZE
 
     def sim_vol_create(self, name, size_bytes, sim_pool_id, is_hw_raid_vol=0):
 
@@ -1633,12 +1781,9 @@ def sim_fs_resize(self, sim_fs_id, new_size_bytes):
         # TODO(Gris Ge): If a fs is in a clone/snapshot relationship, resize
         #                should be handled properly.
 
-        sim_pool = self.sim_pool_of_id(sim_fs['pool_id'])
-
-        if new_size_bytes > sim_fs['total_space'] and \
-           sim_pool['free_space'] < new_size_bytes - sim_fs['total_space']:
-            raise LsmError(
-                ErrorNumber.NOT_ENOUGH_SPACE, "Insufficient space in pool")
+        if new_size_bytes > sim_fs['total_space']:
+            self._check_pool_free_space(
+                sim_fs['pool_id'], new_size_bytes - sim_fs['total_space'])
 
         self._data_update(
             'fss', sim_fs_id, "total_space", new_size_bytes)
@@ -1840,8 +1985,10 @@ class SimArray(object):
 
     @staticmethod
     def _lsm_id_to_sim_id(lsm_id, lsm_error):
+        # ID could be longer than _ID_FMT_LEN, like job ID which is never
+        # reused.
         try:
-            return int(lsm_id[-BackStore._ID_FMT_LEN:])
+            return int(lsm_id[lsm_id.rindex('_') + 1:])
         except ValueError:
             raise lsm_error
 
@@ -1923,6 +2070,40 @@ def job_status(self, job_id, flags=0):
 
         return (status, progress, data)
 
+    @_handle_errors
+    def job_wait(self, job_ids, timeout=None, flags=0):
+        """
+        Sleep until the expected finish time of the first job, or the last
+        one if FLAG_JOB_WAIT_ALL is set, instead of polling.
+        """
+        deadline = None
+        if timeout is not None:
+            deadline = time.time() + timeout / 1000.0
+
+        while True:
+            rc = list(self.job_status(job_id) for job_id in job_ids)
+            finish_times = list(
+                self.bs_obj.sim_job_finish_time(
+                    SimArray._sim_job_id_of(job_id))
+                for job_id, r in zip(job_ids, rc)
+                if r[0] == JobStatus.INPROGRESS)
+            if len(finish_times) == 0:
+                return rc
+            if flags & IPlugin.FLAG_JOB_WAIT_ALL:
+                wake_time = max(finish_times)
+            elif len(finish_times) < len(job_ids):
+                return rc
+            else:
+                wake_time = min(finish_times)
+
+            if deadline is not None:
+                if time.time() >= deadline:
+                    return rc
+                wake_time = min(wake_time, deadline)
+            # job_status() reports progress as integer percent, sleep a bit
+            # more to be sure it reached 100.
+            time.sleep(max(wake_time - time.time(), 0) + 0.01)
+
     @_handle_errors
     def job_free(self, job_id, flags=0):
         self.bs_obj.trans_begin()
@@ -2049,6 +2230,29 @@ def volume_create(self, pool_id, vol_name, size_bytes, thinp, flags=0,
 
         return job_id, None
 
+    @_handle_errors
+    def volume_create_many(self, requests, flags=0):
+        """
+        Create all volumes in single transaction.
+        The 'requests' is a list of (pool_id, vol_name, size_bytes, thinp).
+        Return a list of (job_id, lsm_error).
+        BackStore.sim_vol_create() checks everything before changing the
+        state file, so failed request leaves nothing to roll back.
+        """
+        rc = []
+        self.bs_obj.trans_begin()
+        for (pool_id, vol_name, size_bytes, thinp) in requests:
+            try:
+                new_sim_vol_id = self.bs_obj.sim_vol_create(
+                    vol_name, size_bytes, SimArray._sim_pool_id_of(pool_id))
+            except LsmError as lsm_err:
+                rc.append((None, lsm_err))
+                continue
+            rc.append((self._job_create(
+                BackStore.JOB_DATA_TYPE_VOL, new_sim_vol_id), None))
+        self.bs_obj.trans_commit()
+        return rc
+
     @_handle_errors
     def volume_delete(self, vol_id, flags=0):
         self.bs_obj.trans_begin()
@@ -2420,6 +2624,26 @@ def volume_mask(self, ag_id, vol_id, flags=0):
         self.bs_obj.trans_commit()
         return None
 
+    @_handle_errors
+    def volume_mask_many(self, ag_id, vol_ids, flags=0):
+        """
+        Mask all volumes in single transaction.
+        Return a list of lsm_error.
+        """
+        rc = []
+        self.bs_obj.trans_begin()
+        sim_ag_id = SimArray._sim_ag_id_of(ag_id)
+        for vol_id in vol_ids:
+            try:
+                self.bs_obj.sim_vol_mask(
+                    SimArray._sim_vol_id_of(vol_id), sim_ag_id)
+            except LsmError as lsm_err:
+                rc.append(lsm_err)
+                continue
+            rc.append(None)
+        self.bs_obj.trans_commit()
+        return rc
+
     @_handle_errors
     def volume_unmask(self, ag_id, vol_id, flags=0):
         self.bs_obj.trans_begin()
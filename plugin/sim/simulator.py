@@ -54,6 +54,9 @@ def job_status(self, job_id, flags=0):
     def job_free(self, job_id, flags=0):
         return self.sim_array.job_free(job_id, flags)
 
+    def job_wait(self, job_ids, timeout=None, flags=0):
+        return self.sim_array.job_wait(job_ids, timeout, flags)
+
     @staticmethod
     def _sim_data_2_lsm(sim_data):
         """
@@ -128,6 +131,18 @@ def volume_create(self, pool, volume_name, size_bytes, provisioning,
             pool.id, volume_name, size_bytes, provisioning, flags)
         return SimPlugin._sim_data_2_lsm(sim_vol)
 
+    def volume_create_many(self, requests, flags=0):
+        rc = []
+        for (job_id, lsm_err) in self.sim_array.volume_create_many(
+                list((pool.id, volume_name, size_bytes, provisioning)
+                     for (pool, volume_name, size_bytes, provisioning)
+                     in requests), flags):
+            if lsm_err is None:
+                rc.append([job_id, None, None])
+            else:
+                rc.append([None, None, [lsm_err.code, lsm_err.msg]])
+        return rc
+
     def volume_delete(self, volume, flags=0):
         return self.sim_array.volume_delete(volume.id, flags)
 
@@ -190,6 +205,12 @@ def volume_mask(self, access_group, volume, flags=0):
         return self.sim_array.volume_mask(
             access_group.id, volume.id, flags)
 
+    def volume_mask_many(self, access_group, volumes, flags=0):
+        return list(
+            None if lsm_err is None else [lsm_err.code, lsm_err.msg]
+            for lsm_err in self.sim_array.volume_mask_many(
+                access_group.id, list(v.id for v in volumes), flags))
+
     def volume_unmask(self, access_group, volume, flags=0):
         return self.sim_array.volume_unmask(
             access_group.id, volume.id, flags)
@@ -438,6 +438,7 @@ int _db_pool_create_from_disk(char *err_msg, sqlite3 *db, const char *name,
     const char *disk_role_parity = _DISK_ROLE_PARITY;
     const char *disk_role = NULL;
     char strip_size_str[_BUFF_SIZE];
+    char sql_cmd[_BUFF_SIZE];
     size_t j = 0;
     bool found = false;
 
@@ -576,6 +577,15 @@ int _db_pool_create_from_disk(char *err_msg, sqlite3 *db, const char *name,
               rc, out);
     }
 
+    _snprintf_buff(err_msg, rc, out, sql_cmd,
+                   "UPDATE " _DB_TABLE_POOLS " SET total_space=("
+                   "SELECT ifnull(SUM(total_space), 0) FROM " _DB_TABLE_DISKS
+                   " WHERE owner_pool_id=%" PRIu64 " AND role='"
+                   _DISK_ROLE_DATA "') WHERE id=%" PRIu64 ";",
+                   *sim_pool_id, *sim_pool_id);
+    _good(_db_sql_exec(err_msg, db, sql_cmd, NULL /* no output */),
+          rc, out);
+
  out:
     return rc;
 }
@@ -870,13 +880,19 @@ int _db_data_delete_condition(char *err_msg, sqlite3 *db,
 
 const char *_db_lsm_id_to_sim_id_str(const char *lsm_id)
 {
+    const char *sep = NULL;
+
     if (lsm_id == NULL)
         return NULL;
 
-    if (strlen(lsm_id) <= _DB_ID_FMT_LEN)
+    /* The sim ID is zero padded to _DB_ID_FMT_LEN digits but could be longer,
+     * so take everything after the last '_'.
+     */
+    sep = strrchr(lsm_id, '_');
+    if ((sep == NULL) || (*(sep + 1) == '\0'))
         return NULL;
 
-    return lsm_id + (strlen(lsm_id) - _DB_ID_FMT_LEN);
+    return sep + 1;
 }
 
 uint64_t _db_lsm_id_to_sim_id(const char *lsm_id)
@@ -52,8 +52,15 @@ static const char *_TABLE_INIT =
     /* ^ Indicate this pool is allocated from other pool */
     "    member_type INTEGER,\n"
     "    strip_size INTEGER,\n"
-    "    total_space LONG);\n"
-    /* ^ total_space here is only for sub-pool (pool from pool) */
+    "    total_space LONG,\n"
+    /* ^ For sub-pool (pool from pool), it's the requested size.
+     *   For pool from disks, it's the sum of data disks size, set by
+     *   _db_pool_create_from_disk().
+     */
+    "    consumed_space LONG NOT NULL DEFAULT 0);\n"
+    /* ^ Space consumed by volumes, file systems and sub-pools, maintained
+     *   by the triggers defined below.
+     */
     "CREATE TABLE disks (\n"
     "    id INTEGER PRIMARY KEY,\n"
     "    total_space LONG NOT NULL,\n"
@@ -158,7 +165,8 @@ static const char *_TABLE_INIT =
     "    FOREIGN KEY(exp_id)\n"
     "    REFERENCES exps(id) ON DELETE CASCADE);\n"
     "CREATE TABLE jobs (\n"
-    "    id INTEGER PRIMARY KEY,\n"
+    "    id INTEGER PRIMARY KEY AUTOINCREMENT,\n"
+    /* ^ Never reuse the ID of expired and freed job. */
     "    duration REAL NOT NULL,\n"
     "    timestamp TEXT NOT NULL,\n"
     "    data_type INTEGER,\n"
@@ -168,13 +176,88 @@ static const char *_TABLE_INIT =
     "    name TEXT NOT NULL,\n"
     "    type INTEGER NOT NULL,\n"
     "    status INTEGER NOT NULL);\n"
+    /* Keep pools.consumed_space updated, so checking free space of pool
+     * does not need to sum up all the volumes and file systems.
+     */
+    "CREATE TRIGGER volumes_consumed_insert\n"
+    "    AFTER INSERT ON volumes\n"
+    "BEGIN\n"
+    "    UPDATE pools\n"
+    "        SET consumed_space = consumed_space + NEW.consumed_size\n"
+    "        WHERE id = NEW.pool_id;\n"
+    "END;\n"
+    "CREATE TRIGGER volumes_consumed_delete\n"
+    "    AFTER DELETE ON volumes\n"
+    "BEGIN\n"
+    "    UPDATE pools\n"
+    "        SET consumed_space = consumed_space - OLD.consumed_size\n"
+    "        WHERE id = OLD.pool_id;\n"
+    "END;\n"
+    "CREATE TRIGGER volumes_consumed_update\n"
+    "    AFTER UPDATE OF consumed_size, pool_id ON volumes\n"
+    "BEGIN\n"
+    "    UPDATE pools\n"
+    "        SET consumed_space = consumed_space - OLD.consumed_size\n"
+    "        WHERE id = OLD.pool_id;\n"
+    "    UPDATE pools\n"
+    "        SET consumed_space = consumed_space + NEW.consumed_size\n"
+    "        WHERE id = NEW.pool_id;\n"
+    "END;\n"
+    "CREATE TRIGGER fss_consumed_insert\n"
+    "    AFTER INSERT ON fss\n"
+    "BEGIN\n"
+    "    UPDATE pools\n"
+    "        SET consumed_space = consumed_space + NEW.consumed_size\n"
+    "        WHERE id = NEW.pool_id;\n"
+    "END;\n"
+    "CREATE TRIGGER fss_consumed_delete\n"
+    "    AFTER DELETE ON fss\n"
+    "BEGIN\n"
+    "    UPDATE pools\n"
+    "        SET consumed_space = consumed_space - OLD.consumed_size\n"
+    "        WHERE id = OLD.pool_id;\n"
+    "END;\n"
+    "CREATE TRIGGER fss_consumed_update\n"
+    "    AFTER UPDATE OF consumed_size, pool_id ON fss\n"
+    "BEGIN\n"
+    "    UPDATE pools\n"
+    "        SET consumed_space = consumed_space - OLD.consumed_size\n"
+    "        WHERE id = OLD.pool_id;\n"
+    "    UPDATE pools\n"
+    "        SET consumed_space = consumed_space + NEW.consumed_size\n"
+    "        WHERE id = NEW.pool_id;\n"
+    "END;\n"
+    "CREATE TRIGGER pools_consumed_insert\n"
+    "    AFTER INSERT ON pools\n"
+    "BEGIN\n"
+    "    UPDATE pools\n"
+    "        SET consumed_space = consumed_space + NEW.total_space\n"
+    "        WHERE id = NEW.parent_pool_id;\n"
+    "END;\n"
+    "CREATE TRIGGER pools_consumed_delete\n"
+    "    AFTER DELETE ON pools\n"
+    "BEGIN\n"
+    "    UPDATE pools\n"
+    "        SET consumed_space = consumed_space - OLD.total_space\n"
+    "        WHERE id = OLD.parent_pool_id;\n"
+    "END;\n"
+    "CREATE TRIGGER pools_consumed_update\n"
+    "    AFTER UPDATE OF total_space, parent_pool_id ON pools\n"
+    "BEGIN\n"
+    "    UPDATE pools\n"
+    "        SET consumed_space = consumed_space - OLD.total_space\n"
+    "        WHERE id = OLD.parent_pool_id;\n"
+    "    UPDATE pools\n"
+    "        SET consumed_space = consumed_space + NEW.total_space\n"
+    "        WHERE id = NEW.parent_pool_id;\n"
+    "END;\n"
     /* Create views */
     "CREATE VIEW " _DB_TABLE_POOLS_VIEW " AS\n"
     "    SELECT\n"
     "        pool0.id,\n"
     "            'POOL_ID_' || \n"
     "                SUBSTR('" _DB_ID_PADDING "' || pool0.id, \n"
-    "                       -" _DB_ID_FMT_LEN_STR ", " _DB_ID_FMT_LEN_STR ")\n"
+    "                       -MAX(LENGTH(pool0.id), " _DB_ID_FMT_LEN_STR "))\n"
     "        lsm_pool_id,\n"
     "        pool0.name,\n"
     "        pool0.status,\n"
@@ -186,14 +269,12 @@ static const char *_TABLE_INIT =
     "        pool0.parent_pool_id,\n"
     "            'POOL_ID_' || \n"
     "                SUBSTR('" _DB_ID_PADDING "' || pool0.parent_pool_id, \n"
-    "                       -" _DB_ID_FMT_LEN_STR ", " _DB_ID_FMT_LEN_STR ")\n"
+    "                       -MAX(LENGTH(pool0.parent_pool_id),\n"
+    "                            " _DB_ID_FMT_LEN_STR "))\n"
     "        parent_lsm_pool_id,\n"
     "        pool0.strip_size,\n"
-    "        pool1.total_space total_space,\n"
-    "        pool1.total_space -\n"
-    "        pool2.vol_consumed_size  -\n"
-    "        pool3.fs_consumed_size -\n"
-    "        pool4.sub_pool_consumed_size free_space,\n"
+    "        pool0.total_space,\n"
+    "        pool0.total_space - pool0.consumed_space free_space,\n"
     "        pool1.data_disk_count,\n"
     "        pool5.disk_count\n"
     "    FROM\n"
@@ -201,9 +282,6 @@ static const char *_TABLE_INIT =
     "            LEFT JOIN (\n"
     "                SELECT\n"
     "                    pool.id,\n"
-    "                        ifnull(pool.total_space,\n"
-    "                            ifnull(SUM(disk.total_space), 0))\n"
-    "                    total_space,\n"
     "                    COUNT(disk.id) data_disk_count\n"
     "                FROM pools pool\n"
     "                    LEFT JOIN disks disk\n"
@@ -213,6 +291,30 @@ static const char *_TABLE_INIT =
     "                    pool.id\n"
     "            ) pool1 ON pool0.id = pool1.id\n"
     "            LEFT JOIN (\n"
+    "            SELECT\n"
+    "                pool.id,\n"
+    "                COUNT(disk.id) disk_count\n"
+    "            FROM pools pool\n"
+    "                LEFT JOIN disks disk\n"
+    "                    ON pool.id = disk.owner_pool_id\n"
+    "            GROUP BY\n"
+    "                pool.id\n"
+    "            ) pool5 ON pool0.id = pool5.id\n"
+    "    GROUP BY\n"
+    "         pool0.id;\n"
+    /* Only used to verify pools.consumed_space against the sum of actual
+     * space consumers.
+     */
+    "CREATE VIEW pools_space_check_view AS\n"
+    "    SELECT\n"
+    "        pool0.id,\n"
+    "        pool0.consumed_space,\n"
+    "        pool2.vol_consumed_size +\n"
+    "        pool3.fs_consumed_size +\n"
+    "        pool4.sub_pool_consumed_size real_consumed_space\n"
+    "    FROM\n"
+    "        pools pool0\n"
+    "            LEFT JOIN (\n"
     "                SELECT\n"
     "                    pool.id,\n"
     "                        ifnull(SUM(volume.consumed_size), 0)\n"
@@ -245,16 +347,6 @@ static const char *_TABLE_INIT =
     "                GROUP BY\n"
     "                    pool.id\n"
     "            ) pool4 ON pool0.id = pool4.id\n"
-    "            LEFT JOIN (\n"
-    "            SELECT\n"
-    "                pool.id,\n"
-    "                COUNT(disk.id) disk_count\n"
-    "            FROM pools pool\n"
-    "                LEFT JOIN disks disk\n"
-    "                    ON pool.id = disk.owner_pool_id\n"
-    "            GROUP BY\n"
-    "                pool.id\n"
-    "            ) pool5 ON pool0.id = pool5.id\n"
     "    GROUP BY\n"
     "         pool0.id;\n"
     "CREATE VIEW " _DB_TABLE_TGTS_VIEW " AS\n"
@@ -262,7 +354,7 @@ static const char *_TABLE_INIT =
     "        id,\n"
     "            'TGT_PORT_ID_' || \n"
     "                SUBSTR('" _DB_ID_PADDING "' || id, \n"
-    "                       -" _DB_ID_FMT_LEN_STR ", " _DB_ID_FMT_LEN_STR ")\n"
+    "                       -MAX(LENGTH(id), " _DB_ID_FMT_LEN_STR "))\n"
     "        lsm_tgt_id,\n"
     "        port_type,\n"
     "        service_address,\n"
@@ -276,7 +368,7 @@ static const char *_TABLE_INIT =
     "        id,\n"
     "            'DISK_ID_' || \n"
     "                SUBSTR('" _DB_ID_PADDING "' || id, \n"
-    "                       -" _DB_ID_FMT_LEN_STR ", " _DB_ID_FMT_LEN_STR ")\n"
+    "                       -MAX(LENGTH(id), " _DB_ID_FMT_LEN_STR "))\n"
     "        lsm_disk_id,\n"
     "            disk_prefix || '_' || id\n"
     "        name,\n"
@@ -296,7 +388,7 @@ static const char *_TABLE_INIT =
     "        id,\n"
     "            'VOL_ID_' || \n"
     "                SUBSTR('" _DB_ID_PADDING "' || id, \n"
-    "                       -" _DB_ID_FMT_LEN_STR ", " _DB_ID_FMT_LEN_STR ")\n"
+    "                       -MAX(LENGTH(id), " _DB_ID_FMT_LEN_STR "))\n"
     "        lsm_vol_id,\n"
     "        vpd83,\n"
     "        name,\n"
@@ -310,7 +402,7 @@ static const char *_TABLE_INIT =
     "        pool_id,\n"
     "            'POOL_ID_' || \n"
     "                SUBSTR('" _DB_ID_PADDING "' || pool_id, \n"
-    "                       -" _DB_ID_FMT_LEN_STR ", " _DB_ID_FMT_LEN_STR ")\n"
+    "                       -MAX(LENGTH(pool_id), " _DB_ID_FMT_LEN_STR "))\n"
     "        lsm_pool_id\n"
     "    FROM\n"
     "        volumes;\n"
@@ -319,7 +411,7 @@ static const char *_TABLE_INIT =
     "        id,\n"
     "            'FS_ID_' || \n"
     "                SUBSTR('" _DB_ID_PADDING "' || id, \n"
-    "                       -" _DB_ID_FMT_LEN_STR ", " _DB_ID_FMT_LEN_STR ")\n"
+    "                       -MAX(LENGTH(id), " _DB_ID_FMT_LEN_STR "))\n"
     "        lsm_fs_id,\n"
     "        name,\n"
     "        total_space,\n"
@@ -328,7 +420,7 @@ static const char *_TABLE_INIT =
     "        pool_id,\n"
     "            'POOL_ID_' || \n"
     "                SUBSTR('" _DB_ID_PADDING "' || pool_id, \n"
-    "                       -" _DB_ID_FMT_LEN_STR ", " _DB_ID_FMT_LEN_STR ")\n"
+    "                       -MAX(LENGTH(pool_id), " _DB_ID_FMT_LEN_STR "))\n"
     "        lsm_pool_id\n"
     "    FROM\n"
     "        " _DB_TABLE_FSS " ;\n"
@@ -337,7 +429,7 @@ static const char *_TABLE_INIT =
     "        id,\n"
     "            'BAT_ID_' || \n"
     "                SUBSTR('" _DB_ID_PADDING "' || id, \n"
-    "                       -" _DB_ID_FMT_LEN_STR ", " _DB_ID_FMT_LEN_STR ")\n"
+    "                       -MAX(LENGTH(id), " _DB_ID_FMT_LEN_STR "))\n"
     "        lsm_bat_id,\n"
     "        name,\n"
     "        type,\n"
@@ -349,14 +441,14 @@ static const char *_TABLE_INIT =
     "        id,\n"
     "            'FS_SNAP_ID_' || \n"
     "                SUBSTR('" _DB_ID_PADDING "' || id, \n"
-    "                       -" _DB_ID_FMT_LEN_STR ", " _DB_ID_FMT_LEN_STR ")\n"
+    "                       -MAX(LENGTH(id), " _DB_ID_FMT_LEN_STR "))\n"
     "        lsm_fs_snap_id,\n"
     "        name,\n"
     "        timestamp,\n"
     "        fs_id,\n"
     "            'FS_ID_' || \n"
     "                SUBSTR('" _DB_ID_PADDING "' || fs_id, \n"
-    "                       -" _DB_ID_FMT_LEN_STR ", " _DB_ID_FMT_LEN_STR ")\n"
+    "                       -MAX(LENGTH(fs_id), " _DB_ID_FMT_LEN_STR "))\n"
     "        lsm_fs_id\n"
     "    FROM\n"
     "        " _DB_TABLE_FS_SNAPS " ;\n"
@@ -365,7 +457,7 @@ static const char *_TABLE_INIT =
     "        vol.id,\n"
     "            'VOL_ID_' || \n"
     "                SUBSTR('" _DB_ID_PADDING "' || vol.id, \n"
-    "                       -" _DB_ID_FMT_LEN_STR ", " _DB_ID_FMT_LEN_STR ")\n"
+    "                       -MAX(LENGTH(vol.id), " _DB_ID_FMT_LEN_STR "))\n"
     "        lsm_vol_id,\n"
     "        vol.vpd83,\n"
     "        vol.name,\n"
@@ -374,7 +466,8 @@ static const char *_TABLE_INIT =
     "        vol.pool_id,\n"
     "            'POOL_ID_' || \n"
     "                SUBSTR('" _DB_ID_PADDING "' || vol.pool_id, \n"
-    "                       -" _DB_ID_FMT_LEN_STR ", " _DB_ID_FMT_LEN_STR ")\n"
+    "                       -MAX(LENGTH(vol.pool_id),\n"
+    "                            " _DB_ID_FMT_LEN_STR "))\n"
     "        lsm_pool_id,\n"
     "        vol.admin_state,\n"
     "        vol.is_hw_raid_vol,\n"
@@ -391,7 +484,7 @@ static const char *_TABLE_INIT =
     "        ag.id,\n"
     "            'AG_ID_' || \n"
     "                SUBSTR('" _DB_ID_PADDING "' || ag.id, \n"
-    "                       -" _DB_ID_FMT_LEN_STR ", " _DB_ID_FMT_LEN_STR ")\n"
+    "                       -MAX(LENGTH(ag.id), " _DB_ID_FMT_LEN_STR "))\n"
     "        lsm_ag_id,\n"
     "        ag.name,\n"
     "            CASE\n"
@@ -417,7 +510,7 @@ static const char *_TABLE_INIT =
     "        ag_new.id,\n"
     "            'AG_ID_' || \n"
     "                SUBSTR('" _DB_ID_PADDING "' || ag_new.id, \n"
-    "                       -" _DB_ID_FMT_LEN_STR ", " _DB_ID_FMT_LEN_STR ")\n"
+    "                       -MAX(LENGTH(ag_new.id), " _DB_ID_FMT_LEN_STR "))\n"
     "        lsm_ag_id,\n"
     "        ag_new.name,\n"
     "        ag_new.init_type,\n"
@@ -454,12 +547,12 @@ static const char *_TABLE_INIT =
     "        exp.id,\n"
     "            'EXP_ID_' || \n"
     "                SUBSTR('" _DB_ID_PADDING "' || exp.id, \n"
-    "                       -" _DB_ID_FMT_LEN_STR ", " _DB_ID_FMT_LEN_STR ")\n"
+    "                       -MAX(LENGTH(exp.id), " _DB_ID_FMT_LEN_STR "))\n"
     "        lsm_exp_id,\n"
     "        exp.fs_id,\n"
     "            'FS_ID_' || \n"
     "                SUBSTR('" _DB_ID_PADDING "' || exp.fs_id, \n"
-    "                       -" _DB_ID_FMT_LEN_STR ", " _DB_ID_FMT_LEN_STR ")\n"
+    "                       -MAX(LENGTH(exp.fs_id), " _DB_ID_FMT_LEN_STR "))\n"
     "        lsm_fs_id,\n"
     "        exp.exp_path,\n"
     "        exp.auth_type,\n"
@@ -32,7 +32,8 @@
 from lsm.plugin.smispy import smis_ag
 from lsm.plugin.smispy import dmtf
 from lsm.plugin.smispy.utils import (merge_list, handle_cim_errors,
-                                     hex_string_format)
+                                     hex_string_format, cim_path_key,
+                                     cim_assoc_links)
 
 
 # Variable Naming scheme:
@@ -77,6 +78,28 @@
 #   BSP             SNIA SMI-S 'Block Services Package' profile
 #   Group M&M       SNIA SMI-S 'Group Masking and Mapping' profile
 
+# Seconds Smis.target_ports() reuses the target port list before walking the
+# topology again. Target ports only change on hardware reconfiguration.
+_TGT_TOPOLOGY_TTL = 60
+
+# CIM_FCPort['SystemName'] might not be the name of root CIM_ComputerSystem.
+_CIM_FC_TGT_PROS = ['UsageRestriction', 'ElementName', 'SystemName',
+                    'PermanentAddress', 'PortDiscriminator', 'LinkTechnology',
+                    'DeviceID']
+
+_CIM_ISCSI_PG_PROS = ['Role', 'SystemName']
+
+_CIM_IP_PROS = ['IPv4Address', 'IPv6Address', 'SystemName', 'EMCPortNumber',
+                'IPv6AddressType']
+
+_CIM_ETH_PROS = ['PermanentAddress', 'ElementName']
+
+# Errors of enumerating the whole class or association, provider might not
+# support it, fall back to the walk through Associators().
+_TGT_TOPOLOGY_FALLBACK_ERRORS = [
+    wbem.CIM_ERR_NOT_SUPPORTED, wbem.CIM_ERR_INVALID_CLASS,
+    wbem.CIM_ERR_NOT_FOUND]
+
 
 def _lsm_tgt_port_type_of_cim_fc_tgt(cim_fc_tgt):
     """
@@ -95,6 +118,77 @@ def _lsm_tgt_port_type_of_cim_fc_tgt(cim_fc_tgt):
     return TargetPort.TYPE_FC
 
 
+def _sys_name_of_cim_xxx(cim_xxx):
+    """
+    Return the name of hosting CIM_ComputerSystem for CIM_LogicalDevice or
+    CIM_ServiceAccessPoint. Both have 'SystemName' as key property.
+    """
+    if 'SystemName' in cim_xxx.path.keybindings:
+        return cim_xxx.path.keybindings['SystemName']
+    return cim_xxx['SystemName']
+
+
+class _IscsiTgtTopology(object):
+    """
+    Snapshot of the associations walked by Smis._cim_iscsi_pg_to_lsm().
+    Each class and association is enumerated only once and joined in memory
+    by cim_path_key().
+    """
+    def __init__(self, smis_common, cim_iscsi_pgs):
+        pg_keys = set(cim_path_key(x.path) for x in cim_iscsi_pgs)
+
+        self._cim_tcps = _IscsiTgtTopology._index(
+            smis_common.EnumerateInstances(
+                'CIM_TCPProtocolEndpoint', PropertyList=['PortNumber']))
+        self._cim_ips = _IscsiTgtTopology._index(
+            smis_common.EnumerateInstances(
+                'CIM_IPProtocolEndpoint', PropertyList=_CIM_IP_PROS))
+        self._cim_eths = _IscsiTgtTopology._index(
+            smis_common.EnumerateInstances(
+                'CIM_EthernetPort', PropertyList=_CIM_ETH_PROS))
+        self._cim_spcs = _IscsiTgtTopology._index(
+            smis_common.EnumerateInstances(
+                'CIM_SCSIProtocolController',
+                PropertyList=['Name', 'NameFormat']))
+
+        cim_binds_paths = smis_common.EnumerateInstanceNames('CIM_BindsTo')
+        self._tcp_links = cim_assoc_links(
+            cim_binds_paths, pg_keys, self._cim_tcps)
+        self._ip_links = cim_assoc_links(
+            cim_binds_paths, set(self._cim_tcps.keys()), self._cim_ips)
+        self._eth_links = cim_assoc_links(
+            smis_common.EnumerateInstanceNames('CIM_DeviceSAPImplementation'),
+            set(self._cim_ips.keys()), self._cim_eths)
+        self._spc_links = cim_assoc_links(
+            smis_common.EnumerateInstanceNames('CIM_SAPAvailableForElement'),
+            pg_keys, self._cim_spcs)
+
+    @staticmethod
+    def _index(cim_xxxs):
+        return dict((cim_path_key(x.path), x) for x in cim_xxxs)
+
+    @staticmethod
+    def _linked(links, cim_index, cim_path):
+        return list(cim_index[k]
+                    for k in links.get(cim_path_key(cim_path), []))
+
+    def cim_tcps_of(self, cim_iscsi_pg_path):
+        return _IscsiTgtTopology._linked(
+            self._tcp_links, self._cim_tcps, cim_iscsi_pg_path)
+
+    def cim_ips_of(self, cim_tcp_path):
+        return _IscsiTgtTopology._linked(
+            self._ip_links, self._cim_ips, cim_tcp_path)
+
+    def cim_eths_of(self, cim_ip_path):
+        return _IscsiTgtTopology._linked(
+            self._eth_links, self._cim_eths, cim_ip_path)
+
+    def cim_spcs_of(self, cim_iscsi_pg_path):
+        return _IscsiTgtTopology._linked(
+            self._spc_links, self._cim_spcs, cim_iscsi_pg_path)
+
+
 class Smis(IStorageAreaNetwork):
     """
     SMI-S plug-ing which exposes a small subset of the overall provided
@@ -108,6 +202,8 @@ class Smis(IStorageAreaNetwork):
     def __init__(self):
         self._c = None
         self.tmo = 0
+        # (timestamp, list of TargetPort), check target_ports()
+        self._lsm_tgts_cache = None
 
     @handle_cim_errors
     def plugin_register(self, uri, password, timeout, flags=0):
@@ -152,9 +248,14 @@ def plugin_register(self, uri, password, timeout, flags=0):
         if 'debug_path' in u['parameters']:
             debug_path = u['parameters']['debug_path']
 
+        record_path = None
+        if 'record_path' in u['parameters']:
+            record_path = u['parameters']['record_path']
+
         self._c = SmisCommon(
             url, u['username'], password, namespace, no_ssl_verify,
-            debug_path, system_list)
+            debug_path, system_list, record_path)
+        self._lsm_tgts_cache = None
 
         self.tmo = timeout
 
@@ -169,6 +270,7 @@ def time_out_get(self, flags=0):
     @handle_cim_errors
     def plugin_unregister(self, flags=0):
         self._c = None
+        self._lsm_tgts_cache = None
 
     @handle_cim_errors
     def capabilities(self, system, flags=0):
@@ -1284,15 +1386,12 @@ def access_groups(self, search_key=None, search_value=None, flags=0):
                 cim_init_mgs = self._cim_init_mg_of(
                     system_id, cim_init_mg_pros)
                 rc.extend(
-                    list(
-                        smis_ag.cim_init_mg_to_lsm_ag(self._c, x, system_id)
-                        for x in cim_init_mgs))
+                    smis_ag.cim_init_mgs_to_lsm_ags(
+                        self._c, cim_init_mgs, system_id))
             elif mask_type == smis_cap.MASK_TYPE_MASK:
                 cim_spcs = self._cim_spc_of(system_id, cim_spc_pros)
                 rc.extend(
-                    list(
-                        smis_ag.cim_spc_to_lsm_ag(self._c, cim_spc, system_id)
-                        for cim_spc in cim_spcs))
+                    smis_ag.cim_spcs_to_lsm_ags(self._c, cim_spcs, system_id))
             else:
                 raise LsmError(ErrorNumber.PLUGIN_BUG,
                                "_get_cim_spc_by_id(): Got invalid mask_type: "
@@ -1561,7 +1660,7 @@ def _cim_fc_tgt_to_lsm(cim_fc_tgt, system_id):
         return TargetPort(port_id, port_type, wwpn, wwpn, wwpn, port_name,
                           system_id, plugin_data)
 
-    def _iscsi_node_names_of(self, cim_iscsi_pg_path):
+    def _iscsi_node_names_of(self, cim_iscsi_pg_path, topology=None):
         """
             CIM_iSCSIProtocolEndpoint
                     |
@@ -1572,12 +1671,17 @@ def _iscsi_node_names_of(self, cim_iscsi_pg_path):
                     |
                     v
             CIM_SCSIProtocolController  # iSCSI Node
+        Use the _IscsiTgtTopology snapshot instead of Associators() call if
+        defined.
         """
-        cim_spcs = self._c.Associators(
-            cim_iscsi_pg_path,
-            ResultClass='CIM_SCSIProtocolController',
-            AssocClass='CIM_SAPAvailableForElement',
-            PropertyList=['Name', 'NameFormat'])
+        if topology is not None:
+            cim_spcs = topology.cim_spcs_of(cim_iscsi_pg_path)
+        else:
+            cim_spcs = self._c.Associators(
+                cim_iscsi_pg_path,
+                ResultClass='CIM_SCSIProtocolController',
+                AssocClass='CIM_SAPAvailableForElement',
+                PropertyList=['Name', 'NameFormat'])
         cim_iscsi_nodes = []
         for cim_spc in cim_spcs:
             if cim_spc.classname == 'Clar_MappingSCSIProtocolController':
@@ -1616,7 +1720,7 @@ def _cim_iscsi_pg_of(self, cim_sys_path, property_list=None):
                     rc.extend([cim_iscsi_pg])
         return rc
 
-    def _cim_iscsi_pg_to_lsm(self, cim_iscsi_pg, system_id):
+    def _cim_iscsi_pg_to_lsm(self, cim_iscsi_pg, system_id, topology=None):
         """
         Return a list of TargetPort CIM_iSCSIProtocolEndpoint
         Associations:
@@ -1640,33 +1744,41 @@ def _cim_iscsi_pg_to_lsm(self, cim_iscsi_pg, system_id):
         Assuming there is storage array support iSER
         (iSCSI over RDMA of Infinity Band),
         this method is only for iSCSI over TCP.
+        Use the _IscsiTgtTopology snapshot instead of Associators() calls if
+        defined.
         """
         rc = []
         port_type = TargetPort.TYPE_ISCSI
         plugin_data = None
-        cim_tcps = self._c.Associators(
-            cim_iscsi_pg.path,
-            ResultClass='CIM_TCPProtocolEndpoint',
-            AssocClass='CIM_BindsTo',
-            PropertyList=['PortNumber'])
+        if topology is not None:
+            cim_tcps = topology.cim_tcps_of(cim_iscsi_pg.path)
+        else:
+            cim_tcps = self._c.Associators(
+                cim_iscsi_pg.path,
+                ResultClass='CIM_TCPProtocolEndpoint',
+                AssocClass='CIM_BindsTo',
+                PropertyList=['PortNumber'])
         if len(cim_tcps) == 0:
             raise LsmError(ErrorNumber.PLUGIN_BUG,
                            "_cim_iscsi_pg_to_lsm():  "
                            "No CIM_TCPProtocolEndpoint associated to %s"
                            % cim_iscsi_pg.path)
-        iscsi_node_names = self._iscsi_node_names_of(cim_iscsi_pg.path)
+        iscsi_node_names = self._iscsi_node_names_of(
+            cim_iscsi_pg.path, topology)
 
         if len(iscsi_node_names) == 0:
             return []
 
         for cim_tcp in cim_tcps:
             tcp_port = cim_tcp['PortNumber']
-            cim_ips = self._c.Associators(
-                cim_tcp.path,
-                ResultClass='CIM_IPProtocolEndpoint',
-                AssocClass='CIM_BindsTo',
-                PropertyList=['IPv4Address', 'IPv6Address', 'SystemName',
-                              'EMCPortNumber', 'IPv6AddressType'])
+            if topology is not None:
+                cim_ips = topology.cim_ips_of(cim_tcp.path)
+            else:
+                cim_ips = self._c.Associators(
+                    cim_tcp.path,
+                    ResultClass='CIM_IPProtocolEndpoint',
+                    AssocClass='CIM_BindsTo',
+                    PropertyList=_CIM_IP_PROS)
             for cim_ip in cim_ips:
                 ipv4_addr = ''
                 ipv6_addr = ''
@@ -1694,11 +1806,14 @@ def _cim_iscsi_pg_to_lsm(self, cim_iscsi_pg, system_id):
                 if ipv6_addr[0:29] == '0000:0000:0000:0000:0000:0000':
                     ipv6_addr = ''
 
-                cim_eths = self._c.Associators(
-                    cim_ip.path,
-                    ResultClass='CIM_EthernetPort',
-                    AssocClass='CIM_DeviceSAPImplementation',
-                    PropertyList=['PermanentAddress', 'ElementName'])
+                if topology is not None:
+                    cim_eths = topology.cim_eths_of(cim_ip.path)
+                else:
+                    cim_eths = self._c.Associators(
+                        cim_ip.path,
+                        ResultClass='CIM_EthernetPort',
+                        AssocClass='CIM_DeviceSAPImplementation',
+                        PropertyList=_CIM_ETH_PROS)
                 nics = []
                 # NetApp ONTAP cluster-mode show one IP bonded to multiple
                 # ethernet,
@@ -1779,45 +1894,117 @@ def _leaf_cim_syss_path_of(self, cim_sys_path):
                 return []
 
         if len(leaf_cim_syss_path) > 0:
-            rc = leaf_cim_syss_path
+            rc = list(leaf_cim_syss_path)
             for cim_sys_path in leaf_cim_syss_path:
                 rc.extend(self._leaf_cim_syss_path_of(cim_sys_path))
 
         return rc
 
-    @handle_cim_errors
-    def target_ports(self, search_key=None, search_value=None, flags=0):
-        rc = []
-
-        cim_syss = smis_sys.root_cim_sys(
-            self._c, property_list=smis_sys.cim_sys_id_pros())
+    def _root_sys_id_index(self, cim_syss):
+        """
+        Return a dictionary mapping the name of every root and leaf
+        CIM_ComputerSystem to the system ID of its root CIM_ComputerSystem.
+        CIM_ComponentCS is enumerated once instead of walking each system.
+        """
+        rc = {}
         for cim_sys in cim_syss:
             system_id = smis_sys.sys_id_of_cim_sys(cim_sys)
-            flag_fc_support = smis_cap.fc_tgt_is_supported(self._c)
-            flag_iscsi_support = smis_cap.iscsi_tgt_is_supported(self._c)
+            rc[system_id] = system_id
 
-            # Assuming: if one system does not support target_ports(),
-            # all systems from the same provider will not support
-            # target_ports().
-            if flag_fc_support is False and flag_iscsi_support is False:
-                raise LsmError(ErrorNumber.NO_SUPPORT,
-                               "Target SMI-S provider does not support any of"
-                               "these profiles: '%s %s', '%s %s'"
-                               % (SmisCommon.SMIS_SPEC_VER_1_4,
-                                  SmisCommon.SNIA_FC_TGT_PORT_PROFILE,
-                                  SmisCommon.SMIS_SPEC_VER_1_1,
-                                  SmisCommon.SNIA_ISCSI_TGT_PORT_PROFILE))
+        if not smis_cap.multi_sys_is_supported(self._c):
+            return rc
 
+        try:
+            cim_ccs_paths = self._c.EnumerateInstanceNames('CIM_ComponentCS')
+        except wbem.CIMError as ce:
+            error_code = ce.args[0]
+            if error_code == wbem.CIM_ERR_INVALID_CLASS or \
+               error_code == wbem.CIM_ERR_NOT_SUPPORTED:
+                return rc
+            raise
+
+        leaf_names_of = {}
+        for cim_ccs_path in cim_ccs_paths:
+            group_name = \
+                cim_ccs_path.keybindings['GroupComponent'].keybindings['Name']
+            part_name = \
+                cim_ccs_path.keybindings['PartComponent'].keybindings['Name']
+            leaf_names_of.setdefault(group_name, []).append(part_name)
+
+        for root_name in list(rc.keys()):
+            todo = list(leaf_names_of.get(root_name, []))
+            while todo:
+                name = todo.pop()
+                if name in rc:
+                    continue
+                rc[name] = rc[root_name]
+                todo.extend(leaf_names_of.get(name, []))
+        return rc
+
+    def _lsm_tgts_of_topology(self, cim_syss, flag_fc_support,
+                              flag_iscsi_support):
+        """
+        Return a list of TargetPort by enumerating each class once and
+        joining them in memory, in the order of cim_syss.
+        Return None if the association enumeration is incomplete, the caller
+        should walk each CIM_ComputerSystem instead.
+        """
+        sys_id_index = self._root_sys_id_index(cim_syss)
+        lsm_tgts_of_sys = dict(
+            (smis_sys.sys_id_of_cim_sys(x), []) for x in cim_syss)
+
+        if flag_fc_support:
+            cim_fc_tgts = self._c.EnumerateInstances(
+                'CIM_FCPort', PropertyList=_CIM_FC_TGT_PROS)
+            for cim_fc_tgt in cim_fc_tgts:
+                system_id = sys_id_index.get(_sys_name_of_cim_xxx(cim_fc_tgt))
+                if system_id is None or \
+                   not Smis._is_frontend_fc_tgt(cim_fc_tgt):
+                    continue
+                lsm_tgts_of_sys[system_id].append(
+                    Smis._cim_fc_tgt_to_lsm(cim_fc_tgt, system_id))
+
+        if flag_iscsi_support:
+            cim_iscsi_pgs = []
+            for cim_iscsi_pg in self._c.EnumerateInstances(
+                    'CIM_iSCSIProtocolEndpoint',
+                    PropertyList=_CIM_ISCSI_PG_PROS):
+                if cim_iscsi_pg['Role'] != dmtf.ISCSI_TGT_ROLE_TARGET or \
+                   _sys_name_of_cim_xxx(cim_iscsi_pg) not in sys_id_index:
+                    continue
+                cim_iscsi_pgs.append(cim_iscsi_pg)
+
+            if cim_iscsi_pgs:
+                topology = _IscsiTgtTopology(self._c, cim_iscsi_pgs)
+                for cim_iscsi_pg in cim_iscsi_pgs:
+                    # Every portal group should bind to a TCP endpoint, the
+                    # provider does not expose CIM_BindsTo in enumeration.
+                    if not topology.cim_tcps_of(cim_iscsi_pg.path):
+                        return None
+                for cim_iscsi_pg in cim_iscsi_pgs:
+                    system_id = sys_id_index[
+                        _sys_name_of_cim_xxx(cim_iscsi_pg)]
+                    lsm_tgts_of_sys[system_id].extend(
+                        self._cim_iscsi_pg_to_lsm(
+                            cim_iscsi_pg, system_id, topology))
+
+        rc = []
+        for cim_sys in cim_syss:
+            rc.extend(lsm_tgts_of_sys[smis_sys.sys_id_of_cim_sys(cim_sys)])
+        return rc
+
+    def _lsm_tgts_of_walk(self, cim_syss, flag_fc_support,
+                          flag_iscsi_support):
+        """
+        Return a list of TargetPort by walking the associations of each
+        CIM_ComputerSystem.
+        """
+        rc = []
+        for cim_sys in cim_syss:
+            system_id = smis_sys.sys_id_of_cim_sys(cim_sys)
             if flag_fc_support:
-                # CIM_FCPort might be not belong to root cim_sys
-                # In that case, CIM_FCPort['SystemName'] will not be
-                # the name of root CIM_ComputerSystem.
-                cim_fc_tgt_pros = ['UsageRestriction', 'ElementName',
-                                   'SystemName', 'PermanentAddress',
-                                   'PortDiscriminator', 'LinkTechnology',
-                                   'DeviceID']
                 cim_fc_tgts = self._cim_fc_tgt_of(cim_sys.path,
-                                                  cim_fc_tgt_pros)
+                                                  _CIM_FC_TGT_PROS)
                 rc.extend(
                     list(
                         Smis._cim_fc_tgt_to_lsm(x, system_id)
@@ -1828,22 +2015,63 @@ def target_ports(self, search_key=None, search_value=None, flags=0):
                 for cim_iscsi_pg in cim_iscsi_pgs:
                     rc.extend(
                         self._cim_iscsi_pg_to_lsm(cim_iscsi_pg, system_id))
+        return rc
+
+    def _lsm_tgts_get(self):
+        cim_syss = smis_sys.root_cim_sys(
+            self._c, property_list=smis_sys.cim_sys_id_pros())
+        if len(cim_syss) == 0:
+            return []
+
+        flag_fc_support = smis_cap.fc_tgt_is_supported(self._c)
+        flag_iscsi_support = smis_cap.iscsi_tgt_is_supported(self._c)
+
+        # Assuming: if one system does not support target_ports(),
+        # all systems from the same provider will not support
+        # target_ports().
+        if flag_fc_support is False and flag_iscsi_support is False:
+            raise LsmError(ErrorNumber.NO_SUPPORT,
+                           "Target SMI-S provider does not support any of"
+                           "these profiles: '%s %s', '%s %s'"
+                           % (SmisCommon.SMIS_SPEC_VER_1_4,
+                              SmisCommon.SNIA_FC_TGT_PORT_PROFILE,
+                              SmisCommon.SMIS_SPEC_VER_1_1,
+                              SmisCommon.SNIA_ISCSI_TGT_PORT_PROFILE))
+
+        lsm_tgts = None
+        try:
+            lsm_tgts = self._lsm_tgts_of_topology(
+                cim_syss, flag_fc_support, flag_iscsi_support)
+        except wbem.CIMError as ce:
+            if ce.args[0] not in _TGT_TOPOLOGY_FALLBACK_ERRORS:
+                raise
+        if lsm_tgts is None:
+            lsm_tgts = self._lsm_tgts_of_walk(
+                cim_syss, flag_fc_support, flag_iscsi_support)
 
         # NetApp is sharing CIM_TCPProtocolEndpoint which
         # cause duplicate TargetPort. It's a long story, they heard my
         # bug report.
-        if len(cim_syss) >= 1 and \
-           cim_syss[0].classname == 'ONTAP_StorageSystem':
-            id_list = []
-            new_rc = []
-            # We keep the original list order by not using dict.values()
-            for lsm_tp in rc:
-                if lsm_tp.id not in id_list:
-                    id_list.extend([lsm_tp.id])
-                    new_rc.extend([lsm_tp])
-            rc = new_rc
+        # We keep the original list order by not using dict.values()
+        rc = []
+        id_set = set()
+        for lsm_tgt in lsm_tgts:
+            if lsm_tgt.id not in id_set:
+                id_set.add(lsm_tgt.id)
+                rc.append(lsm_tgt)
+        return rc
 
-        return search_property(rc, search_key, search_value)
+    @handle_cim_errors
+    def target_ports(self, search_key=None, search_value=None, flags=0):
+        """
+        The target port list is cached for _TGT_TOPOLOGY_TTL seconds.
+        """
+        now = time.time()
+        if self._lsm_tgts_cache is None or \
+           not 0 <= now - self._lsm_tgts_cache[0] < _TGT_TOPOLOGY_TTL:
+            self._lsm_tgts_cache = (now, self._lsm_tgts_get())
+        return search_property(list(self._lsm_tgts_cache[1]), search_key,
+                               search_value)
 
     def _cim_pep_path_of_fc_tgt(self, cim_fc_tgt_path):
         """
@@ -23,10 +23,18 @@
 from lsm.plugin.smispy.WBEM import wbem
 from lsm.plugin.smispy.smis_common import SmisCommon
 from lsm.plugin.smispy import dmtf
-from lsm.plugin.smispy.utils import cim_path_to_path_str, path_str_to_cim_path
+from lsm.plugin.smispy.utils import (
+    cim_path_to_path_str, path_str_to_cim_path, cim_path_key,
+    cim_assoc_links)
 
 _CIM_INIT_PROS = ['StorageID', 'IDType']
 
+# CIM errors of association enumeration which make bulk access group
+# builders fall back to per group queries.
+_BULK_FALLBACK_ERRORS = [wbem.CIM_ERR_NOT_SUPPORTED,
+                         wbem.CIM_ERR_INVALID_CLASS,
+                         wbem.CIM_ERR_NOT_FOUND]
+
 
 def _init_id_and_type_of(cim_inits):
     """
@@ -129,13 +137,15 @@ def cim_init_of_cim_spc_path(smis_common, cim_spc_path):
     return cim_inits
 
 
-def cim_spc_to_lsm_ag(smis_common, cim_spc, system_id):
+def cim_spc_to_lsm_ag(smis_common, cim_spc, system_id, cim_inits=None):
     """
     Convert CIM_SCSIProtocolController to lsm.AccessGroup
+    If cim_inits is None, query the CIM_StorageHardwareID of cim_spc.
     """
     ag_id = md5(cim_spc['DeviceID'])
     ag_name = cim_spc['ElementName']
-    cim_inits = cim_init_of_cim_spc_path(smis_common, cim_spc.path)
+    if cim_inits is None:
+        cim_inits = cim_init_of_cim_spc_path(smis_common, cim_spc.path)
     (init_ids, init_type) = _init_id_and_type_of(cim_inits)
     plugin_data = cim_path_to_path_str(cim_spc.path)
     return AccessGroup(
@@ -159,19 +169,149 @@ def cim_init_of_cim_init_mg_path(smis_common, cim_init_mg_path):
         PropertyList=_CIM_INIT_PROS)
 
 
-def cim_init_mg_to_lsm_ag(smis_common, cim_init_mg, system_id):
+def cim_init_mg_to_lsm_ag(smis_common, cim_init_mg, system_id,
+                          cim_inits=None):
     """
     Convert CIM_InitiatorMaskingGroup to lsm.AccessGroup
+    If cim_inits is None, query the CIM_StorageHardwareID of cim_init_mg.
     """
     ag_name = cim_init_mg['ElementName']
     ag_id = md5(cim_init_mg['InstanceID'])
-    cim_inits = cim_init_of_cim_init_mg_path(smis_common, cim_init_mg.path)
+    if cim_inits is None:
+        cim_inits = cim_init_of_cim_init_mg_path(
+            smis_common, cim_init_mg.path)
     (init_ids, init_type) = _init_id_and_type_of(cim_inits)
     plugin_data = cim_path_to_path_str(cim_init_mg.path)
     return AccessGroup(
         ag_id, ag_name, init_ids, init_type, system_id, plugin_data)
 
 
+def _cim_init_index(smis_common):
+    """
+    Return a dictionary of all CIM_StorageHardwareID:
+        {
+            cim_path_key(cim_init.path): cim_init,
+        }
+    Only contain ['StorageID', 'IDType'] property.
+    """
+    return dict(
+        (cim_path_key(cim_init.path), cim_init)
+        for cim_init in smis_common.EnumerateInstances(
+            'CIM_StorageHardwareID', PropertyList=_CIM_INIT_PROS))
+
+
+def _cim_init_mg_inits_bulk(smis_common, cim_init_mgs):
+    """
+    Return a list of CIM_StorageHardwareID lists in the order of
+    cim_init_mgs, like cim_init_of_cim_init_mg_path() does but joining the
+    CIM_MemberOfCollection instances locally.
+    """
+    cim_init_index = _cim_init_index(smis_common)
+    mg_keys = list(cim_path_key(x.path) for x in cim_init_mgs)
+    links = cim_assoc_links(
+        smis_common.EnumerateInstanceNames('CIM_MemberOfCollection'),
+        set(mg_keys), cim_init_index)
+    return list(
+        list(cim_init_index[k] for k in links.get(mg_key, []))
+        for mg_key in mg_keys)
+
+
+def _cim_spc_inits_bulk(smis_common, cim_spcs):
+    """
+    Return a list of CIM_StorageHardwareID lists in the order of cim_spcs,
+    like cim_init_of_cim_spc_path() does but joining the association
+    instances locally:
+     * Method A: CIM_AssociatedPrivilege
+     * Method B: CIM_AuthorizedTarget and CIM_AuthorizedSubject, only
+                 enumerated if any SPC got no initiator from method A.
+    """
+    cim_init_index = _cim_init_index(smis_common)
+    spc_keys = list(cim_path_key(x.path) for x in cim_spcs)
+    spc_key_set = set(spc_keys)
+    spc_links = {}
+
+    if smis_common.profile_check(SmisCommon.SNIA_MASK_PROFILE,
+                                 SmisCommon.SMIS_SPEC_VER_1_6,
+                                 raise_error=False):
+        try:
+            spc_links = cim_assoc_links(
+                smis_common.EnumerateInstanceNames(
+                    'CIM_AssociatedPrivilege'),
+                spc_key_set, cim_init_index)
+        except wbem.CIMError as cim_error:
+            if cim_error.args[0] == wbem.CIM_ERR_NOT_FOUND:
+                pass
+            else:
+                raise
+
+    if len(spc_links) != len(spc_key_set):
+        spc_aps = cim_assoc_links(
+            smis_common.EnumerateInstanceNames('CIM_AuthorizedTarget'),
+            spc_key_set, None)
+        ap_keys = set(k for v in spc_aps.values() for k in v)
+        ap_inits = cim_assoc_links(
+            smis_common.EnumerateInstanceNames('CIM_AuthorizedSubject'),
+            ap_keys, cim_init_index)
+        for spc_key, spc_ap_keys in spc_aps.items():
+            if spc_key in spc_links:
+                continue
+            spc_links[spc_key] = list(
+                init_key
+                for ap_key in spc_ap_keys
+                for init_key in ap_inits.get(ap_key, []))
+
+    return list(
+        list(cim_init_index[k] for k in spc_links.get(spc_key, []))
+        for spc_key in spc_keys)
+
+
+def cim_init_mgs_to_lsm_ags(smis_common, cim_init_mgs, system_id):
+    """
+    Convert a list of CIM_InitiatorMaskingGroup to lsm.AccessGroup.
+    The initiators of all groups are retrieved by enumerating
+    CIM_StorageHardwareID and CIM_MemberOfCollection once instead of one
+    Associators() call per group.
+    Fall back to per group query if the bulk enumeration is not supported.
+    """
+    if len(cim_init_mgs) <= 1:
+        return list(
+            cim_init_mg_to_lsm_ag(smis_common, x, system_id)
+            for x in cim_init_mgs)
+    try:
+        cim_inits_list = _cim_init_mg_inits_bulk(smis_common, cim_init_mgs)
+    except wbem.CIMError as cim_error:
+        if cim_error.args[0] in _BULK_FALLBACK_ERRORS:
+            cim_inits_list = [None] * len(cim_init_mgs)
+        else:
+            raise
+    return list(
+        cim_init_mg_to_lsm_ag(smis_common, x, system_id, cim_inits)
+        for x, cim_inits in zip(cim_init_mgs, cim_inits_list))
+
+
+def cim_spcs_to_lsm_ags(smis_common, cim_spcs, system_id):
+    """
+    Convert a list of CIM_SCSIProtocolController to lsm.AccessGroup.
+    The initiators of all SPCs are retrieved by enumerating
+    CIM_StorageHardwareID and the association instances once instead of
+    several Associators() calls per SPC.
+    Fall back to per SPC query if the bulk enumeration is not supported.
+    """
+    if len(cim_spcs) <= 1:
+        return list(
+            cim_spc_to_lsm_ag(smis_common, x, system_id) for x in cim_spcs)
+    try:
+        cim_inits_list = _cim_spc_inits_bulk(smis_common, cim_spcs)
+    except wbem.CIMError as cim_error:
+        if cim_error.args[0] in _BULK_FALLBACK_ERRORS:
+            cim_inits_list = [None] * len(cim_spcs)
+        else:
+            raise
+    return list(
+        cim_spc_to_lsm_ag(smis_common, x, system_id, cim_inits)
+        for x, cim_inits in zip(cim_spcs, cim_inits_list))
+
+
 def lsm_ag_to_cim_spc_path(smis_common, lsm_ag):
     """
     Convert lsm.AccessGroup to CIMInstanceName of CIM_SCSIProtocolController
@@ -25,6 +25,7 @@
 import datetime
 import time
 import sys
+import json
 import six
 
 from lsm import LsmError, ErrorNumber, md5
@@ -146,6 +147,57 @@ def _profile_spec_ver_to_num(spec_ver_str):
     return None
 
 
+class _WbemRecorder(object):
+    """
+    Wrap WBEMConnection to append the CIM-XML request and reply of every
+    CIM operation to the record file, one JSON object per line:
+        {"request": "<CIM-XML>", "reply": "<CIM-XML>"}
+    The file could be served back by test/smispy_bench.py.
+    Only pywbem provides the last request and reply.
+    """
+    def __init__(self, wbem_conn, record_path):
+        object.__setattr__(self, '_wbem_conn', wbem_conn)
+        object.__setattr__(self, '_record_path', record_path)
+        wbem_conn.debug = True
+
+    def __setattr__(self, name, value):
+        setattr(self._wbem_conn, name, value)
+
+    def __getattr__(self, name):
+        attr = getattr(self._wbem_conn, name)
+        if name[0].isupper() and callable(attr):
+            def _recorded(*args, **kwargs):
+                try:
+                    return attr(*args, **kwargs)
+                finally:
+                    self._record()
+            return _recorded
+        return attr
+
+    @staticmethod
+    def _last_xml(wbem_conn, name):
+        # The raw XML is preferred over the pretty printed one.
+        xml = getattr(wbem_conn, 'last_raw_%s' % name, None) or \
+            getattr(wbem_conn, 'last_%s' % name, None)
+        if isinstance(xml, six.binary_type):
+            xml = xml.decode('utf-8')
+        return xml
+
+    def _record(self):
+        try:
+            request = _WbemRecorder._last_xml(self._wbem_conn, 'request')
+            reply = _WbemRecorder._last_xml(self._wbem_conn, 'reply')
+            if not request or not reply:
+                return
+            with open(self._record_path, 'a') as record_file:
+                record_file.write(
+                    json.dumps({'request': request, 'reply': reply}))
+                record_file.write('\n')
+        except Exception:
+            # Recording is best effort, like _dump_wbem_xml().
+            pass
+
+
 class SmisCommon(object):
     # Even many CIM_XXX_Service in DMTF shared the same return value
     # definition as SNIA do, but there is no DMTF standard motioned
@@ -188,7 +240,8 @@ class SmisCommon(object):
 
     def __init__(self, url, username, password,
                  namespace=dmtf.DEFAULT_NAMESPACE,
-                 no_ssl_verify=False, debug_path=None, system_list=None):
+                 no_ssl_verify=False, debug_path=None, system_list=None,
+                 record_path=None):
         self._wbem_conn = None
         self._profile_dict = {}
         self.root_blk_cim_rp = None    # For root_cim_
@@ -214,6 +267,9 @@ def __init__(self, url, username, password,
         if debug_path is not None:
             self._wbem_conn.debug = True
 
+        if record_path is not None:
+            self._wbem_conn = _WbemRecorder(self._wbem_conn, record_path)
+
         if namespace.lower() == SmisCommon._MEGARAID_NAMESPACE.lower():
             # Skip profile register check on MegaRAID for better performance.
             # MegaRAID SMI-S profile support status will not change for a
@@ -97,3 +97,41 @@ def path_str_to_cim_path(path_str):
     """
     path_dict = json.loads(path_str)
     return wbem.CIMInstanceName(**path_dict)
+
+
+def cim_path_key(cim_path):
+    """
+    Return a hashable identity of CIMInstanceName. The host and namespace
+    are ignored as references in association might not include them.
+    """
+    return (cim_path.classname.lower(),
+            tuple(sorted((k.lower(), str(v))
+                         for k, v in cim_path.keybindings.items())))
+
+
+def cim_assoc_links(cim_assoc_paths, left_keys, right_keys):
+    """
+    Return a dictionary:
+        {
+            left_key: [right_key, ...],
+        }
+    for every association instance name in cim_assoc_paths referring to
+    both a path of left_keys and a path of right_keys. If right_keys is
+    None, any other referenced path is accepted.
+    The keys are generated by cim_path_key().
+    """
+    rc = {}
+    for cim_assoc_path in cim_assoc_paths:
+        left_key = None
+        right_key = None
+        for value in cim_assoc_path.keybindings.values():
+            if not isinstance(value, wbem.CIMInstanceName):
+                continue
+            key = cim_path_key(value)
+            if key in left_keys:
+                left_key = key
+            elif right_keys is None or key in right_keys:
+                right_key = key
+        if left_key is not None and right_key is not None:
+            rc.setdefault(left_key, []).append(right_key)
+    return rc
@@ -73,6 +73,7 @@ class TargetdError(Exception):
     EXISTS_INITIATOR = 52
     NO_FREE_HOST_LUN_ID = 1000
     EMPTY_ACCESS_GROUP = 511
+    INVALID_POOL = 110
 
     def __init__(self, errno, reason, *args, **kwargs):
         Exception.__init__(self, *args, **kwargs)
@@ -122,6 +123,8 @@ def __init__(self):
         self.url = None
         self.headers = None
         self._flag_ag_support = True
+        # Lowest host LUN ID which might be free, check _h_lun_id_alloc().
+        self._h_lun_id_next = 0
         self.system = System("targetd", "targetd storage appliance",
                              System.STATUS_UNKNOWN, '')
 
@@ -246,18 +249,36 @@ def _uuid_to_vpd83(uuid):
 
         return vpd83
 
+    def _tgt_vol_to_lsm(self, tgt_vol, pool_name):
+        vpd83 = TargetdStorage._uuid_to_vpd83(tgt_vol['uuid'])
+        return Volume(tgt_vol['uuid'], tgt_vol['name'], vpd83, 512,
+                      long(int_div(tgt_vol['size'], 512)),
+                      Volume.ADMIN_STATE_ENABLED, self.system.id, pool_name)
+
+    def _lsm_vols_of_pool(self, pool_name):
+        """
+        Return a list of lsm.Volume in defined pool, or empty list if pool
+        not found. Other errors are raised.
+        """
+        try:
+            return list(
+                self._tgt_vol_to_lsm(v, pool_name)
+                for v in self._jsonrequest(
+                    "vol_list", dict(pool=pool_name),
+                    default_error_handler=False))
+        except TargetdError as te:
+            if te.errno == TargetdError.INVALID_POOL:
+                return []
+            TargetdStorage._default_error_handler(te.errno, te.reason)
+            raise
+
     @handle_errors
     def volumes(self, search_key=None, search_value=None, flags=0):
         volumes = []
         for p_name in (p['name'] for p in self._jsonrequest("pool_list") if
                        p['type'] == 'block'):
             for vol in self._jsonrequest("vol_list", dict(pool=p_name)):
-                vpd83 = TargetdStorage._uuid_to_vpd83(vol['uuid'])
-                volumes.append(
-                    Volume(vol['uuid'], vol['name'], vpd83, 512,
-                           long(int_div(vol['size'], 512)),
-                           Volume.ADMIN_STATE_ENABLED,
-                           self.system.id, p_name))
+                volumes.append(self._tgt_vol_to_lsm(vol, p_name))
         return search_property(volumes, search_key, search_value)
 
     @handle_errors
@@ -330,6 +351,28 @@ def _lsm_ag_of_id(self, ag_id, lsm_error_obj=None):
         if lsm_error_obj:
             raise lsm_error_obj
 
+    def _lsm_ag_check(self, ag_id, lsm_error_obj):
+        """
+        Raise provided error if access group not found.
+        Unlike _lsm_ag_of_id(), only query the kind of access group
+        requested: initiator simulated one or real one.
+        """
+        if self._flag_ag_support is False:
+            self._lsm_ag_of_id(ag_id, lsm_error_obj)
+            return
+
+        if ag_id.startswith(TargetdStorage._FAKE_AG_PREFIX):
+            for tgt_init in self._jsonrequest(
+                    'initiator_list', {'standalone_only': True}):
+                if ag_id == "%s%s" % (TargetdStorage._FAKE_AG_PREFIX,
+                                      md5(tgt_init['init_id'])):
+                    return
+        else:
+            for tgt_ag in self._jsonrequest('access_group_list'):
+                if ag_id == tgt_ag['name']:
+                    return
+        raise lsm_error_obj
+
     @handle_errors
     def access_group_create(self, name, init_id, init_type, system, flags=0):
         if system.id != self.system.id:
@@ -487,22 +530,53 @@ def _tgt_masks(self):
 
         return tgt_masks
 
-    def _is_masked(self, ag_id, pool_name, vol_name, tgt_masks=None):
+    @staticmethod
+    def _tgt_mask_index(tgt_masks):
+        """
+        Return a dictionary:
+            {
+                (pool_name, vol_name, ag_id): h_lun_id,
+            }
+        """
+        return dict(
+            ((m['pool_name'], m['vol_name'], m['ag_id']), m['h_lun_id'])
+            for m in tgt_masks)
+
+    def _is_masked(self, ag_id, pool_name, vol_name, tgt_mask_index=None):
         """
         Check whether volume is masked to certain access group.
         Return True or False
         """
-        if tgt_masks is None:
-            tgt_masks = self._tgt_masks()
-        return list(
-            m for m in tgt_masks
-            if (m['vol_name'] == vol_name and
-                m['pool_name'] == pool_name and
-                m['ag_id'] == ag_id)) != []
-
-    def _lsm_vol_of_id(self, vol_id, error=None):
+        if tgt_mask_index is None:
+            tgt_mask_index = TargetdStorage._tgt_mask_index(
+                self._tgt_masks())
+        return (pool_name, vol_name, ag_id) in tgt_mask_index
+
+    def _h_lun_id_alloc(self, used_h_lun_ids):
+        """
+        Return the lowest free host LUN ID not lower than the last
+        allocated one or None if all are used.
+        The scan restarts from 0 when reaching the end as other sessions
+        might have unmasked volumes.
+        """
+        h_lun_id_count = TargetdStorage._MAX_H_LUN_ID + 1
+        for i in range(h_lun_id_count):
+            h_lun_id = (self._h_lun_id_next + i) % h_lun_id_count
+            if h_lun_id not in used_h_lun_ids:
+                self._h_lun_id_next = h_lun_id + 1
+                return h_lun_id
+        return None
+
+    def _lsm_vol_of_id(self, vol_id, error=None, pool_name=None):
+        """
+        When pool_name is defined, only query volumes of that pool.
+        """
+        if pool_name is None:
+            lsm_vols = self.volumes()
+        else:
+            lsm_vols = self._lsm_vols_of_pool(pool_name)
         try:
-            return list(v for v in self.volumes() if v.id == vol_id)[0]
+            return list(v for v in lsm_vols if v.id == vol_id)[0]
         except IndexError:
             if error:
                 raise error
@@ -511,7 +585,7 @@ def _lsm_vol_of_id(self, vol_id, error=None):
 
     @handle_errors
     def volume_mask(self, access_group, volume, flags=0):
-        self._lsm_ag_of_id(
+        self._lsm_ag_check(
             access_group.id,
             LsmError(
                 ErrorNumber.NOT_FOUND_ACCESS_GROUP, "Access group not found"))
@@ -519,29 +593,28 @@ def volume_mask(self, access_group, volume, flags=0):
         self._lsm_vol_of_id(
             volume.id,
             LsmError(
-                ErrorNumber.NOT_FOUND_VOLUME, "Volume not found"))
+                ErrorNumber.NOT_FOUND_VOLUME, "Volume not found"),
+            volume.pool_id)
 
         tgt_masks = self._tgt_masks()
         if self._is_masked(
-                access_group.id, volume.pool_id, volume.name, tgt_masks):
+                access_group.id, volume.pool_id, volume.name,
+                TargetdStorage._tgt_mask_index(tgt_masks)):
             raise LsmError(
                 ErrorNumber.NO_STATE_CHANGE,
                 "Volume is already masked to requested access group")
 
         if access_group.id.startswith(TargetdStorage._FAKE_AG_PREFIX):
-            free_h_lun_ids = (
-                set(range(TargetdStorage._MAX_H_LUN_ID + 1)) -
-                set([m['h_lun_id'] for m in tgt_masks]))
+            h_lun_id = self._h_lun_id_alloc(
+                set(m['h_lun_id'] for m in tgt_masks))
 
-            if len(free_h_lun_ids) == 0:
+            if h_lun_id is None:
                 # TODO(Gris Ge): Add SYSTEM_LIMIT error into API
                 raise LsmError(
                     ErrorNumber.PLUGIN_BUG,
                     "System limit: targetd only allows %s LUN masked" %
                     TargetdStorage._MAX_H_LUN_ID)
 
-            h_lun_id = free_h_lun_ids.pop()
-
             self._jsonrequest(
                 "export_create",
                 {
@@ -564,7 +637,7 @@ def volume_mask(self, access_group, volume, flags=0):
 
     @handle_errors
     def volume_unmask(self, access_group, volume, flags=0):
-        self._lsm_ag_of_id(
+        self._lsm_ag_check(
             access_group.id,
             LsmError(
                 ErrorNumber.NOT_FOUND_ACCESS_GROUP, "Access group not found"))
@@ -572,18 +645,24 @@ def volume_unmask(self, access_group, volume, flags=0):
         self._lsm_vol_of_id(
             volume.id,
             LsmError(
-                ErrorNumber.NOT_FOUND_VOLUME, "Volume not found"))
+                ErrorNumber.NOT_FOUND_VOLUME, "Volume not found"),
+            volume.pool_id)
 
         # Pre-check if already unmasked
-        if not self._is_masked(access_group.id, volume.pool_id, volume.name):
+        tgt_mask_index = TargetdStorage._tgt_mask_index(self._tgt_masks())
+        if not self._is_masked(access_group.id, volume.pool_id, volume.name,
+                               tgt_mask_index):
             raise LsmError(ErrorNumber.NO_STATE_CHANGE,
                            "Volume is not masked to requested access group")
+        h_lun_id = tgt_mask_index[
+            (volume.pool_id, volume.name, access_group.id)]
 
         if access_group.id.startswith(TargetdStorage._FAKE_AG_PREFIX):
             self._jsonrequest("export_destroy",
                               dict(pool=volume.pool_id,
                                    vol=volume.name,
                                    initiator_wwn=access_group.init_ids[0]))
+            self._h_lun_id_next = min(self._h_lun_id_next, h_lun_id)
         else:
             self._jsonrequest(
                 "access_group_map_destroy",
@@ -599,19 +678,22 @@ def volume_unmask(self, access_group, volume, flags=0):
     def volumes_accessible_by_access_group(self, access_group, flags=0):
         tgt_masks = self._tgt_masks()
 
-        vol_infos = list(
-            [m['vol_name'], m['pool_name']]
+        vol_infos = set(
+            (m['vol_name'], m['pool_name'])
             for m in tgt_masks
             if m['ag_id'] == access_group.id)
 
         if len(vol_infos) == 0:
             return []
 
+        # Only query the pools holding masked volumes.
         rc_lsm_vols = []
-        return list(
-            lsm_vol
-            for lsm_vol in self.volumes(flags=flags)
-            if [lsm_vol.name, lsm_vol.pool_id] in vol_infos)
+        for pool_name in sorted(set(p for (v, p) in vol_infos)):
+            rc_lsm_vols.extend(
+                lsm_vol
+                for lsm_vol in self._lsm_vols_of_pool(pool_name)
+                if (lsm_vol.name, lsm_vol.pool_id) in vol_infos)
+        return rc_lsm_vols
 
     @handle_errors
     def access_groups_granted_to_volume(self, volume, flags=0):
@@ -629,12 +711,7 @@ def _get_volume(self, pool_id, volume_name):
         vol = [v for v in self._jsonrequest("vol_list", dict(pool=pool_id))
                if v['name'] == volume_name][0]
 
-        vpd83 = TargetdStorage._uuid_to_vpd83(vol['uuid'])
-        return Volume(vol['uuid'], vol['name'], vpd83, 512,
-                      int_div(vol['size'], 512),
-                      Volume.ADMIN_STATE_ENABLED,
-                      self.system.id,
-                      pool_id)
+        return self._tgt_vol_to_lsm(vol, pool_id)
 
     def _get_fs(self, pool_id, fs_name):
         fs = self.fs()
@@ -12,6 +12,8 @@
 # You should have received a copy of the GNU Lesser General Public
 # License along with this library; If not, see <http://www.gnu.org/licenses/>.
 
+import sys
+
 from lsm.version import VERSION
 
 from lsm._common import error, info, LsmError, ErrorNumber, \
@@ -27,6 +29,9 @@
     INetworkAttachedStorage, INfs
 
 from lsm._client import Client
+from lsm._fleet import fleet_inventory
+if sys.version_info >= (3, 5):
+    from lsm._async_client import AsyncClient
 from lsm._pluginrunner import PluginRunner, search_property
 
 __all__ = []
@@ -0,0 +1,402 @@
+# Copyright (C) 2016 Red Hat, Inc.
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; If not, see <http://www.gnu.org/licenses/>.
+
+# Requires python 3.5 or later, lsm/__init__.py only imports this module on
+# such python. asyncio is imported on first use, not at module import, so
+# plug-ins importing lsm do not pay for it.
+
+import json
+import os
+import time
+
+from lsm import (LsmError, ErrorNumber, JobStatus, IStorageAreaNetwork, INfs,
+                 uri_parse)
+from lsm._iplugin import _JOB_WAIT_INTERVAL_MIN, _JOB_WAIT_INTERVAL_MAX
+from lsm._client import (Client, _LIST_METHODS, _ARG_CHECKS, _batch_error,
+                         _check_search_key, _raise_no_daemon)
+from lsm._common import SocketEOF as _SocketEOF
+from lsm._data import DataDecoder as _DataDecoder
+from lsm._data import DataEncoder as _DataEncoder
+from lsm._transport import RpcStats as _RpcStats
+from lsm._transport import TransPort as _TransPort
+
+# Methods of lsm.Client which are not part of lsm._iplugin but are sent to
+# plug-in as RPC with the same name.
+_CLIENT_RPC_METHODS = [
+    'batteries',
+    'disks',
+    'plugin_rpc_stats_get',
+    'pool_member_info',
+    'system_read_cache_pct_update',
+    'volume_cache_info',
+    'volume_ident_led_off',
+    'volume_ident_led_on',
+    'volume_physical_disk_cache_update',
+    'volume_raid_create',
+    'volume_raid_create_cap_get',
+    'volume_raid_info',
+    'volume_read_cache_policy_update',
+    'volume_write_cache_policy_update',
+]
+
+# List method name -> supported search keys
+_SEARCH_KEYS = dict(
+    (method, lsm_class.SUPPORTED_SEARCH_KEYS)
+    for lsm_class, method in _LIST_METHODS.items()
+    if hasattr(lsm_class, 'SUPPORTED_SEARCH_KEYS'))
+
+
+def _rpc_method_names():
+    """
+    Return the names of the RPC methods offered by plug-ins.
+    """
+    names = set(_CLIENT_RPC_METHODS)
+    for interface in (IStorageAreaNetwork, INfs):
+        for name in dir(interface):
+            if not name.startswith('_') and \
+               callable(getattr(interface, name)):
+                names.add(name)
+    names.discard('plugin_register')
+    return sorted(names)
+
+
+def _signature(func):
+    """
+    Return the argument names(without self) and a dictionary of default
+    values of the lsm.Client method.
+    """
+    while hasattr(func, '__wrapped__'):
+        func = func.__wrapped__
+    code = func.__code__
+    arg_names = code.co_varnames[1:code.co_argcount]
+    defaults = func.__defaults__ or ()
+    return (arg_names,
+            dict(zip(arg_names[len(arg_names) - len(defaults):], defaults)))
+
+
+def _params_bind(method, arg_names, defaults, args, kwargs):
+    """
+    Map the positional and keyword arguments of a call to the RPC parameters
+    dictionary, raise TypeError like python does for mismatching arguments.
+    """
+    if len(args) > len(arg_names):
+        raise TypeError("%s() takes at most %d arguments (%d given)" %
+                        (method, len(arg_names), len(args)))
+    params = dict(zip(arg_names, args))
+    for key, value in kwargs.items():
+        if key not in arg_names:
+            raise TypeError("%s() got an unexpected keyword argument '%s'" %
+                            (method, key))
+        if key in params:
+            raise TypeError("%s() got multiple values for argument '%s'" %
+                            (method, key))
+        params[key] = value
+    for key in arg_names:
+        if key not in params:
+            if key not in defaults:
+                raise TypeError("%s() missing required argument: '%s'" %
+                                (method, key))
+            params[key] = defaults[key]
+    return params
+
+
+def _rpc_method(name):
+    (arg_names, defaults) = _signature(getattr(Client, name))
+    arg_check = _ARG_CHECKS.get(name)
+    supported_keys = _SEARCH_KEYS.get(name)
+
+    async def method(self, *args, **kwargs):
+        params = _params_bind(name, arg_names, defaults, args, kwargs)
+        if supported_keys is not None:
+            _check_search_key(params.get('search_key'), supported_keys)
+        if arg_check is not None:
+            arg_check(**params)
+        return await self._rpc(name, params)
+
+    method.__name__ = name
+    method.__qualname__ = 'AsyncClient.%s' % name
+    method.__doc__ = getattr(Client, name).__doc__
+    return method
+
+
+class AsyncClient(object):
+    """
+    asyncio version of lsm.Client, talking to the plug-in through lsmd with
+    the same protocol. All the RPC methods of lsm.Client are coroutines of
+    the same name and arguments here:
+
+        async with lsm.AsyncClient('sim://') as client:
+            volumes = await client.volumes()
+
+    Or without context manager:
+
+        client = await lsm.AsyncClient('sim://').open()
+        ...
+        await client.close()
+
+    Each AsyncClient holds its own plug-in connection, the calls on the
+    same AsyncClient are sent one after another, calls on different
+    AsyncClient run concurrently in the same event loop.
+
+    Unlike lsm.Client, the list cache, item_get(), items_iter() and the
+    type checking of the plug-in replies are not provided.
+    Requires python 3.5 or later.
+    """
+    FLAG_RSVD = Client.FLAG_RSVD
+    FLAG_JOB_WAIT_ALL = Client.FLAG_JOB_WAIT_ALL
+
+    def __init__(self, uri, plain_text_password=None, timeout_ms=30000,
+                 flags=FLAG_RSVD):
+        self._uri = uri
+        self._password = plain_text_password
+        self._timeout = timeout_ms
+        self._flags = flags
+        self._reader = None
+        self._writer = None
+        self._lock = None
+        self._binary_frame = False
+        self.plugin_path = None
+        self.stats = _RpcStats()
+
+    async def open(self):
+        """
+        Connect to the plug-in and register, return self.
+        """
+        import asyncio
+
+        u = uri_parse(self._uri, ['scheme'])
+        scheme = u['scheme']
+        if "+" in scheme:
+            scheme = scheme.split("+")[0]
+        self.plugin_path = os.path.join(Client._plugin_uds_path(), scheme)
+
+        if not os.path.exists(self.plugin_path):
+            if Client._check_daemon_exists():
+                raise LsmError(ErrorNumber.PLUGIN_NOT_EXIST,
+                               "Plug-in %s not found!" % self.plugin_path)
+            _raise_no_daemon()
+        if not os.access(self.plugin_path, os.R_OK | os.W_OK):
+            raise LsmError(ErrorNumber.PLUGIN_SOCKET_PERMISSION,
+                           "Permissions are incorrect for IPC socket file")
+
+        try:
+            (self._reader, self._writer) = \
+                await asyncio.open_unix_connection(self.plugin_path)
+        except OSError:
+            raise LsmError(ErrorNumber.PLUGIN_IPC_FAIL,
+                           "Unable to connect to lsmd, daemon started?")
+        self._lock = asyncio.Lock()
+
+        try:
+            await self._rpc('plugin_register',
+                            {'uri': self._uri, 'password': self._password,
+                             'timeout': self._timeout, 'flags': self._flags},
+                            _TransPort.ENCODINGS)
+        except BaseException:
+            self._abort()
+            raise
+        return self
+
+    async def close(self, flags=FLAG_RSVD):
+        """
+        Does an orderly plugin_unregister of the plug-in
+        """
+        try:
+            await self._rpc('plugin_unregister', {'flags': flags})
+        finally:
+            self._abort()
+
+    async def plugin_unregister(self, flags=FLAG_RSVD):
+        """
+        Synonym for close.
+        """
+        await self.close(flags)
+
+    async def __aenter__(self):
+        return await self.open()
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        if self._writer is not None:
+            await self.close()
+
+    def _abort(self):
+        """
+        Close the connection without unregistering the plug-in.
+        """
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+            self._reader = None
+            self._binary_frame = False
+            self.stats.export()
+
+    async def _rpc(self, method, args, encodings=None):
+        import asyncio
+
+        if self._writer is None:
+            raise LsmError(ErrorNumber.TRANSPORT_COMMUNICATION,
+                           "Not connected to the plug-in")
+
+        async with self._lock:
+            start_time = time.time()
+            msg = {'method': method, 'id': 100, 'params': args}
+            if encodings is not None:
+                # Columnar replies are decoded by DataDecoder whatever the
+                # plug-in accepted.
+                msg['encodings'] = encodings
+            data = json.dumps(msg, cls=_DataEncoder).encode('utf-8')
+            encode_time = time.time() - start_time
+            hdr = _TransPort.hdr_pack(len(data), self._binary_frame)
+            hdr_len = _TransPort.hdr_len(self._binary_frame)
+
+            bytes_received = 0
+            decode_time = 0.0
+            failed = True
+            try:
+                # Once the request is sent, the connection is out of sync
+                # if the reply is not fully read, hence any failure or
+                # cancellation in between closes the connection.
+                try:
+                    self._writer.write(hdr)
+                    self._writer.write(data)
+                    await self._writer.drain()
+                    length = _TransPort.hdr_unpack(
+                        await self._reader.readexactly(hdr_len),
+                        self._binary_frame)
+                    reply = await self._reader.readexactly(length)
+                except asyncio.IncompleteReadError:
+                    self._abort()
+                    raise _SocketEOF()
+                except OSError as os_err:
+                    self._abort()
+                    raise LsmError(ErrorNumber.TRANSPORT_COMMUNICATION,
+                                   "Error while communicating with the "
+                                   "plug-in", str(os_err))
+                except BaseException:
+                    self._abort()
+                    raise
+                bytes_received = hdr_len + length
+
+                decode_start = time.time()
+                resp = json.loads(reply.decode('utf-8'), cls=_DataDecoder)
+                decode_time = time.time() - decode_start
+                if 'result' not in resp:
+                    raise LsmError(**resp['error'])
+                if encodings is not None:
+                    self._binary_frame = \
+                        _TransPort.ENCODING_BINARY_FRAME in \
+                        resp.get('encodings', [])
+                failed = False
+                return resp['result']
+            finally:
+                self.stats.record(method, time.time() - start_time,
+                                  encode_time, decode_time, 0.0,
+                                  len(hdr) + len(data), bytes_received,
+                                  failed)
+
+    def rpc_stats_get(self):
+        """
+        Return the statistics of the RPC calls sent by this client, refer to
+        lsm.Client.rpc_stats_get() for the format.
+        """
+        return self.stats.get()
+
+    async def job_wait(self, job_ids, timeout=None, flags=FLAG_RSVD):
+        import asyncio
+
+        try:
+            return await self._rpc(
+                'job_wait',
+                {'job_ids': job_ids, 'timeout': timeout, 'flags': flags})
+        except LsmError as lsm_err:
+            if lsm_err.code != ErrorNumber.NO_SUPPORT:
+                raise
+
+        # Plugin does not support job_wait, poll in client instead.
+        deadline = None
+        if timeout is not None:
+            deadline = time.time() + timeout / 1000.0
+        interval = _JOB_WAIT_INTERVAL_MIN
+
+        while True:
+            rc = []
+            for job_id in job_ids:
+                rc.append(await self.job_status(job_id))
+            finished = list(r[0] != JobStatus.INPROGRESS for r in rc)
+            if flags & AsyncClient.FLAG_JOB_WAIT_ALL:
+                if all(finished):
+                    return rc
+            elif any(finished) or len(job_ids) == 0:
+                return rc
+
+            sleep_time = interval
+            if deadline is not None:
+                sleep_time = min(sleep_time, deadline - time.time())
+                if sleep_time <= 0:
+                    return rc
+            await asyncio.sleep(sleep_time)
+            interval = min(interval * 2, _JOB_WAIT_INTERVAL_MAX)
+
+    job_wait.__doc__ = Client.job_wait.__doc__
+
+    async def volume_create_many(self, requests, flags=FLAG_RSVD):
+        try:
+            results = await self._rpc(
+                'volume_create_many', {'requests': requests, 'flags': flags})
+        except LsmError as lsm_err:
+            if lsm_err.code != ErrorNumber.NO_SUPPORT:
+                raise
+            results = []
+            for (pool, volume_name, size_bytes, provisioning) in requests:
+                try:
+                    (job_id, volume) = await self.volume_create(
+                        pool, volume_name, size_bytes, provisioning, flags)
+                    results.append([job_id, volume, None])
+                except LsmError as item_err:
+                    results.append([None, None, item_err])
+            return results
+
+        return list([job_id, volume, _batch_error(error)]
+                    for (job_id, volume, error) in results)
+
+    volume_create_many.__doc__ = Client.volume_create_many.__doc__
+
+    async def volume_mask_many(self, access_group, volumes,
+                               flags=FLAG_RSVD):
+        try:
+            errors = await self._rpc(
+                'volume_mask_many',
+                {'access_group': access_group, 'volumes': volumes,
+                 'flags': flags})
+        except LsmError as lsm_err:
+            if lsm_err.code != ErrorNumber.NO_SUPPORT:
+                raise
+            errors = []
+            for volume in volumes:
+                try:
+                    await self.volume_mask(access_group, volume, flags)
+                    errors.append(None)
+                except LsmError as item_err:
+                    errors.append(item_err)
+            return errors
+
+        return list(_batch_error(error) for error in errors)
+
+    volume_mask_many.__doc__ = Client.volume_mask_many.__doc__
+
+
+for _name in _rpc_method_names():
+    if _name not in vars(AsyncClient):
+        setattr(AsyncClient, _name, _rpc_method(_name))
+del _name
@@ -21,6 +21,7 @@
 #include <stdbool.h>
 
 #include <libstoragemgmt/libstoragemgmt.h>
+#include <libstoragemgmt/libstoragemgmt_local_disk_private.h>
 
 /*
  *  Following directions from here: http://python3porting.com/cextensions.html
@@ -61,7 +62,9 @@ static PyObject *func_name(PyObject *self, PyObject *args, PyObject *kwargs) \
     if (!PyArg_ParseTupleAndKeywords(args, kwargs, "s", (char **) kwlist, \
                                      &arg)) \
         return NULL; \
+    Py_BEGIN_ALLOW_THREADS \
     rc = c_func_name(arg, &c_rt, &lsm_err); \
+    Py_END_ALLOW_THREADS \
     err_no_obj = PyInt_FromLong(rc); \
     _alloc_check(err_no_obj, flag_no_mem, out); \
     rc_list = PyList_New(3 /* rc_obj, errno, err_str*/); \
@@ -113,7 +116,9 @@ static PyObject *func_name(PyObject *self, PyObject *args, PyObject *kwargs) \
     if (!PyArg_ParseTupleAndKeywords(args, kwargs, "s", (char **) kwlist, \
                                      &disk_path)) \
         return NULL; \
+    Py_BEGIN_ALLOW_THREADS \
     rc = c_func_name(arg, &lsm_err); \
+    Py_END_ALLOW_THREADS \
     err_no_obj = PyInt_FromLong(rc); \
     _alloc_check(err_no_obj, flag_no_mem, out); \
     rc_list = PyList_New(3 /* rc_obj, errno, err_str*/); \
@@ -334,6 +339,34 @@ static const char local_disk_led_status_get_docstring[] =
     "        err_msg (string)\n"
     "            Error message, empty if no error.\n";
 
+static const char local_disk_info_get_docstring[] =
+    "INTERNAL USE ONLY!\n"
+    "\n"
+    "Usage:\n"
+    "    Query VPD83, RPM, link type, serial number and LED status of given\n"
+    "    disk path in single call with GIL released.\n"
+    "    LSM_ERR_NO_SUPPORT on any of them is not treated as error, default\n"
+    "    value will be used instead.\n"
+    "Parameters:\n"
+    "    disk_path (string)\n"
+    "        The disk path, example '/dev/sdb'. Empty string is failure\n"
+    "Returns:\n"
+    "    [[vpd83, rpm, link_type, serial_num, led_status], rc, err_msg]\n"
+    "        vpd83 (string)\n"
+    "            Empty string if not supported.\n"
+    "        rpm (int)\n"
+    "            LSM_DISK_RPM_NO_SUPPORT if not supported.\n"
+    "        link_type (int)\n"
+    "            LSM_DISK_LINK_TYPE_NO_SUPPORT if not supported.\n"
+    "        serial_num (string)\n"
+    "            Empty string if not supported.\n"
+    "        led_status (int)\n"
+    "            LSM_DISK_LED_STATUS_UNKNOWN if not supported.\n"
+    "        rc (integer)\n"
+    "            Error code, lsm.ErrorNumber.OK if no error\n"
+    "        err_msg (string)\n"
+    "            Error message, empty if no error.\n";
+
 static PyObject *local_disk_serial_num_get(PyObject *self, PyObject *args,
                                            PyObject *kwargs);
 
@@ -351,6 +384,8 @@ static PyObject *_lsm_string_list_to_pylist(lsm_string_list *str_list);
 static PyObject *_c_str_to_py_str(const char *str);
 static PyObject *local_disk_led_status_get(PyObject *self, PyObject *args,
                                            PyObject *kwargs);
+static PyObject *local_disk_info_get(PyObject *self, PyObject *args,
+                                     PyObject *kwargs);
 
 _wrapper_no_output(local_disk_ident_led_on, lsm_local_disk_ident_led_on,
                    const char *, disk_path);
@@ -384,6 +419,8 @@ static PyMethodDef _methods[] = {
      METH_VARARGS | METH_KEYWORDS, local_disk_fault_led_off_docstring},
     {"_local_disk_led_status_get",  (PyCFunction) local_disk_led_status_get,
      METH_VARARGS | METH_KEYWORDS, local_disk_led_status_get_docstring},
+    {"_local_disk_info_get",  (PyCFunction) local_disk_info_get,
+     METH_VARARGS | METH_KEYWORDS, local_disk_info_get_docstring},
     {NULL, NULL, 0, NULL}        /* Sentinel */
 };
 
@@ -485,6 +522,86 @@ static PyObject *local_disk_list(PyObject *self, PyObject *args,
     return rc_list;
 }
 
+static PyObject *local_disk_info_get(PyObject *self, PyObject *args,
+                                     PyObject *kwargs)
+{
+    static const char *kwlist[] = {"disk_path", NULL};
+    const char *disk_path = NULL;
+    char *vpd83 = NULL;
+    char *serial_num = NULL;
+    int32_t rpm = LSM_DISK_RPM_NO_SUPPORT;
+    lsm_disk_link_type link_type = LSM_DISK_LINK_TYPE_NO_SUPPORT;
+    uint32_t led_status = LSM_DISK_LED_STATUS_UNKNOWN;
+    lsm_error *lsm_err = NULL;
+    int rc = LSM_ERR_OK;
+    PyObject *rc_list = NULL;
+    PyObject *rc_obj = NULL;
+    PyObject *err_msg_obj = NULL;
+    PyObject *err_no_obj = NULL;
+    PyObject *item_obj = NULL;
+    bool flag_no_mem = false;
+
+    _UNUSED(self);
+    if (!PyArg_ParseTupleAndKeywords(args, kwargs, "s", (char **) kwlist,
+                                     &disk_path))
+        return NULL;
+
+    Py_BEGIN_ALLOW_THREADS
+    rc = _lsm_local_disk_info_get(disk_path, &vpd83, &rpm, &link_type,
+                                  &serial_num, &led_status, &lsm_err);
+    Py_END_ALLOW_THREADS
+
+    err_no_obj = PyInt_FromLong(rc);
+    _alloc_check(err_no_obj, flag_no_mem, out);
+    rc_list = PyList_New(3 /* rc_obj, errno, err_str*/);
+    _alloc_check(rc_list, flag_no_mem, out);
+    rc_obj = PyList_New(5 /* vpd83, rpm, link_type, serial_num, led_status */);
+    _alloc_check(rc_obj, flag_no_mem, out);
+
+    item_obj = _c_str_to_py_str(vpd83);
+    _alloc_check(item_obj, flag_no_mem, out);
+    PyList_SET_ITEM(rc_obj, 0, item_obj);
+    item_obj = PyInt_FromLong(rpm);
+    _alloc_check(item_obj, flag_no_mem, out);
+    PyList_SET_ITEM(rc_obj, 1, item_obj);
+    item_obj = PyInt_FromLong(link_type);
+    _alloc_check(item_obj, flag_no_mem, out);
+    PyList_SET_ITEM(rc_obj, 2, item_obj);
+    item_obj = _c_str_to_py_str(serial_num);
+    _alloc_check(item_obj, flag_no_mem, out);
+    PyList_SET_ITEM(rc_obj, 3, item_obj);
+    item_obj = PyInt_FromLong(led_status);
+    _alloc_check(item_obj, flag_no_mem, out);
+    PyList_SET_ITEM(rc_obj, 4, item_obj);
+
+    if (rc != LSM_ERR_OK) {
+        err_msg_obj = PyUnicode_FromString(lsm_error_message_get(lsm_err));
+        lsm_error_free(lsm_err);
+        lsm_err = NULL;
+        _alloc_check(err_msg_obj, flag_no_mem, out);
+        goto out;
+    } else {
+        err_msg_obj = PyUnicode_FromString("");
+        _alloc_check(err_msg_obj, flag_no_mem, out);
+    }
+ out:
+    if (lsm_err != NULL)
+        lsm_error_free(lsm_err);
+    free(vpd83);
+    free(serial_num);
+    if (flag_no_mem == true) {
+        Py_XDECREF(rc_list);
+        Py_XDECREF(err_no_obj);
+        Py_XDECREF(err_msg_obj);
+        Py_XDECREF(rc_obj);
+        return PyErr_NoMemory();
+    }
+    PyList_SET_ITEM(rc_list, 0, rc_obj);
+    PyList_SET_ITEM(rc_list, 1, err_no_obj);
+    PyList_SET_ITEM(rc_list, 2, err_msg_obj);
+    return rc_list;
+}
+
 #if PY_MAJOR_VERSION >= 3
     #define MOD_DEF(name, methods) \
         static struct PyModuleDef moduledef = { \
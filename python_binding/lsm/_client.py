@@ -13,10 +13,12 @@
 # License along with this library; If not, see <http://www.gnu.org/licenses/>.
 #
 # Author: tasleson
+import functools
 import os
+import time
 from lsm import (Volume, NfsExport, Capabilities, Pool, System, Battery,
                  Disk, AccessGroup, FileSystem, FsSnapshot,
-                 uri_parse, LsmError, ErrorNumber,
+                 uri_parse, LsmError, ErrorNumber, JobStatus,
                  INetworkAttachedStorage, TargetPort)
 
 from lsm._common import return_requires as _return_requires
@@ -46,6 +48,210 @@ def _check_search_key(search_key, supported_keys):
     return
 
 
+def _batch_error(error):
+    """
+    Convert the [code, message] error of batch methods to LsmError.
+    """
+    if error is None:
+        return None
+    return LsmError(error[0], error[1])
+
+
+def _check_volume_raid_create(raid_type, disks, **kwargs):
+    """
+    Check the disks count required by raid_type of
+    lsm.Client.volume_raid_create().
+    """
+    if len(disks) == 0:
+        raise LsmError(
+            ErrorNumber.INVALID_ARGUMENT,
+            "Illegal input disks argument: no disk included")
+
+    if raid_type == Volume.RAID_TYPE_RAID1 and len(disks) != 2:
+        raise LsmError(
+            ErrorNumber.INVALID_ARGUMENT,
+            "Illegal input disks argument: RAID 1 only allow 2 disks")
+
+    if raid_type == Volume.RAID_TYPE_RAID5 and len(disks) < 3:
+        raise LsmError(
+            ErrorNumber.INVALID_ARGUMENT,
+            "Illegal input disks argument: RAID 5 require 3 or more disks")
+
+    if raid_type == Volume.RAID_TYPE_RAID6 and len(disks) < 4:
+        raise LsmError(
+            ErrorNumber.INVALID_ARGUMENT,
+            "Illegal input disks argument: RAID 6 require 4 or more disks")
+
+    if raid_type == Volume.RAID_TYPE_RAID10:
+        if len(disks) % 2 or len(disks) < 4:
+            raise LsmError(
+                ErrorNumber.INVALID_ARGUMENT,
+                "Illegal input disks argument: "
+                "RAID 10 require even disks count and 4 or more disks")
+
+    if raid_type == Volume.RAID_TYPE_RAID50:
+        if len(disks) % 2 or len(disks) < 6:
+            raise LsmError(
+                ErrorNumber.INVALID_ARGUMENT,
+                "Illegal input disks argument: "
+                "RAID 50 require even disks count and 6 or more disks")
+
+    if raid_type == Volume.RAID_TYPE_RAID60:
+        if len(disks) % 2 or len(disks) < 8:
+            raise LsmError(
+                ErrorNumber.INVALID_ARGUMENT,
+                "Illegal input disks argument: "
+                "RAID 60 require even disks count and 8 or more disks")
+
+
+def _check_system_read_pct(read_pct, **kwargs):
+    if read_pct > 100 or read_pct < 0:
+        raise LsmError(ErrorNumber.INVALID_ARGUMENT,
+                       "Invalid read_pct, should be in range 0 - 100")
+
+
+def _check_volume_pdc(pdc, **kwargs):
+    if (pdc != Volume.PHYSICAL_DISK_CACHE_ENABLED) and \
+       (pdc != Volume.PHYSICAL_DISK_CACHE_DISABLED):
+        raise LsmError(ErrorNumber.INVALID_ARGUMENT,
+                       "Argument pdc should be "
+                       "Volume.PHYSICAL_DISK_CACHE_ENABLED or "
+                       "Volume.PHYSICAL_DISK_CACHE_DISABLED")
+
+
+def _check_volume_wcp(wcp, **kwargs):
+    if wcp != Volume.WRITE_CACHE_POLICY_WRITE_BACK and \
+       wcp != Volume.WRITE_CACHE_POLICY_AUTO and \
+       wcp != Volume.WRITE_CACHE_POLICY_WRITE_THROUGH:
+        raise LsmError(ErrorNumber.INVALID_ARGUMENT,
+                       "Argument wcp should be "
+                       "Volume.WRITE_CACHE_POLICY_WRITE_BACK or "
+                       "Volume.WRITE_CACHE_POLICY_AUTO or "
+                       "Volume.WRITE_CACHE_POLICY_WRITE_THROUGH")
+
+
+def _check_volume_rcp(rcp, **kwargs):
+    if rcp != Volume.READ_CACHE_POLICY_ENABLED and \
+       rcp != Volume.READ_CACHE_POLICY_DISABLED:
+        raise LsmError(ErrorNumber.INVALID_ARGUMENT,
+                       "Argument rcp should be "
+                       "Volume.READ_CACHE_POLICY_ENABLED or "
+                       "Volume.READ_CACHE_POLICY_DISABLED")
+
+
+# Argument checks done in client before sending the request, keyed by
+# method name. They are invoked with the request parameters as keyword
+# arguments by lsm.AsyncClient.
+_ARG_CHECKS = {
+    'system_read_cache_pct_update': _check_system_read_pct,
+    'volume_raid_create': _check_volume_raid_create,
+    'volume_physical_disk_cache_update': _check_volume_pdc,
+    'volume_write_cache_policy_update': _check_volume_wcp,
+    'volume_read_cache_policy_update': _check_volume_rcp,
+}
+
+
+# Default time to live of the cached list results in milliseconds.
+_CACHE_TTL_DEFAULT = 30000
+
+# Default count of objects in each reply chunk of lsm.Client.items_iter().
+_CHUNK_SIZE_DEFAULT = 1000
+
+# lsm classes supported by lsm.Client.item_get() and lsm.Client.items_iter()
+# and their list methods.
+_LIST_METHODS = {
+    Pool: 'pools',
+    System: 'systems',
+    Volume: 'volumes',
+    Disk: 'disks',
+    AccessGroup: 'access_groups',
+    FileSystem: 'fs',
+    NfsExport: 'exports',
+    TargetPort: 'target_ports',
+    Battery: 'batteries',
+}
+
+
+def _job_ids(result):
+    """
+    Return the job IDs found in the result of a method changing the storage
+    system: a job ID, a [job_id, lsm_obj] pair or a list of
+    [job_id, lsm_obj, error] from the batch methods.
+    """
+    if isinstance(result, six.string_types):
+        return [result]
+    if not isinstance(result, (list, tuple)) or len(result) == 0:
+        return []
+    if isinstance(result[0], six.string_types):
+        return [result[0]]
+    return list(r[0] for r in result
+                if isinstance(r, (list, tuple)) and len(r) > 0 and
+                isinstance(r[0], six.string_types))
+
+
+class _ListCache(object):
+    """
+    Results of the list methods of lsm.Client, indexed by ID, used once
+    lsm.Client.cache_enable() is invoked.
+    """
+    def __init__(self, ttl_ms):
+        self._ttl = ttl_ms / 1000.0
+        # lsm class -> (expire_time, [lsm_obj], {id: lsm_obj})
+        self._lists = {}
+        # job_id -> lsm classes to invalidate once the job finished
+        self._jobs = {}
+
+    def get(self, lsm_class):
+        entry = self._lists.get(lsm_class)
+        if entry is not None and entry[0] < time.time():
+            del self._lists[lsm_class]
+            entry = None
+        return entry
+
+    def set(self, lsm_class, lsm_objs):
+        entry = (time.time() + self._ttl, lsm_objs,
+                 dict((lsm_obj.id, lsm_obj) for lsm_obj in lsm_objs))
+        self._lists[lsm_class] = entry
+        return entry
+
+    def invalidate(self, lsm_classes=None):
+        if lsm_classes is None:
+            self._lists.clear()
+            return
+        for lsm_class in lsm_classes:
+            self._lists.pop(lsm_class, None)
+
+    def job_add(self, job_id, lsm_classes):
+        self._jobs[job_id] = lsm_classes
+
+    def job_finished(self, job_id):
+        lsm_classes = self._jobs.pop(job_id, None)
+        if lsm_classes is not None:
+            self.invalidate(lsm_classes)
+
+
+def _cache_invalidate(*lsm_classes):
+    """
+    Decorator for lsm.Client methods changing the storage system. Drop the
+    cached lists of given lsm classes once the method returned, and again
+    once the job returned by the method finished.
+    """
+    def outer(func):
+        @functools.wraps(func)
+        def inner(self, *args, **kwargs):
+            try:
+                r = func(self, *args, **kwargs)
+            finally:
+                if self._cache is not None:
+                    self._cache.invalidate(lsm_classes)
+            if self._cache is not None:
+                for job_id in _job_ids(r):
+                    self._cache.job_add(job_id, lsm_classes)
+            return r
+        return inner
+    return outer
+
+
 # Descriptive exception about daemon not running.
 def _raise_no_daemon():
     raise LsmError(ErrorNumber.DAEMON_NOT_RUNNING,
@@ -89,9 +295,11 @@ def plugin_register(self, uri, plain_text_password, timeout_ms, flags=0):
     # @returns None
     def __start(self, uri, password, timeout, flags=0):
         """
-        Instruct the plug-in to get ready
+        Instruct the plug-in to get ready, negotiating the optional
+        encodings of the transport.
         """
-        self._tp.rpc('plugin_register', _del_self(locals()))
+        self._tp.rpc('plugin_register', _del_self(locals()),
+                     _TransPort.ENCODINGS)
 
     # Checks to see if any unix domain sockets exist in the base directory
     # and opens a socket to one to see if the server is actually there.
@@ -126,6 +334,11 @@ def _plugin_uds_path():
 
         return rc
 
+    # Connects to the plug-in socket, subclass could override it to adjust
+    # the socket options before plugin_register is sent.
+    def _socket_get(self, path):
+        return _TransPort.get_socket(path)
+
     # Class constructor
     # @param    self                    The this pointer
     # @param    uri                     The uniform resource identifier
@@ -139,6 +352,7 @@ def __init__(self, uri, plain_text_password=None, timeout_ms=30000,
         self._password = plain_text_password
         self._timeout = timeout_ms
         self._uds_path = Client._plugin_uds_path()
+        self._cache = None
 
         u = uri_parse(uri, ['scheme'])
 
@@ -150,7 +364,7 @@ def __init__(self, uri, plain_text_password=None, timeout_ms=30000,
         self.plugin_path = os.path.join(self._uds_path, scheme)
 
         if os.path.exists(self.plugin_path):
-            self._tp = _TransPort(_TransPort.get_socket(self.plugin_path))
+            self._tp = _TransPort(self._socket_get(self.plugin_path))
         else:
             # At this point we don't know if the user specified an incorrect
             # plug-in in the URI or the daemon isn't started.  We will check
@@ -238,6 +452,238 @@ def time_out_get(self, flags=FLAG_RSVD):
         """
         return self._tp.rpc('time_out_get', _del_self(locals()))
 
+    @_return_requires(None)
+    def cache_enable(self, ttl_ms=_CACHE_TTL_DEFAULT, flags=FLAG_RSVD):
+        """
+        lsm.Client.cache_enable(self, ttl_ms=30000,
+                                flags=lsm.Client.FLAG_RSVD)
+
+        Version:
+            1.4
+        Usage:
+            Keep the results of the list methods (lsm.Client.pools(),
+            lsm.Client.volumes(), lsm.Client.access_groups() and etc) in
+            client for ttl_ms milliseconds. Repeated list calls, including
+            the ones with search_key, and lsm.Client.item_get() will not
+            query the storage system until the cache expired.
+            Methods of this client changing the storage system drop the
+            cached lists of the affected object types automatically, also
+            when the returned job finished. Changes done by other clients
+            are not noticed until the cache expired or
+            lsm.Client.cache_invalidate() is invoked.
+            Returned objects are shared between the calls, don't modify them.
+        Parameters:
+            ttl_ms (int)
+                Optional. Time to live of cached lists in milliseconds.
+            flags (int)
+                Optional. Reserved for future use.
+                Should be set as lsm.Client.FLAG_RSVD.
+        Returns:
+            None
+        SpecialExceptions:
+            N/A
+        """
+        self._cache = _ListCache(ttl_ms)
+
+    @_return_requires(None)
+    def cache_disable(self, flags=FLAG_RSVD):
+        """
+        lsm.Client.cache_disable(self, flags=lsm.Client.FLAG_RSVD)
+
+        Version:
+            1.4
+        Usage:
+            Drop all cached lists and stop caching, refer to
+            lsm.Client.cache_enable().
+        Parameters:
+            flags (int)
+                Optional. Reserved for future use.
+                Should be set as lsm.Client.FLAG_RSVD.
+        Returns:
+            None
+        SpecialExceptions:
+            N/A
+        """
+        self._cache = None
+
+    @_return_requires(None)
+    def cache_invalidate(self, lsm_classes=None, flags=FLAG_RSVD):
+        """
+        lsm.Client.cache_invalidate(self, lsm_classes=None,
+                                    flags=lsm.Client.FLAG_RSVD)
+
+        Version:
+            1.4
+        Usage:
+            Drop the cached lists, refer to lsm.Client.cache_enable().
+            Do nothing if cache is not enabled.
+        Parameters:
+            lsm_classes ([class])
+                Optional. List of lsm classes, like [lsm.Volume, lsm.Pool].
+                None means all.
+            flags (int)
+                Optional. Reserved for future use.
+                Should be set as lsm.Client.FLAG_RSVD.
+        Returns:
+            None
+        SpecialExceptions:
+            N/A
+        """
+        if self._cache is not None:
+            self._cache.invalidate(lsm_classes)
+
+    @_return_requires(_IData)
+    def item_get(self, lsm_class, lsm_id, flags=FLAG_RSVD):
+        """
+        lsm.Client.item_get(self, lsm_class, lsm_id,
+                            flags=lsm.Client.FLAG_RSVD)
+
+        Version:
+            1.4
+        Usage:
+            Retrieve single object by its ID. With lsm.Client.cache_enable(),
+            the object is looked up in the ID index of the cached list.
+        Parameters:
+            lsm_class (class)
+                One of lsm.Pool, lsm.System, lsm.Volume, lsm.Disk,
+                lsm.AccessGroup, lsm.FileSystem, lsm.NfsExport,
+                lsm.TargetPort and lsm.Battery.
+            lsm_id (string)
+                ID of the object.
+            flags (int)
+                Optional. Reserved for future use.
+                Should be set as lsm.Client.FLAG_RSVD.
+        Returns:
+            lsm_obj
+                Object of lsm_class or None if not found.
+        SpecialExceptions:
+            LsmError
+                ErrorNumber.INVALID_ARGUMENT
+                    Unsupported lsm_class.
+        """
+        if lsm_class not in _LIST_METHODS:
+            raise LsmError(ErrorNumber.INVALID_ARGUMENT,
+                           "Unsupported lsm_class: %s" % lsm_class)
+        list_method = getattr(self, _LIST_METHODS[lsm_class])
+        if 'id' in getattr(lsm_class, 'SUPPORTED_SEARCH_KEYS', []):
+            lsm_objs = list_method('id', lsm_id)
+        else:
+            lsm_objs = list(x for x in list_method() if x.id == lsm_id)
+        if len(lsm_objs) == 0:
+            return None
+        return lsm_objs[0]
+
+    def items_iter(self, lsm_class, search_key=None, search_value=None,
+                   chunk_size=_CHUNK_SIZE_DEFAULT, flags=FLAG_RSVD):
+        """
+        lsm.Client.items_iter(self, lsm_class, search_key=None,
+                              search_value=None, chunk_size=1000,
+                              flags=lsm.Client.FLAG_RSVD)
+
+        Version:
+            1.4
+        Usage:
+            Generator of the objects returned by the list method of
+            lsm_class, like lsm.Client.volumes() for lsm.Volume. The plugin
+            sends the objects in chunks of chunk_size, so the memory used
+            by client and plugin is proportional to chunk_size instead of
+            the count of objects in storage system.
+            Until the generator is exhausted or closed, other methods of
+            this client will raise LsmError ErrorNumber.INVALID_ARGUMENT.
+            If plugin does not support chunked reply, the full list is
+            retrieved at once.
+            The list cache of lsm.Client.cache_enable() is not used.
+        Parameters:
+            lsm_class (class)
+                One of lsm.Pool, lsm.System, lsm.Volume, lsm.Disk,
+                lsm.AccessGroup, lsm.FileSystem, lsm.NfsExport,
+                lsm.TargetPort and lsm.Battery.
+            search_key (string)
+                Optional. Refer to the list method of lsm_class.
+            search_value (string)
+                Optional. Refer to the list method of lsm_class.
+            chunk_size (int)
+                Optional. Count of objects in each chunk.
+            flags (int)
+                Optional. Reserved for future use.
+                Should be set as lsm.Client.FLAG_RSVD.
+        Returns:
+            Generator of lsm_class objects.
+        SpecialExceptions:
+            LsmError
+                ErrorNumber.INVALID_ARGUMENT
+                    Unsupported lsm_class or invalid chunk_size.
+                ErrorNumber.UNSUPPORTED_SEARCH_KEY
+        """
+        if lsm_class not in _LIST_METHODS:
+            raise LsmError(ErrorNumber.INVALID_ARGUMENT,
+                           "Unsupported lsm_class: %s" % lsm_class)
+        if chunk_size < 1:
+            raise LsmError(ErrorNumber.INVALID_ARGUMENT,
+                           "Invalid chunk_size %s" % chunk_size)
+        method = _LIST_METHODS[lsm_class]
+        params = {'flags': flags}
+        if hasattr(lsm_class, 'SUPPORTED_SEARCH_KEYS'):
+            _check_search_key(search_key, lsm_class.SUPPORTED_SEARCH_KEYS)
+            params['search_key'] = search_key
+            params['search_value'] = search_value
+        elif search_key:
+            _check_search_key(search_key, [])
+        return self._items_iter(method, params, chunk_size)
+
+    def _items_iter(self, method, params, chunk_size):
+        chunks = self._tp.rpc_chunks(
+            'list_chunks', {'method': method, 'params': params,
+                            'chunk_size': chunk_size})
+        try:
+            try:
+                chunk = next(chunks)
+            except LsmError as lsm_err:
+                if lsm_err.code != ErrorNumber.NO_SUPPORT:
+                    raise
+                chunk = None
+
+            if chunk is None:
+                # Plugin does not support chunked reply.
+                for lsm_obj in getattr(self, method)(**params):
+                    yield lsm_obj
+                return
+
+            while chunk is not None:
+                for lsm_obj in chunk:
+                    yield lsm_obj
+                chunk = next(chunks, None)
+        finally:
+            chunks.close()
+
+    def _list_rpc(self, lsm_class, method, args):
+        """
+        Invoke list method through the cache if enabled.
+        """
+        if self._cache is None or args.get('flags'):
+            return self._tp.rpc(method, args)
+
+        entry = self._cache.get(lsm_class)
+        if entry is None:
+            full_args = dict(args)
+            if 'search_key' in full_args:
+                full_args['search_key'] = None
+                full_args['search_value'] = None
+            entry = self._cache.set(lsm_class,
+                                    self._tp.rpc(method, full_args))
+        (lsm_objs, id_index) = entry[1:]
+
+        search_key = args.get('search_key')
+        search_value = args.get('search_value')
+        if search_key is None:
+            return list(lsm_objs)
+        if search_key == 'id':
+            if search_value in id_index:
+                return [id_index[search_value]]
+            return []
+        return list(x for x in lsm_objs
+                    if getattr(x, search_key) == search_value)
+
     # Retrieves the status of the specified job id.
     # @param    self    The this pointer
     # @param    job_id  The job identifier
@@ -253,7 +699,10 @@ def job_status(self, job_id, flags=FLAG_RSVD):
                             completed item).
         else LsmError exception.
         """
-        return self._tp.rpc('job_status', _del_self(locals()))
+        r = self._tp.rpc('job_status', _del_self(locals()))
+        if self._cache is not None and r[0] != JobStatus.INPROGRESS:
+            self._cache.job_finished(job_id)
+        return r
 
     # Frees the resources for the specified job id.
     # @param    self    The this pointer
@@ -266,8 +715,54 @@ def job_free(self, job_id, flags=FLAG_RSVD):
 
         Returns None on success, else raises an LsmError
         """
+        if self._cache is not None:
+            self._cache.job_finished(job_id)
         return self._tp.rpc('job_free', _del_self(locals()))
 
+    @_return_requires([[int, int, _IData]])
+    def job_wait(self, job_ids, timeout=None, flags=FLAG_RSVD):
+        """
+        lsm.Client.job_wait(self, job_ids, timeout=None,
+                            flags=lsm.Client.FLAG_RSVD)
+
+        Version:
+            1.4
+        Usage:
+            Wait in plugin until any of the jobs finished, completed or
+            failed, instead of polling lsm.Client.job_status() repeatedly.
+            Plugin might wait on native job completion notification of the
+            storage system, or poll in plugin process.
+        Parameters:
+            job_ids ([string])
+                List of job IDs.
+            timeout (int)
+                Optional. Return after this amount of milliseconds even
+                no job finished. None means no time limit.
+            flags (int)
+                Optional. If lsm.Client.FLAG_JOB_WAIT_ALL is set, wait until
+                all jobs finished.
+        Returns:
+            [[status, percent_complete, completed_item]]
+                List in the order of job_ids, refer to
+                lsm.Client.job_status() for detail.
+        SpecialExceptions:
+            LsmError
+                ErrorNumber.NOT_FOUND_JOB
+        """
+        try:
+            results = self._tp.rpc('job_wait', _del_self(locals()))
+        except LsmError as lsm_err:
+            if lsm_err.code != ErrorNumber.NO_SUPPORT:
+                raise
+            # Plugin does not support job_wait, poll in client instead.
+            results = INetworkAttachedStorage.job_wait(
+                self, job_ids, timeout, flags)
+        if self._cache is not None:
+            for job_id, result in zip(job_ids, results):
+                if result[0] != JobStatus.INPROGRESS:
+                    self._cache.job_finished(job_id)
+        return results
+
     # Gets the capabilities of the array.
     # @param    self    The this pointer
     # @param    system  The system of interest
@@ -293,6 +788,85 @@ def plugin_info(self, flags=FLAG_RSVD):
         """
         return self._tp.rpc('plugin_info', _del_self(locals()))
 
+    @_return_requires(dict)
+    def rpc_stats_get(self, flags=FLAG_RSVD):
+        """
+        lsm.Client.rpc_stats_get(self, flags=lsm.Client.FLAG_RSVD)
+
+        Version:
+            1.4
+        Usage:
+            Retrieve the statistics of RPC calls made by this client: per
+            method counts, latency histogram, time spent on JSON encoding
+            and decoding, and payload sizes.
+        Parameters:
+            flags (int)
+                Optional. Reserved for future use.
+                Should be set as lsm.Client.FLAG_RSVD.
+        Returns:
+            stats (dict)
+                Refer to lsm._transport.RpcStats.get() for detail.
+        SpecialExceptions:
+            N/A
+        """
+        return self._tp.stats.get()
+
+    @_return_requires(None)
+    def rpc_stats_export_set(self, callback, interval_ms=None,
+                             flags=FLAG_RSVD):
+        """
+        lsm.Client.rpc_stats_export_set(self, callback, interval_ms=None,
+                                        flags=lsm.Client.FLAG_RSVD)
+
+        Version:
+            1.4
+        Usage:
+            Invoke callback with the result of lsm.Client.rpc_stats_get()
+            every interval_ms milliseconds while RPC calls are going on and
+            when the client is closed.
+        Parameters:
+            callback (function)
+                Function taking the statistics dictionary as the only
+                argument. None to stop exporting.
+            interval_ms (int)
+                Optional. None means only export when the client is closed.
+            flags (int)
+                Optional. Reserved for future use.
+                Should be set as lsm.Client.FLAG_RSVD.
+        Returns:
+            None
+        SpecialExceptions:
+            N/A
+        """
+        if interval_ms is not None:
+            interval_ms /= 1000.0
+        self._tp.stats.export_set(callback, interval_ms)
+
+    @_return_requires(dict)
+    def plugin_rpc_stats_get(self, flags=FLAG_RSVD):
+        """
+        lsm.Client.plugin_rpc_stats_get(self, flags=lsm.Client.FLAG_RSVD)
+
+        Version:
+            1.4
+        Usage:
+            Retrieve the statistics of RPC calls gathered by the plugin
+            process, including the time spent in the plugin methods.
+            Only supported by python plugins.
+        Parameters:
+            flags (int)
+                Optional. Reserved for future use.
+                Should be set as lsm.Client.FLAG_RSVD.
+        Returns:
+            stats (dict)
+                Same layout as lsm.Client.rpc_stats_get(), the
+                'backend_total' holds the time spent in plugin methods.
+        SpecialExceptions:
+            LsmError
+                ErrorNumber.NO_SUPPORT
+        """
+        return self._tp.rpc('plugin_rpc_stats_get', _del_self(locals()))
+
     # Returns an array of pool objects.
     # @param    self            The this pointer
     # @param    search_key      Search key
@@ -306,7 +880,7 @@ def pools(self, search_key=None, search_value=None, flags=FLAG_RSVD):
         file system interfaces, thus the reason they are in the base class.
         """
         _check_search_key(search_key, Pool.SUPPORTED_SEARCH_KEYS)
-        return self._tp.rpc('pools', _del_self(locals()))
+        return self._list_rpc(Pool, 'pools', _del_self(locals()))
 
     # Returns an array of system objects.
     # @param    self    The this pointer
@@ -319,7 +893,7 @@ def systems(self, flags=FLAG_RSVD):
         distinguish resources from on storage array to another when the plug=in
         supports the ability to have more than one array managed by it
         """
-        return self._tp.rpc('systems', _del_self(locals()))
+        return self._list_rpc(System, 'systems', _del_self(locals()))
 
     # Changes the read cache percentage for a system.
     # @param    self            The this pointer
@@ -328,6 +902,7 @@ def systems(self, flags=FLAG_RSVD):
     # @param    flags           Flags
     # @returns None on success, else raises LsmError
     @_return_requires(None)
+    @_cache_invalidate(System)
     def system_read_cache_pct_update(self, system, read_pct, flags=FLAG_RSVD):
         """
         lsm.Client.system_read_cache_pct_update(self, system, read_pct,
@@ -350,9 +925,7 @@ def system_read_cache_pct_update(self, system, read_pct, flags=FLAG_RSVD):
             returns None on success, else raises LsmError on errors.
         SpecialExceptions:
         """
-        if read_pct > 100 or read_pct < 0:
-            raise LsmError(ErrorNumber.INVALID_ARGUMENT,
-                           "Invalid read_pct, should be in range 0 - 100")
+        _check_system_read_pct(read_pct)
         return self._tp.rpc('system_read_cache_pct_update',
                             _del_self(locals()))
 
@@ -369,6 +942,7 @@ def system_read_cache_pct_update(self, system, read_pct, flags=FLAG_RSVD):
     # @param    flags   Reserved for future use, must be zero.
     # @returns None on success, throws LsmError on errors.
     @_return_requires(None)
+    @_cache_invalidate(AccessGroup)
     def iscsi_chap_auth(self, init_id, in_user, in_password,
                         out_user, out_password, flags=FLAG_RSVD):
         """
@@ -392,7 +966,7 @@ def volumes(self, search_key=None, search_value=None, flags=FLAG_RSVD):
         Returns an array of volume objects
         """
         _check_search_key(search_key, Volume.SUPPORTED_SEARCH_KEYS)
-        return self._tp.rpc('volumes', _del_self(locals()))
+        return self._list_rpc(Volume, 'volumes', _del_self(locals()))
 
     # Creates a volume
     # @param    self            The this pointer
@@ -404,6 +978,7 @@ def volumes(self, search_key=None, search_value=None, flags=FLAG_RSVD):
     # @returns  A tuple (job_id, new volume), when one is None the other is
     #           valid.
     @_return_requires(six.string_types[0], Volume)
+    @_cache_invalidate(Volume, Pool)
     def volume_create(self, pool, volume_name, size_bytes, provisioning,
                       flags=FLAG_RSVD):
         """
@@ -415,6 +990,54 @@ def volume_create(self, pool, volume_name, size_bytes, provisioning,
         """
         return self._tp.rpc('volume_create', _del_self(locals()))
 
+    @_return_requires([[six.string_types[0], Volume, LsmError]])
+    @_cache_invalidate(Volume, Pool)
+    def volume_create_many(self, requests, flags=FLAG_RSVD):
+        """
+        lsm.Client.volume_create_many(self, requests,
+                                      flags=lsm.Client.FLAG_RSVD)
+
+        Version:
+            1.4
+        Usage:
+            Create multiple volumes in single call. Plugin could create all
+            the volumes at once, otherwise lsm.Client.volume_create() is
+            invoked for each request by plugin or by this library.
+            Failure of single request does not stop the others.
+        Parameters:
+            requests ([list])
+                List of [pool, volume_name, size_bytes, provisioning],
+                refer to lsm.Client.volume_create() for detail.
+            flags (int)
+                Optional. Flags of lsm.Client.volume_create(), applied to
+                all requests.
+        Returns:
+            [[job_id, volume, error]]
+                List of results in the order of requests.
+                job_id (string) and volume (lsm.Volume) are the same as
+                the return of lsm.Client.volume_create().
+                error (lsm.LsmError) is the error of this request or None
+                on success.
+        SpecialExceptions:
+        """
+        try:
+            results = self._tp.rpc('volume_create_many', _del_self(locals()))
+        except LsmError as lsm_err:
+            if lsm_err.code != ErrorNumber.NO_SUPPORT:
+                raise
+            results = []
+            for (pool, volume_name, size_bytes, provisioning) in requests:
+                try:
+                    (job_id, volume) = self.volume_create(
+                        pool, volume_name, size_bytes, provisioning, flags)
+                    results.append([job_id, volume, None])
+                except LsmError as item_err:
+                    results.append([None, None, item_err])
+            return results
+
+        return list([job_id, volume, _batch_error(error)]
+                    for (job_id, volume, error) in results)
+
     # Re-sizes a volume
     # @param    self    The this pointer
     # @param    volume  The volume object to re-size
@@ -423,6 +1046,7 @@ def volume_create(self, pool, volume_name, size_bytes, provisioning,
     # @returns  A tuple (job_id, new re-sized volume), when one is
     #           None the other is valid.
     @_return_requires(six.string_types[0], Volume)
+    @_cache_invalidate(Volume, Pool)
     def volume_resize(self, volume, new_size_bytes, flags=FLAG_RSVD):
         """
         Re-sizes a volume.
@@ -444,6 +1068,7 @@ def volume_resize(self, volume, new_size_bytes, flags=FLAG_RSVD):
     # @returns  A tuple (job_id, new replicated volume), when one is
     #           None the other is valid.
     @_return_requires(six.string_types[0], Volume)
+    @_cache_invalidate(Volume, Pool)
     def volume_replicate(self, pool, rep_type, volume_src, name,
                          flags=FLAG_RSVD):
         """
@@ -496,6 +1121,7 @@ def volume_replicate_range(self, rep_type, volume_src, volume_dest, ranges,
     # @param    flags   Reserved for future use, must be zero.
     # @returns None on success, else job id.  Raises LsmError on errors.
     @_return_requires(six.string_types[0])
+    @_cache_invalidate(Volume, Pool)
     def volume_delete(self, volume, flags=FLAG_RSVD):
         """
         Deletes a volume.
@@ -510,6 +1136,7 @@ def volume_delete(self, volume, flags=FLAG_RSVD):
     # @param    flags   Reserved for future use, must be zero.
     # @returns None on success, else raises LsmError
     @_return_requires(None)
+    @_cache_invalidate(Volume)
     def volume_enable(self, volume, flags=FLAG_RSVD):
         """
         Makes a volume available to the host
@@ -524,6 +1151,7 @@ def volume_enable(self, volume, flags=FLAG_RSVD):
     # @param    flags   Reserved for future use, must be zero.
     # @returns None on success, else raises LsmError on errors.
     @_return_requires(None)
+    @_cache_invalidate(Volume)
     def volume_disable(self, volume, flags=FLAG_RSVD):
         """
         Makes a volume unavailable to the host
@@ -547,7 +1175,7 @@ def disks(self, search_key=None, search_value=None, flags=FLAG_RSVD):
         Returns an array of disk objects
         """
         _check_search_key(search_key, Disk.SUPPORTED_SEARCH_KEYS)
-        return self._tp.rpc('disks', _del_self(locals()))
+        return self._list_rpc(Disk, 'disks', _del_self(locals()))
 
     # Access control for allowing an access group to access a volume
     # @param    self            The this pointer
@@ -556,12 +1184,58 @@ def disks(self, search_key=None, search_value=None, flags=FLAG_RSVD):
     # @param    flags           Reserved for future use, must be zero.
     # @returns None on success, throws LsmError on errors.
     @_return_requires(None)
+    @_cache_invalidate(Volume, AccessGroup)
     def volume_mask(self, access_group, volume, flags=FLAG_RSVD):
         """
         Allows an access group to access a volume.
         """
         return self._tp.rpc('volume_mask', _del_self(locals()))
 
+    @_return_requires([LsmError])
+    @_cache_invalidate(Volume, AccessGroup)
+    def volume_mask_many(self, access_group, volumes, flags=FLAG_RSVD):
+        """
+        lsm.Client.volume_mask_many(self, access_group, volumes,
+                                    flags=lsm.Client.FLAG_RSVD)
+
+        Version:
+            1.4
+        Usage:
+            Grant access of multiple volumes to an access group in single
+            call. Plugin could mask all volumes at once, otherwise
+            lsm.Client.volume_mask() is invoked for each volume by plugin or
+            by this library. Failure of single volume does not stop the
+            others.
+        Parameters:
+            access_group (lsm.AccessGroup)
+                The access group to grant access to.
+            volumes ([lsm.Volume])
+                List of volumes.
+            flags (int)
+                Optional. Reserved for future use.
+                Should be set as lsm.Client.FLAG_RSVD.
+        Returns:
+            [error]
+                List of error (lsm.LsmError) in the order of volumes,
+                None on success.
+        SpecialExceptions:
+        """
+        try:
+            errors = self._tp.rpc('volume_mask_many', _del_self(locals()))
+        except LsmError as lsm_err:
+            if lsm_err.code != ErrorNumber.NO_SUPPORT:
+                raise
+            errors = []
+            for volume in volumes:
+                try:
+                    self.volume_mask(access_group, volume, flags)
+                    errors.append(None)
+                except LsmError as item_err:
+                    errors.append(item_err)
+            return errors
+
+        return list(_batch_error(error) for error in errors)
+
     # Revokes access to a volume to initiators in an access group
     # @param    self            The this pointer
     # @param    access_group    The access group
@@ -569,6 +1243,7 @@ def volume_mask(self, access_group, volume, flags=FLAG_RSVD):
     # @param    flags           Reserved for future use, must be zero.
     # @returns None on success, throws LsmError on errors.
     @_return_requires(None)
+    @_cache_invalidate(Volume, AccessGroup)
     def volume_unmask(self, access_group, volume, flags=FLAG_RSVD):
         """
         Revokes access for an access group for a volume
@@ -588,7 +1263,8 @@ def access_groups(self, search_key=None, search_value=None,
         Returns a list of access groups
         """
         _check_search_key(search_key, AccessGroup.SUPPORTED_SEARCH_KEYS)
-        return self._tp.rpc('access_groups', _del_self(locals()))
+        return self._list_rpc(AccessGroup, 'access_groups',
+                              _del_self(locals()))
 
     # Creates an access a group with the specified initiator in it.
     # @param    self                The this pointer
@@ -599,6 +1275,7 @@ def access_groups(self, search_key=None, search_value=None,
     # @param    flags               Reserved for future use, must be zero.
     # @returns AccessGroup on success, else raises LsmError
     @_return_requires(AccessGroup)
+    @_cache_invalidate(AccessGroup)
     def access_group_create(self, name, init_id, init_type, system,
                             flags=FLAG_RSVD):
         """
@@ -615,6 +1292,7 @@ def access_group_create(self, name, init_id, init_type, system,
     # @param    flags           Reserved for future use, must be zero.
     # @returns None on success, throws LsmError on errors.
     @_return_requires(None)
+    @_cache_invalidate(AccessGroup)
     def access_group_delete(self, access_group, flags=FLAG_RSVD):
         """
         Deletes an access group
@@ -629,6 +1307,7 @@ def access_group_delete(self, access_group, flags=FLAG_RSVD):
     # @param    flags           Reserved for future use, must be zero.
     # @returns None on success, throws LsmError on errors.
     @_return_requires(AccessGroup)
+    @_cache_invalidate(AccessGroup)
     def access_group_initiator_add(self, access_group, init_id, init_type,
                                    flags=FLAG_RSVD):
         """
@@ -646,6 +1325,7 @@ def access_group_initiator_add(self, access_group, init_id, init_type,
     # @param    flags           Reserved for future use, must be zero.
     # @returns None on success, throws LsmError on errors.
     @_return_requires(AccessGroup)
+    @_cache_invalidate(AccessGroup)
     def access_group_initiator_delete(self, access_group, init_id, init_type,
                                       flags=FLAG_RSVD):
         """
@@ -705,6 +1385,7 @@ def volume_child_dependency(self, volume, flags=FLAG_RSVD):
     # @param    flags   Reserved for future use, must be zero.
     # @returns None if complete, else job id.
     @_return_requires(six.string_types[0])
+    @_cache_invalidate(Volume, Pool)
     def volume_child_dependency_rm(self, volume, flags=FLAG_RSVD):
         """
         If this volume has child dependency, this method call will fully
@@ -731,7 +1412,7 @@ def fs(self, search_key=None, search_value=None, flags=FLAG_RSVD):
         Returns a list of file systems on the controller.
         """
         _check_search_key(search_key, FileSystem.SUPPORTED_SEARCH_KEYS)
-        return self._tp.rpc('fs', _del_self(locals()))
+        return self._list_rpc(FileSystem, 'fs', _del_self(locals()))
 
     # Deletes a file system
     # @param    self    The this pointer
@@ -739,6 +1420,7 @@ def fs(self, search_key=None, search_value=None, flags=FLAG_RSVD):
     # @param    flags   Reserved for future use, must be zero.
     # @returns  None on success, else job id
     @_return_requires(six.string_types[0])
+    @_cache_invalidate(FileSystem, Pool, NfsExport)
     def fs_delete(self, fs, flags=FLAG_RSVD):
         """
         WARNING: Destructive
@@ -756,6 +1438,7 @@ def fs_delete(self, fs, flags=FLAG_RSVD):
     # @returns tuple (job_id, re-sized file system),
     # When one is None the other is valid
     @_return_requires(six.string_types[0], FileSystem)
+    @_cache_invalidate(FileSystem, Pool)
     def fs_resize(self, fs, new_size_bytes, flags=FLAG_RSVD):
         """
         Re-size a file system
@@ -775,6 +1458,7 @@ def fs_resize(self, fs, new_size_bytes, flags=FLAG_RSVD):
     # @returns  tuple (job_id, file system),
     # When one is None the other is valid
     @_return_requires(six.string_types[0], FileSystem)
+    @_cache_invalidate(FileSystem, Pool)
     def fs_create(self, pool, name, size_bytes, flags=FLAG_RSVD):
         """
         Creates a file system given a pool, name and size.
@@ -794,6 +1478,7 @@ def fs_create(self, pool, name, size_bytes, flags=FLAG_RSVD):
     # @param    flags           Reserved for future use, must be zero.
     # @returns tuple (job_id, file system)
     @_return_requires(six.string_types[0], FileSystem)
+    @_cache_invalidate(FileSystem, Pool)
     def fs_clone(self, src_fs, dest_fs_name, snapshot=None, flags=FLAG_RSVD):
         """
         Creates a thin, point in time read/writable copy of src to dest.
@@ -815,6 +1500,7 @@ def fs_clone(self, src_fs, dest_fs_name, snapshot=None, flags=FLAG_RSVD):
     # @param    flags           Reserved for future use, must be zero.
     # @returns  None on success, else job id
     @_return_requires(six.string_types[0])
+    @_cache_invalidate(FileSystem, Pool)
     def fs_file_clone(self, fs, src_file_name, dest_file_name, snapshot=None,
                       flags=FLAG_RSVD):
         """
@@ -845,6 +1531,7 @@ def fs_snapshots(self, fs, flags=FLAG_RSVD):
     # @param    flags           Reserved for future use, must be zero.
     # @returns tuple (job_id, snapshot)
     @_return_requires(six.string_types[0], FsSnapshot)
+    @_cache_invalidate(FileSystem, Pool)
     def fs_snapshot_create(self, fs, snapshot_name, flags=FLAG_RSVD):
         """
         Snapshot is a point in time read-only copy
@@ -867,6 +1554,7 @@ def fs_snapshot_create(self, fs, snapshot_name, flags=FLAG_RSVD):
     # @param    flags       Reserved for future use, must be zero.
     # @returns  None on success, else job id
     @_return_requires(six.string_types[0])
+    @_cache_invalidate(FileSystem, Pool)
     def fs_snapshot_delete(self, fs, snapshot, flags=FLAG_RSVD):
         """
         Frees the re-sources for the given snapshot on the supplied filesystem.
@@ -886,6 +1574,7 @@ def fs_snapshot_delete(self, fs, snapshot, flags=FLAG_RSVD):
     # @param    flags           Reserved for future use, must be zero.
     # @return None on success, else job id
     @_return_requires(six.string_types[0])
+    @_cache_invalidate(FileSystem, Pool)
     def fs_snapshot_restore(self, fs, snapshot, files, restore_files,
                             all_files=False, flags=FLAG_RSVD):
         """
@@ -925,6 +1614,7 @@ def fs_child_dependency(self, fs, files, flags=FLAG_RSVD):
     # @param    flags   Reserved for future use, must be zero.
     # @returns None if complete, else job id.
     @_return_requires(six.string_types[0])
+    @_cache_invalidate(FileSystem, Pool)
     def fs_child_dependency_rm(self, fs, files, flags=FLAG_RSVD):
         """
         If this filesystem or specified file on this filesystem has child
@@ -962,7 +1652,7 @@ def exports(self, search_key=None, search_value=None, flags=FLAG_RSVD):
         Get a list of all exported file systems on the controller.
         """
         _check_search_key(search_key, NfsExport.SUPPORTED_SEARCH_KEYS)
-        return self._tp.rpc('exports', _del_self(locals()))
+        return self._list_rpc(NfsExport, 'exports', _del_self(locals()))
 
     # Exports a FS as specified in the export.
     # @param    self            The this pointer
@@ -978,6 +1668,7 @@ def exports(self, search_key=None, search_value=None, flags=FLAG_RSVD):
     # @param    flags           Reserved for future use, must be zero.
     # @returns NfsExport on success, else raises LsmError
     @_return_requires(NfsExport)
+    @_cache_invalidate(NfsExport)
     def export_fs(self, fs_id, export_path, root_list, rw_list, ro_list,
                   anon_uid=NfsExport.ANON_UID_GID_NA,
                   anon_gid=NfsExport.ANON_UID_GID_NA,
@@ -993,6 +1684,7 @@ def export_fs(self, fs_id, export_path, root_list, rw_list, ro_list,
     # @param    flags   Reserved for future use, must be zero.
     # @returns None on success, else raises LsmError
     @_return_requires(None)
+    @_cache_invalidate(NfsExport)
     def export_remove(self, export, flags=FLAG_RSVD):
         """
         Removes the specified export
@@ -1012,7 +1704,7 @@ def target_ports(self, search_key=None, search_value=None,
         Returns a list of target ports
         """
         _check_search_key(search_key, TargetPort.SUPPORTED_SEARCH_KEYS)
-        return self._tp.rpc('target_ports', _del_self(locals()))
+        return self._list_rpc(TargetPort, 'target_ports', _del_self(locals()))
 
     # Returns the RAID information of certain volume
     # @param    self    The this pointer
@@ -1286,6 +1978,7 @@ def volume_raid_create_cap_get(self, system, flags=FLAG_RSVD):
     # @param    flags           Flags
     # @returns  the newly created volume, lsmError on errors
     @_return_requires(Volume)
+    @_cache_invalidate(Volume, Pool, Disk)
     def volume_raid_create(self, name, raid_type, disks, strip_size,
                            flags=FLAG_RSVD):
         """
@@ -1374,47 +2067,7 @@ def volume_raid_create(self, name, raid_type, disks, strip_size,
                 At least one RAID type should be supported.
                 The strip_size == Volume.VCR_STRIP_SIZE_DEFAULT is supported.
         """
-        if len(disks) == 0:
-            raise LsmError(
-                ErrorNumber.INVALID_ARGUMENT,
-                "Illegal input disks argument: no disk included")
-
-        if raid_type == Volume.RAID_TYPE_RAID1 and len(disks) != 2:
-            raise LsmError(
-                ErrorNumber.INVALID_ARGUMENT,
-                "Illegal input disks argument: RAID 1 only allow 2 disks")
-
-        if raid_type == Volume.RAID_TYPE_RAID5 and len(disks) < 3:
-            raise LsmError(
-                ErrorNumber.INVALID_ARGUMENT,
-                "Illegal input disks argument: RAID 5 require 3 or more disks")
-
-        if raid_type == Volume.RAID_TYPE_RAID6 and len(disks) < 4:
-            raise LsmError(
-                ErrorNumber.INVALID_ARGUMENT,
-                "Illegal input disks argument: RAID 6 require 4 or more disks")
-
-        if raid_type == Volume.RAID_TYPE_RAID10:
-            if len(disks) % 2 or len(disks) < 4:
-                raise LsmError(
-                    ErrorNumber.INVALID_ARGUMENT,
-                    "Illegal input disks argument: "
-                    "RAID 10 require even disks count and 4 or more disks")
-
-        if raid_type == Volume.RAID_TYPE_RAID50:
-            if len(disks) % 2 or len(disks) < 6:
-                raise LsmError(
-                    ErrorNumber.INVALID_ARGUMENT,
-                    "Illegal input disks argument: "
-                    "RAID 50 require even disks count and 6 or more disks")
-
-        if raid_type == Volume.RAID_TYPE_RAID60:
-            if len(disks) % 2 or len(disks) < 8:
-                raise LsmError(
-                    ErrorNumber.INVALID_ARGUMENT,
-                    "Illegal input disks argument: "
-                    "RAID 60 require even disks count and 8 or more disks")
-
+        _check_volume_raid_create(raid_type, disks)
         return self._tp.rpc('volume_raid_create', _del_self(locals()))
 
     # Enable the IDENT LED for a volume.
@@ -1538,7 +2191,7 @@ def batteries(self, search_key=None, search_value=None, flags=FLAG_RSVD):
             lsm.Capabilities.BATTERIES
         """
         _check_search_key(search_key, Battery.SUPPORTED_SEARCH_KEYS)
-        return self._tp.rpc('batteries', _del_self(locals()))
+        return self._list_rpc(Battery, 'batteries', _del_self(locals()))
 
     @_return_requires([int, int, int, int, int])
     def volume_cache_info(self, volume, flags=FLAG_RSVD):
@@ -1625,6 +2278,7 @@ def volume_cache_info(self, volume, flags=FLAG_RSVD):
         return self._tp.rpc('volume_cache_info', _del_self(locals()))
 
     @_return_requires(None)
+    @_cache_invalidate(Volume)
     def volume_physical_disk_cache_update(self, volume, pdc, flags=FLAG_RSVD):
         """
         lsm.Client.volume_physical_disk_cache_update(self, volume, pdc,
@@ -1665,17 +2319,13 @@ def volume_physical_disk_cache_update(self, volume, pdc, flags=FLAG_RSVD):
                 For example, on HPE SmartArray, the physical disk cache
                 setting is a controller level setting.
         """
-        if (pdc != Volume.PHYSICAL_DISK_CACHE_ENABLED) and \
-           (pdc != Volume.PHYSICAL_DISK_CACHE_DISABLED):
-            raise LsmError(ErrorNumber.INVALID_ARGUMENT,
-                           "Argument pdc should be "
-                           "Volume.PHYSICAL_DISK_CACHE_ENABLED or "
-                           "Volume.PHYSICAL_DISK_CACHE_DISABLED")
+        _check_volume_pdc(pdc)
 
         return self._tp.rpc('volume_physical_disk_cache_update',
                             _del_self(locals()))
 
     @_return_requires(None)
+    @_cache_invalidate(Volume)
     def volume_write_cache_policy_update(self, volume, wcp, flags=FLAG_RSVD):
         """
         lsm.Client.volume_write_cache_policy_update(self, volume, wcp,
@@ -1727,18 +2377,12 @@ def volume_write_cache_policy_update(self, volume, wcp, flags=FLAG_RSVD):
                 mode will change all other volumes with auto write cache policy
                 to write back mode.
         """
-        if wcp != Volume.WRITE_CACHE_POLICY_WRITE_BACK and \
-           wcp != Volume.WRITE_CACHE_POLICY_AUTO and \
-           wcp != Volume.WRITE_CACHE_POLICY_WRITE_THROUGH:
-            raise LsmError(ErrorNumber.INVALID_ARGUMENT,
-                           "Argument wcp should be "
-                           "Volume.WRITE_CACHE_POLICY_WRITE_BACK or "
-                           "Volume.WRITE_CACHE_POLICY_AUTO or "
-                           "Volume.WRITE_CACHE_POLICY_WRITE_THROUGH")
+        _check_volume_wcp(wcp)
         return self._tp.rpc('volume_write_cache_policy_update',
                             _del_self(locals()))
 
     @_return_requires(None)
+    @_cache_invalidate(Volume)
     def volume_read_cache_policy_update(self, volume, rcp, flags=FLAG_RSVD):
         """
         lsm.Client.volume_read_cache_policy_update(self, volume, rcp,
@@ -1776,11 +2420,6 @@ def volume_read_cache_policy_update(self, volume, rcp, flags=FLAG_RSVD):
                 cache policy. For example, on HPE SmartArray, disabling read
                 cache will also change write cache policy to write through.
         """
-        if rcp != Volume.READ_CACHE_POLICY_ENABLED and \
-           rcp != Volume.READ_CACHE_POLICY_DISABLED:
-            raise LsmError(ErrorNumber.INVALID_ARGUMENT,
-                           "Argument rcp should be "
-                           "Volume.READ_CACHE_POLICY_ENABLED or "
-                           "Volume.READ_CACHE_POLICY_DISABLED")
+        _check_volume_rcp(rcp)
         return self._tp.rpc('volume_read_cache_policy_update',
                             _del_self(locals()))
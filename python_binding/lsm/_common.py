@@ -14,23 +14,16 @@
 #
 # Author: tasleson
 
-import hashlib
-
 import os
-import unittest
 import re
 
 import sys
 import syslog
 import collections
-import inspect
 
 try:
-    from urllib.error import (URLError, HTTPError)
     from urllib.parse import urlparse
 except ImportError:
-    from urllib2 import (URLError,
-                         HTTPError)
     from urlparse import urlparse
 import functools
 import traceback
@@ -62,6 +55,12 @@ def decorator(cls):
 
 
 def common_urllib2_error_handler(exp):
+    # Imported here as urllib2 pulls in httplib and ssl which plugins not
+    # using HTTP do not need.
+    try:
+        from urllib.error import (URLError, HTTPError)
+    except ImportError:
+        from urllib2 import (URLError, HTTPError)
 
     if isinstance(exp, HTTPError):
         raise LsmError(ErrorNumber.PLUGIN_AUTH_FAILED, str(exp))
@@ -317,6 +316,7 @@ def uri_parameters(uri):
 # @param    t   Item to generate signature on.
 # @returns  md5 hex digest.
 def md5(t):
+    import hashlib
     h = hashlib.md5()
     h.update(t.encode("utf-8"))
     return h.hexdigest()
@@ -535,7 +535,7 @@ def type_compare(method_name, exp_type, act_val):
             if (isinstance(exp_type, six.string_types) and
                     isinstance(act_val, six.string_types)):
                 return
-            if not inspect.isclass(exp_type) or \
+            if not isinstance(exp_type, six.class_types) or \
                     not issubclass(type(act_val), exp_type):
                 raise TypeError('%s call expected: %s got: %s ' %
                                 (method_name, str(exp_type),
@@ -575,33 +575,37 @@ def inner(*args, **kwargs):
     return outer
 
 
-class TestCommon(unittest.TestCase):
-    def setUp(self):
-        pass
+# Test code is only defined when executed directly, hence importing this
+# module does not load unittest.
+if __name__ == '__main__':
+    import unittest
 
-    def test_simple(self):
+    class TestCommon(unittest.TestCase):
+        def setUp(self):
+            pass
 
-        try:
-            raise SocketEOF()
-        except SocketEOF as e:
-            self.assertTrue(isinstance(e, SocketEOF))
+        def test_simple(self):
 
-        try:
-            raise LsmError(10, 'Message', 'Data')
-        except LsmError as e:
-            self.assertTrue(e.code == 10 and e.msg == 'Message' and
-                            e.data == 'Data')
+            try:
+                raise SocketEOF()
+            except SocketEOF as e:
+                self.assertTrue(isinstance(e, SocketEOF))
 
-        ed = addl_error_data('domain', 'level', 'exception', 'debug',
-                             'debug_data')
-        self.assertTrue(ed['domain'] == 'domain' and ed['level'] == 'level' and
-                        ed['debug'] == 'debug' and
-                        ed['exception'] == 'exception' and
-                        ed['debug_data'] == 'debug_data')
+            try:
+                raise LsmError(10, 'Message', 'Data')
+            except LsmError as e:
+                self.assertTrue(e.code == 10 and e.msg == 'Message' and
+                                e.data == 'Data')
 
-    def tearDown(self):
-        pass
+            ed = addl_error_data('domain', 'level', 'exception', 'debug',
+                                 'debug_data')
+            self.assertTrue(ed['domain'] == 'domain' and
+                            ed['level'] == 'level' and
+                            ed['debug'] == 'debug' and
+                            ed['exception'] == 'exception' and
+                            ed['debug_data'] == 'debug_data')
 
+        def tearDown(self):
+            pass
 
-if __name__ == '__main__':
     unittest.main()
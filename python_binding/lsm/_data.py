@@ -38,12 +38,85 @@ class DataEncoder(json.JSONEncoder):
     """
     Custom json encoder for objects derived form ILsmData
     """
+    # IData class => function returning the dictionary to encode.
+    _serializers = {}
+
+    @staticmethod
+    def _to_dict_overridden(lsm_class):
+        return six.get_unbound_function(lsm_class._to_dict) is not \
+            six.get_unbound_function(IData._to_dict)
+
+    @staticmethod
+    def _serializer(lsm_class):
+        """
+        Build the serializer of specified IData class.
+        Nested IData values are left in place, json encoder will invoke
+        default() for them again, hence no temporary dictionaries are
+        created for the nested objects beforehand.
+        """
+        if DataEncoder._to_dict_overridden(lsm_class):
+            return lsm_class._to_dict
+
+        class_name = lsm_class.__name__
+        # Attribute name => key name, filled on the fly as attributes
+        # could be added by subclass or plugin.
+        key_names = {}
+
+        def serialize(obj):
+            rc = {'class': class_name}
+            for (k, v) in obj.__dict__.items():
+                key = key_names.get(k)
+                if key is None:
+                    key = key_names[k] = k[1:]
+                rc[key] = v
+            return rc
+
+        return serialize
 
     def default(self, my_class):
-        if not isinstance(my_class, IData):
-            raise ValueError('incorrect class type:' + str(type(my_class)))
-        else:
-            return my_class._to_dict()
+        serializer = DataEncoder._serializers.get(my_class.__class__)
+        if serializer is None:
+            if not isinstance(my_class, IData):
+                raise ValueError(
+                    'incorrect class type:' + str(type(my_class)))
+            serializer = DataEncoder._serializer(my_class.__class__)
+            DataEncoder._serializers[my_class.__class__] = serializer
+        return serializer(my_class)
+
+    @staticmethod
+    def columnar(lsm_objs):
+        """
+        Return the columnar form of a list holding two or more objects of
+        the same IData class and the same attributes, which repeats neither
+        the class nor the key names for every object:
+            {'column_class': <class name>,
+             'columns': [<key>, ...],
+             'rows': [[<value>, ...], ...]}
+        Return None for anything else.
+        """
+        if type(lsm_objs) is not list or len(lsm_objs) < 2:
+            return None
+        lsm_class = type(lsm_objs[0])
+        if not issubclass(lsm_class, IData) or \
+           DataEncoder._to_dict_overridden(lsm_class):
+            return None
+
+        attrs = list(lsm_objs[0].__dict__.keys())
+        attr_count = len(attrs)
+        rows = []
+        try:
+            for lsm_obj in lsm_objs:
+                if type(lsm_obj) is not lsm_class or \
+                   len(lsm_obj.__dict__) != attr_count:
+                    return None
+                attr_dict = lsm_obj.__dict__
+                rows.append(list(attr_dict[a] for a in attrs))
+        except KeyError:
+            return None
+
+        return {'column_class': lsm_class.__name__,
+                'columns': list(a[1:] for a in attrs),
+                'rows': rows}
 
 
 class DataDecoder(json.JSONDecoder):
@@ -60,6 +133,8 @@ def __process_dict(d):
 
         if 'class' in d:
             rc = IData._factory(d)
+        elif 'column_class' in d:
+            rc = IData._columnar_factory(d)
         else:
             for (k, v) in d.items():
                 rc[k] = DataDecoder.__decode(v)
@@ -139,6 +214,22 @@ def _factory(d):
 
             return c(**d)
 
+    @staticmethod
+    def _columnar_factory(d):
+        """
+        Create the list of objects from the columnar form made by
+        DataEncoder.columnar(), without building a dictionary per object.
+        """
+        c = get_class(__name__ + '.' + d['column_class'])
+        arg_names = list('_' + k for k in d['columns'])
+        rc = []
+        for row in d['rows']:
+            for i, v in enumerate(row):
+                if isinstance(v, dict) and 'class' in v:
+                    row[i] = IData._factory(v)
+            rc.append(c(**dict(zip(arg_names, row))))
+        return rc
+
     def __str__(self):
         """
         Used for human string representation.
@@ -1005,7 +1096,7 @@ class Capabilities(IData):
 
     def _to_dict(self):
         return {'class': self.__class__.__name__,
-                'cap': ''.join(['%02x' % b for b in self._cap])}
+                'cap': binascii.hexlify(self._cap).decode('ascii')}
 
     def __init__(self, _cap=None):
         if _cap is not None:
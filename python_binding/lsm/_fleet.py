@@ -0,0 +1,235 @@
+# Copyright (C) 2016 Red Hat, Inc.
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; If not, see <http://www.gnu.org/licenses/>.
+
+import threading
+import time
+
+import six
+from six.moves import queue
+
+from lsm._common import LsmError, ErrorNumber
+from lsm._common import SocketEOF as _SocketEOF
+from lsm._client import Client, _LIST_METHODS
+
+# Methods invoked by fleet_inventory() when not specified.
+_INVENTORY_METHODS = ['systems', 'pools', 'volumes', 'disks']
+
+_CONCURRENCY_DEFAULT = 16
+
+# Errors leaving the plug-in connection unusable, the remaining methods of
+# the array are skipped.
+_CONNECTION_ERRORS = [ErrorNumber.TRANSPORT_COMMUNICATION,
+                      ErrorNumber.TIMEOUT]
+
+# Seconds between checks for KeyboardInterrupt while waiting for results,
+# as Queue.get() without timeout could not be interrupted on python 2.
+_POLL_INTERVAL = 1
+
+
+def _remaining(deadline):
+    remaining = deadline - time.time()
+    if remaining <= 0:
+        raise LsmError(ErrorNumber.TIMEOUT, "Array timeout expired")
+    return remaining
+
+
+class _FleetClient(Client):
+    """
+    lsm.Client applying the array deadline to the socket, before
+    plugin_register and before each following call.
+    """
+    def __init__(self, uri, plain_text_password, timeout_ms, deadline):
+        self._deadline = deadline
+        Client.__init__(self, uri, plain_text_password, timeout_ms)
+
+    def _socket_get(self, path):
+        s = Client._socket_get(self, path)
+        if self._deadline is not None:
+            try:
+                s.settimeout(_remaining(self._deadline))
+            except LsmError:
+                s.close()
+                raise
+        return s
+
+    def deadline_apply(self):
+        if self._deadline is not None:
+            self._tp.s.settimeout(_remaining(self._deadline))
+
+    def abort(self):
+        """
+        Close the connection without plugin_unregister, used when the
+        connection is broken or out of sync.
+        """
+        self._tp.close()
+        self._tp = None
+
+
+def _array_inventory(uri, password, methods, timeout_ms, deadline, flags,
+                     report):
+    """
+    Invoke the methods on a single array, report(uri, method, result, error)
+    is invoked once for each method.
+    """
+    client = None
+    pending = list(methods)
+    try:
+        client = _FleetClient(uri, password, timeout_ms, deadline)
+        while pending:
+            try:
+                client.deadline_apply()
+                result = getattr(client, pending[0])(flags=flags)
+            except LsmError as lsm_err:
+                if lsm_err.code in _CONNECTION_ERRORS:
+                    raise
+                report(uri, pending.pop(0), None, lsm_err)
+            else:
+                report(uri, pending.pop(0), result, None)
+        client.close()
+        client = None
+    except Exception as exp:
+        if deadline is not None and time.time() >= deadline:
+            lsm_err = LsmError(ErrorNumber.TIMEOUT,
+                               "Array timeout expired", str(exp))
+        elif isinstance(exp, LsmError):
+            lsm_err = exp
+        elif isinstance(exp, _SocketEOF):
+            lsm_err = LsmError(ErrorNumber.TRANSPORT_COMMUNICATION,
+                               "Plug-in closed the connection")
+        else:
+            lsm_err = LsmError(ErrorNumber.LIB_BUG, "Unexpected exception",
+                               str(exp))
+        for method in pending:
+            report(uri, method, None, lsm_err)
+    finally:
+        if client is not None and client._tp is not None:
+            client.abort()
+
+
+def fleet_inventory(uris, password=None, methods=None,
+                    concurrency=_CONCURRENCY_DEFAULT, timeout_ms=30000,
+                    array_timeout_ms=None, flags=Client.FLAG_RSVD):
+    """
+    lsm.fleet_inventory(uris, password=None, methods=None, concurrency=16,
+                        timeout_ms=30000, array_timeout_ms=None,
+                        flags=lsm.Client.FLAG_RSVD)
+
+    Version:
+        1.4
+    Usage:
+        Retrieve the inventory of many storage systems concurrently.
+        Each URI gets its own lsm.Client connection, up to 'concurrency'
+        of them at the same time, on which the list methods are invoked
+        one after another. Results are yielded as soon as they arrive, so
+        results of different URIs are interleaved.
+        Failure of one URI does not affect the others. When an URI fails to
+        connect, times out or loses its plug-in connection, the error is
+        yielded for each of its remaining methods.
+        Closing the generator early lets the URIs being queried finish and
+        skips the others.
+    Parameters:
+        uris ([string] or [(string, string)])
+            List of URIs, or (URI, password) pairs to use different
+            passwords.
+        password (string)
+            Optional. Password for the URIs given without password.
+        methods ([string])
+            Optional. Names of the list methods of lsm.Client to invoke
+            without search: 'systems', 'pools', 'volumes', 'disks',
+            'access_groups', 'fs', 'exports', 'target_ports' or
+            'batteries'. Default is systems, pools, volumes and disks.
+        concurrency (int)
+            Optional. Maximum count of URIs queried at the same time.
+        timeout_ms (int)
+            Optional. Plug-in timeout of each lsm.Client.
+        array_timeout_ms (int)
+            Optional. Time limit in milliseconds for all calls of a single
+            URI including plugin_register, counted from its connection.
+            None means no limit other than timeout_ms.
+        flags (int)
+            Optional. Reserved for future use.
+            Should be set as lsm.Client.FLAG_RSVD.
+    Returns:
+        Generator of (uri, method, result, error) tuples, one for each
+        URI and method.
+            uri (string)
+                The URI as given.
+            method (string)
+                The method name.
+            result (list)
+                The return of the method, None on error.
+            error (lsm.LsmError)
+                None on success. ErrorNumber.TIMEOUT when array_timeout_ms
+                expired.
+    SpecialExceptions:
+        LsmError
+            ErrorNumber.INVALID_ARGUMENT
+                Unsupported method or invalid concurrency.
+    """
+    if methods is None:
+        methods = _INVENTORY_METHODS
+    for method in methods:
+        if method not in _LIST_METHODS.values():
+            raise LsmError(ErrorNumber.INVALID_ARGUMENT,
+                           "Unsupported inventory method: %s" % method)
+    if concurrency < 1:
+        raise LsmError(ErrorNumber.INVALID_ARGUMENT,
+                       "Invalid concurrency %s" % concurrency)
+
+    arrays = queue.Queue()
+    array_count = 0
+    for uri in uris:
+        if isinstance(uri, six.string_types):
+            uri = (uri, password)
+        arrays.put(uri)
+        array_count += 1
+
+    results = queue.Queue()
+    stop = threading.Event()
+
+    def report(*result):
+        results.put(result)
+
+    def worker():
+        while not stop.is_set():
+            try:
+                (uri, uri_password) = arrays.get_nowait()
+            except queue.Empty:
+                return
+            deadline = None
+            if array_timeout_ms is not None:
+                deadline = time.time() + array_timeout_ms / 1000.0
+            _array_inventory(uri, uri_password, methods, timeout_ms,
+                             deadline, flags, report)
+            # Marks the end of this array.
+            results.put(None)
+
+    for i in range(0, min(concurrency, array_count)):
+        thread = threading.Thread(target=worker)
+        thread.daemon = True
+        thread.start()
+
+    try:
+        done = 0
+        while done < array_count:
+            try:
+                result = results.get(True, _POLL_INTERVAL)
+            except queue.Empty:
+                continue
+            if result is None:
+                done += 1
+            else:
+                yield result
+    finally:
+        stop.set()
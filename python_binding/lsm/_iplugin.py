@@ -14,11 +14,16 @@
 #
 # Author: tasleson
 
+import time
 from abc import ABCMeta as _ABCMeta
 from abc import abstractmethod as _abstractmethod
-from lsm import LsmError, ErrorNumber
+from lsm import LsmError, ErrorNumber, JobStatus
 from six import with_metaclass
 
+# Polling interval range(seconds) of IPlugin.job_wait()
+_JOB_WAIT_INTERVAL_MIN = 0.05
+_JOB_WAIT_INTERVAL_MAX = 2.0
+
 
 class IPlugin(with_metaclass(_ABCMeta, object)):
     """
@@ -26,6 +31,8 @@ class IPlugin(with_metaclass(_ABCMeta, object)):
     operation.
     """
 
+    FLAG_JOB_WAIT_ALL = 1 << 0
+
     @_abstractmethod
     def plugin_register(self, uri, password, timeout, flags=0):
         """
@@ -87,6 +94,40 @@ def job_free(self, job_id, flags=0):
         """
         pass
 
+    def job_wait(self, job_ids, timeout=None, flags=0):
+        """
+        Blocks until any of the jobs finished, or all of them if
+        FLAG_JOB_WAIT_ALL is set in flags, or until timeout(ms) expired.
+        No time limit if timeout is None.
+
+        Returns a list of job_status() results in the order of job_ids,
+        else raises LsmError.
+
+        Default implementation polls job_status() with growing interval,
+        plug-in with native job completion notification should override it.
+        """
+        deadline = None
+        if timeout is not None:
+            deadline = time.time() + timeout / 1000.0
+        interval = _JOB_WAIT_INTERVAL_MIN
+
+        while True:
+            rc = list(self.job_status(job_id) for job_id in job_ids)
+            finished = list(r[0] != JobStatus.INPROGRESS for r in rc)
+            if flags & IPlugin.FLAG_JOB_WAIT_ALL:
+                if all(finished):
+                    return rc
+            elif any(finished) or len(job_ids) == 0:
+                return rc
+
+            sleep_time = interval
+            if deadline is not None:
+                sleep_time = min(sleep_time, deadline - time.time())
+                if sleep_time <= 0:
+                    return rc
+            time.sleep(sleep_time)
+            interval = min(interval * 2, _JOB_WAIT_INTERVAL_MAX)
+
     @_abstractmethod
     def capabilities(self, system, flags=0):
         """
@@ -147,6 +188,28 @@ def volume_create(self, pool, volume_name, size_bytes, provisioning,
         """
         raise LsmError(ErrorNumber.NO_SUPPORT, "Not supported")
 
+    def volume_create_many(self, requests, flags=0):
+        """
+        Creates volumes, requests is a list of
+        [pool, volume_name, size_bytes, provisioning].
+
+        Returns a list of [job_id, new volume, error] in the order of
+        requests. The error is None on success, else the [code, message] of
+        the LsmError raised for that request.
+
+        Default implementation invokes volume_create() for each request,
+        plug-in could override it to create all volumes at once.
+        """
+        rc = []
+        for (pool, volume_name, size_bytes, provisioning) in requests:
+            try:
+                (job_id, volume) = self.volume_create(
+                    pool, volume_name, size_bytes, provisioning, flags)
+                rc.append([job_id, volume, None])
+            except LsmError as lsm_err:
+                rc.append([None, None, [lsm_err.code, lsm_err.msg]])
+        return rc
+
     def volume_delete(self, volume, flags=0):
         """
         Deletes a volume.
@@ -237,6 +300,26 @@ def volume_mask(self, access_group, volume, flags=0):
         """
         raise LsmError(ErrorNumber.NO_SUPPORT, "Not supported")
 
+    def volume_mask_many(self, access_group, volumes, flags=0):
+        """
+        Allows an access group to access all the volumes.
+
+        Returns a list of error in the order of volumes. The error is None
+        on success, else the [code, message] of the LsmError raised for that
+        volume.
+
+        Default implementation invokes volume_mask() for each volume,
+        plug-in could override it to mask all volumes at once.
+        """
+        rc = []
+        for volume in volumes:
+            try:
+                self.volume_mask(access_group, volume, flags)
+                rc.append(None)
+            except LsmError as lsm_err:
+                rc.append([lsm_err.code, lsm_err.msg])
+        return rc
+
     def volume_unmask(self, access_group, volume, flags=0):
         """
         Revokes access for an access group for a volume
@@ -14,25 +14,102 @@
 #
 # Author: Gris Ge <fge@redhat.com>
 
+import os
+import threading
 import six
 
 from lsm import LsmError, ErrorNumber
 
-from lsm._clib import (_local_disk_vpd83_search, _local_disk_vpd83_get,
-                       _local_disk_rpm_get, _local_disk_list,
-                       _local_disk_link_type_get, _local_disk_ident_led_on,
-                       _local_disk_ident_led_off, _local_disk_fault_led_on,
-                       _local_disk_fault_led_off, _local_disk_serial_num_get,
-                       _local_disk_led_status_get)
+# Maximum number of disks LocalDisk.info_list() queries concurrently.
+_INFO_LIST_MAX_THREADS = 16
 
+_INFO_KEYS = ('vpd83', 'rpm', 'link_type', 'serial_num', 'led_status')
 
-def _use_c_lib_function(func_ref, arg):
-    (data, err_no, err_msg) = func_ref(arg)
+# Kernel increases this number on every uevent, including disk add/remove
+# and disk change.
+_UEVENT_SEQNUM_PATH = '/sys/kernel/uevent_seqnum'
+_SYS_BLOCK_PATH = '/sys/block'
+
+_MAX_VPD83_LEN = 32
+
+_VPD83_INDEX_LOCK = threading.Lock()
+_VPD83_INDEX = {
+    'stamp': None,
+    'index': None,
+}
+
+
+def _clib_get():
+    """
+    Load the C extension on first use, most users of lsm package never
+    touch local disks.
+    """
+    from lsm import _clib
+    return _clib
+
+
+def _use_c_lib_function(func_name, arg):
+    (data, err_no, err_msg) = getattr(_clib_get(), func_name)(arg)
     if err_no != ErrorNumber.OK:
         raise LsmError(err_no, err_msg)
     return data
 
 
+def _vpd83_index_stamp():
+    """
+    Return a value which changes whenever local disks might have been added,
+    removed or changed. Return None if no cheap check is available.
+    """
+    try:
+        with open(_UEVENT_SEQNUM_PATH) as seqnum_file:
+            return seqnum_file.read().strip()
+    except (IOError, OSError):
+        pass
+    try:
+        return (os.stat(_SYS_BLOCK_PATH).st_mtime,
+                tuple(sorted(os.listdir(_SYS_BLOCK_PATH))))
+    except (IOError, OSError):
+        return None
+
+
+def _vpd83_index_build():
+    index = {}
+    for disk_path in LocalDisk.list():
+        if not disk_path.startswith('/dev/sd'):
+            continue
+        try:
+            vpd83 = LocalDisk.vpd83_get(disk_path)
+        except LsmError:
+            # Disk might be removed or not support VPD 0x83, skip it like
+            # lsm_local_disk_vpd83_search() does.
+            continue
+        if vpd83:
+            index.setdefault(vpd83, []).append(disk_path)
+    return index
+
+
+def _vpd83_index_get():
+    """
+    Return the VPD83 to disk paths dictionary, only rebuild it when
+    _vpd83_index_stamp() changed.
+    """
+    with _VPD83_INDEX_LOCK:
+        stamp = _vpd83_index_stamp()
+        if stamp is None or stamp != _VPD83_INDEX['stamp'] or \
+           _VPD83_INDEX['index'] is None:
+            _VPD83_INDEX['index'] = _vpd83_index_build()
+            _VPD83_INDEX['stamp'] = stamp
+        return _VPD83_INDEX['index']
+
+
+def _vpd83_check(vpd83):
+    if len(vpd83) > _MAX_VPD83_LEN:
+        raise LsmError(ErrorNumber.INVALID_ARGUMENT,
+                       "Provided vpd83 string exceeded the maximum string "
+                       "length for SCSI VPD83 NAA ID %d, current %d" %
+                       (_MAX_VPD83_LEN, len(vpd83)))
+
+
 class LocalDisk(object):
 
     @staticmethod
@@ -46,6 +123,8 @@ def vpd83_search(vpd83):
             Find out the disk paths for given SCSI VPD page 0x83 NAA type
             ID. Considering multipath, certain VPD83 might have multiple disks
             associated.
+            Local disks are only scanned when disks have been added, removed
+            or changed since last search in current process.
         Parameters:
             vpd83 (string)
                 The VPD83 NAA type ID.
@@ -62,7 +141,43 @@ def vpd83_search(vpd83):
             N/A
                 No capability required as this is a library level method.
         """
-        return _use_c_lib_function(_local_disk_vpd83_search, vpd83)
+        _vpd83_check(vpd83)
+        return list(_vpd83_index_get().get(vpd83, []))
+
+    @staticmethod
+    def vpd83_search_many(vpd83s):
+        """
+        lsm.LocalDisk.vpd83_search_many(vpd83s)
+
+        Version:
+            1.4
+        Usage:
+            Find out the disk paths for each of given SCSI VPD page 0x83 NAA
+            type IDs. Local disks are only scanned when disks have been
+            added, removed or changed since last search in current process.
+        Parameters:
+            vpd83s (list of string)
+                The VPD83 NAA type IDs.
+        Returns:
+            {vpd83: [disk_path]}
+                Dictionary with each provided VPD83 as key and list of disk
+                path string as value. Empty list if not disk found.
+                The disk_path string format is '/dev/sd[a-z]+' for SCSI and
+                ATA disks.
+        SpecialExceptions:
+            LsmError
+                ErrorNumber.LIB_BUG
+                    Internal bug.
+                ErrorNumber.INVALID_ARGUMENT
+                    Invalid VPD83 string.
+        Capability:
+            N/A
+                No capability required as this is a library level method.
+        """
+        for vpd83 in vpd83s:
+            _vpd83_check(vpd83)
+        index = _vpd83_index_get()
+        return dict((vpd83, list(index.get(vpd83, []))) for vpd83 in vpd83s)
 
     @staticmethod
     def serial_num_get(disk_path):
@@ -92,7 +207,7 @@ def serial_num_get(disk_path):
             N/A
                 No capability required as this is a library level method.
         """
-        return _use_c_lib_function(_local_disk_serial_num_get, disk_path)
+        return _use_c_lib_function('_local_disk_serial_num_get', disk_path)
 
     @staticmethod
     def vpd83_get(disk_path):
@@ -123,7 +238,7 @@ def vpd83_get(disk_path):
             N/A
                 No capability required as this is a library level method.
         """
-        return _use_c_lib_function(_local_disk_vpd83_get, disk_path)
+        return _use_c_lib_function('_local_disk_vpd83_get', disk_path)
 
     @staticmethod
     def rpm_get(disk_path):
@@ -164,7 +279,7 @@ def rpm_get(disk_path):
             N/A
                 No capability required as this is a library level method.
         """
-        return _use_c_lib_function(_local_disk_rpm_get, disk_path)
+        return _use_c_lib_function('_local_disk_rpm_get', disk_path)
 
     @staticmethod
     def list():
@@ -193,7 +308,7 @@ def list():
             N/A
                 No capability required as this is a library level method.
         """
-        (disk_paths, err_no, err_msg) = _local_disk_list()
+        (disk_paths, err_no, err_msg) = _clib_get()._local_disk_list()
         if err_no != ErrorNumber.OK:
             raise LsmError(err_no, err_msg)
         return disk_paths
@@ -255,7 +370,7 @@ def link_type_get(disk_path):
             N/A
                 No capability required as this is a library level method.
         """
-        return _use_c_lib_function(_local_disk_link_type_get, disk_path)
+        return _use_c_lib_function('_local_disk_link_type_get', disk_path)
 
     @staticmethod
     def ident_led_on(disk_path):
@@ -283,7 +398,7 @@ def ident_led_on(disk_path):
             N/A
                 No capability required as this is a library level method.
         """
-        return _use_c_lib_function(_local_disk_ident_led_on, disk_path)
+        return _use_c_lib_function('_local_disk_ident_led_on', disk_path)
 
     @staticmethod
     def ident_led_off(disk_path):
@@ -311,7 +426,7 @@ def ident_led_off(disk_path):
             N/A
                 No capability required as this is a library level method.
         """
-        return _use_c_lib_function(_local_disk_ident_led_off, disk_path)
+        return _use_c_lib_function('_local_disk_ident_led_off', disk_path)
 
     @staticmethod
     def fault_led_on(disk_path):
@@ -339,7 +454,7 @@ def fault_led_on(disk_path):
             N/A
                 No capability required as this is a library level method.
         """
-        return _use_c_lib_function(_local_disk_fault_led_on, disk_path)
+        return _use_c_lib_function('_local_disk_fault_led_on', disk_path)
 
     @staticmethod
     def fault_led_off(disk_path):
@@ -369,7 +484,7 @@ def fault_led_off(disk_path):
             N/A
                 No capability required as this is a library level method.
         """
-        return _use_c_lib_function(_local_disk_fault_led_off, disk_path)
+        return _use_c_lib_function('_local_disk_fault_led_off', disk_path)
 
     @staticmethod
     def led_status_get(disk_path):
@@ -419,4 +534,90 @@ def led_status_get(disk_path):
             N/A
                 No capability required as this is a library level method.
         """
-        return _use_c_lib_function(_local_disk_led_status_get, disk_path)
+        return _use_c_lib_function('_local_disk_led_status_get', disk_path)
+
+    @staticmethod
+    def info_list(max_threads=_INFO_LIST_MAX_THREADS):
+        """
+        Version:
+            1.4
+        Usage:
+            Query the disk paths and properties of all local disks in single
+            call. Each disk is opened only once and its SCSI VPD pages are
+            shared by all the properties. Disks are queried concurrently by
+            at most 'max_threads' threads.
+            This is much faster than invoking LocalDisk.vpd83_get(),
+            LocalDisk.rpm_get(), LocalDisk.link_type_get(),
+            LocalDisk.serial_num_get() and LocalDisk.led_status_get()
+            against every path returned by LocalDisk.list().
+        Parameters:
+            max_threads (integer, optional)
+                The maximum number of disks to query concurrently.
+        Returns:
+            [info_dict]
+                List of dictionary in the order of LocalDisk.list():
+                    {
+                        'disk_path': string,
+                        'vpd83': string,
+                        'rpm': integer,
+                        'link_type': integer,
+                        'serial_num': string,
+                        'led_status': integer,
+                    }
+                Property not supported by certain disk will be set as empty
+                string for 'vpd83' and 'serial_num', lsm.Disk.RPM_NO_SUPPORT
+                for 'rpm', lsm.Disk.LINK_TYPE_NO_SUPPORT for 'link_type' and
+                lsm.Disk.LED_STATUS_UNKNOWN for 'led_status'.
+        SpecialExceptions:
+            LsmError
+                ErrorNumber.LIB_BUG
+                    Internal bug.
+                ErrorNumber.INVALID_ARGUMENT
+                    Invalid max_threads.
+                ErrorNumber.NOT_FOUND_DISK
+                    Disk is removed during the query.
+                ErrorNumber.PERMISSION_DENIED
+                    Insufficient permission to access disk path.
+        Capability:
+            N/A
+                No capability required as this is a library level method.
+        """
+        if max_threads < 1:
+            raise LsmError(ErrorNumber.INVALID_ARGUMENT,
+                           "Invalid max_threads %d, should be bigger "
+                           "than 0" % max_threads)
+
+        disk_paths = LocalDisk.list()
+        infos = [None] * len(disk_paths)
+        errors = []
+        lock = threading.Lock()
+        disk_indexes = iter(range(len(disk_paths)))
+
+        def _worker():
+            while not errors:
+                with lock:
+                    i = next(disk_indexes, None)
+                if i is None:
+                    return
+                try:
+                    infos[i] = _use_c_lib_function('_local_disk_info_get',
+                                                   disk_paths[i])
+                except LsmError as lsm_err:
+                    errors.append(lsm_err)
+
+        threads = list(threading.Thread(target=_worker)
+                       for _ in range(min(max_threads, len(disk_paths))))
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        if errors:
+            raise errors[0]
+
+        rc = []
+        for disk_path, info in zip(disk_paths, infos):
+            info_dict = dict(zip(_INFO_KEYS, info))
+            info_dict['disk_path'] = disk_path
+            rc.append(info_dict)
+        return rc
@@ -15,15 +15,21 @@
 # Author: tasleson
 
 import socket
+import time
 import traceback
 import sys
 from lsm import LsmError, error, ErrorNumber
-from lsm.lsmcli import cmd_line_wrapper
 import six
 
 from lsm._common import SocketEOF as _SocketEOF
 from lsm._transport import TransPort
 
+# List methods which could be invoked through 'list_chunks'.
+_CHUNKED_LIST_METHODS = ['pools', 'systems', 'volumes', 'disks',
+                         'access_groups', 'fs', 'exports', 'target_ports',
+                         'batteries']
+
+
 def search_property(lsm_objs, search_key, search_value):
     """
     This method does not check whether lsm_obj contain requested property.
@@ -77,9 +83,37 @@ def __init__(self, plugin, args):
                 sys.exit(2)
 
         else:
+            # lsmcli is only needed when plug-in is executed by hand.
+            from lsm.lsmcli import cmd_line_wrapper
             self.cmdline = True
             cmd_line_wrapper(plugin)
 
+    def _list_chunks(self, msg_id, method, params, chunk_size):
+        """
+        Invoke the list method of plug-in and send the result in chunks of
+        chunk_size objects. The plug-in method could return any iterable.
+        Return the time spent in plug-in.
+        """
+        if method not in _CHUNKED_LIST_METHODS or \
+           not hasattr(self.plugin, method):
+            raise LsmError(ErrorNumber.NO_SUPPORT, "Unsupported operation")
+        if chunk_size < 1:
+            raise LsmError(ErrorNumber.INVALID_ARGUMENT,
+                           "Invalid chunk_size %s" % chunk_size)
+
+        start_time = time.time()
+        lsm_objs = getattr(self.plugin, method)(**params)
+        backend_time = time.time() - start_time
+
+        chunk = []
+        for lsm_obj in lsm_objs:
+            chunk.append(lsm_obj)
+            if len(chunk) == chunk_size:
+                self.tp.send_chunk(chunk, True, msg_id)
+                chunk = []
+        self.tp.send_chunk(chunk, False, msg_id)
+        return backend_time
+
     def run(self):
         # Don't need to invoke this when running stand alone as a cmdline
         if self.cmdline:
@@ -90,9 +124,13 @@ def run(self):
 
         try:
             while True:
+                method = None
+                backend_time = 0.0
+                failed = True
                 try:
                     # result = None
 
+                    self.tp.stats_call_begin()
                     msg = self.tp.read_req()
 
                     method = msg['method']
@@ -101,17 +139,36 @@ def run(self):
 
                     # Check to see if this plug-in implements this operation
                     # if not return the expected error.
-                    if hasattr(self.plugin, method):
-                        if params is None:
-                            result = getattr(self.plugin, method)()
-                        else:
-                            result = getattr(self.plugin, method)(
-                                **msg['params'])
+                    if method == 'list_chunks':
+                        # The reply is sent in chunks by _list_chunks()
+                        backend_time = self._list_chunks(msg_id, **params)
                     else:
-                        raise LsmError(ErrorNumber.NO_SUPPORT,
-                                       "Unsupported operation")
-
-                    self.tp.send_resp(result)
+                        if method == 'plugin_rpc_stats_get':
+                            # Handled here, the statistics are gathered by
+                            # the transport of this runner.
+                            result = self.tp.stats.get()
+                        elif hasattr(self.plugin, method):
+                            start_time = time.time()
+                            try:
+                                if params is None:
+                                    result = getattr(self.plugin, method)()
+                                else:
+                                    result = getattr(self.plugin, method)(
+                                        **msg['params'])
+                            finally:
+                                backend_time = time.time() - start_time
+                        else:
+                            raise LsmError(ErrorNumber.NO_SUPPORT,
+                                           "Unsupported operation")
+
+                        if method == 'plugin_register' and \
+                           'encodings' in msg:
+                            self.tp.send_resp(
+                                result, encodings=self.tp.encodings_accept(
+                                    msg['encodings']))
+                        else:
+                            self.tp.send_resp(result)
+                    failed = False
 
                     if method == 'plugin_register':
                         need_shutdown = True
@@ -119,6 +176,9 @@ def run(self):
                     if method == 'plugin_unregister':
                         # This is a graceful plugin_unregister
                         need_shutdown = False
+                        self.tp.stats_call_end(method,
+                                               backend_time=backend_time)
+                        method = None
                         self.tp.close()
                         break
 
@@ -131,6 +191,11 @@ def run(self):
                 except LsmError as lsm_err:
                     self.tp.send_error(msg_id, lsm_err.code, lsm_err.msg,
                                        lsm_err.data)
+                finally:
+                    if method is not None:
+                        self.tp.stats_call_end(method,
+                                               backend_time=backend_time,
+                                               failed=failed)
         except _SocketEOF:
             # Client went away and didn't meet our expectations for protocol,
             # this error message should not be seen as it shouldn't be
@@ -14,18 +14,159 @@
 #
 # Author: tasleson
 
+import bisect
+import copy
+import functools
 import json
 import socket
-import string
 import os
-import unittest
-import threading
+import struct
+import sys
+import time
 
-from lsm._common import LsmError, ErrorNumber
+from lsm._common import LsmError, ErrorNumber, error
 from lsm._common import SocketEOF as _SocketEOF
 from lsm._data import DataDecoder as _DataDecoder
 from lsm._data import DataEncoder as _DataEncoder
 
+# Default interval in seconds between exports to LSM_RPC_STATS_FILE.
+_STATS_EXPORT_INTERVAL = 60
+
+
+def _stats_file_append(path, stats):
+    """
+    Append the statistics as single JSON line to the file.
+    """
+    line = json.dumps({'time': time.time(), 'pid': os.getpid(),
+                       'program': os.path.basename(sys.argv[0]),
+                       'stats': stats})
+    try:
+        with open(path, 'a') as stats_file:
+            stats_file.write(line + '\n')
+    except (IOError, OSError) as e:
+        error("Failed to write RPC statistics to %s: %s" % (path, e))
+
+
+class RpcStats(object):
+    """
+    Per method statistics of the RPC calls going through a TransPort: call
+    and error counts, latency total, maximum and histogram, time spent in
+    JSON encoding and decoding(including the object construction of
+    DataDecoder), time spent in the plug-in methods and the payload sizes.
+    All times are in seconds.
+
+    If the environment variable LSM_RPC_STATS_FILE is defined, the
+    statistics are appended to that file as JSON lines every
+    LSM_RPC_STATS_INTERVAL seconds(60 by default) and when the transport is
+    closed.
+    """
+
+    # Upper bounds of the latency histogram buckets in milliseconds, the
+    # last bucket holds anything slower.
+    HISTOGRAM_BOUNDS_MS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000,
+                           5000, 10000]
+
+    def __init__(self):
+        self._methods = {}
+        self._export_cb = None
+        self._export_interval = None
+        self._export_next = None
+
+        path = os.getenv('LSM_RPC_STATS_FILE')
+        if path:
+            try:
+                interval = float(os.getenv('LSM_RPC_STATS_INTERVAL',
+                                           _STATS_EXPORT_INTERVAL))
+            except ValueError:
+                interval = _STATS_EXPORT_INTERVAL
+            self.export_set(functools.partial(_stats_file_append, path),
+                            interval)
+
+    def record(self, method, latency, encode_time=0.0, decode_time=0.0,
+               backend_time=0.0, bytes_sent=0, bytes_received=0,
+               failed=False):
+        stats = self._methods.get(method)
+        if stats is None:
+            stats = {
+                'count': 0,
+                'error_count': 0,
+                'latency_total': 0.0,
+                'latency_max': 0.0,
+                'latency_histogram':
+                    [0] * (len(RpcStats.HISTOGRAM_BOUNDS_MS) + 1),
+                'encode_total': 0.0,
+                'decode_total': 0.0,
+                'backend_total': 0.0,
+                'bytes_sent': 0,
+                'bytes_received': 0,
+            }
+            self._methods[method] = stats
+
+        stats['count'] += 1
+        if failed:
+            stats['error_count'] += 1
+        stats['latency_total'] += latency
+        stats['latency_max'] = max(stats['latency_max'], latency)
+        stats['latency_histogram'][bisect.bisect_left(
+            RpcStats.HISTOGRAM_BOUNDS_MS, latency * 1000)] += 1
+        stats['encode_total'] += encode_time
+        stats['decode_total'] += decode_time
+        stats['backend_total'] += backend_time
+        stats['bytes_sent'] += bytes_sent
+        stats['bytes_received'] += bytes_received
+
+        if self._export_next is not None and time.time() >= self._export_next:
+            self.export()
+
+    def get(self):
+        """
+        Return the statistics as a dictionary which could be serialized to
+        JSON:
+            {
+                'histogram_bounds_ms': [1, 2, 5, ...],
+                'methods': {
+                    '<method>': {
+                        'count': <int>,
+                        'error_count': <int>,
+                        'latency_total': <float>,
+                        'latency_max': <float>,
+                        'latency_histogram': [<int>, ...],
+                        'encode_total': <float>,
+                        'decode_total': <float>,
+                        'backend_total': <float>,
+                        'bytes_sent': <int>,
+                        'bytes_received': <int>,
+                    },
+                },
+            }
+        """
+        return {'histogram_bounds_ms': list(RpcStats.HISTOGRAM_BOUNDS_MS),
+                'methods': copy.deepcopy(self._methods)}
+
+    def reset(self):
+        self._methods = {}
+
+    def export_set(self, callback, interval=None):
+        """
+        Invoke callback with the statistics of get() every 'interval'
+        seconds while RPC calls are going on and on export().
+        If interval is None, callback is only invoked by export().
+        Set callback to None to stop exporting.
+        """
+        self._export_cb = callback
+        self._export_interval = interval
+        self._export_next = None
+        if callback is not None and interval is not None:
+            self._export_next = time.time() + interval
+
+    def export(self):
+        if self._export_cb is None:
+            return
+        if self._export_interval is not None:
+            self._export_next = time.time() + self._export_interval
+        self._export_cb(self.get())
+
+
 class TransPort(object):
     """
     Provides wire serialization by using json.  Loosely conforms to json-rpc,
@@ -35,30 +176,99 @@ class TransPort(object):
     <Zero padded 10 digit number [1..2**32] for the length followed by
     valid json.
 
+    Optional encodings are negotiated by plugin_register: the client lists
+    the encodings it understands in the 'encodings' member of the request,
+    the plug-in replies with the ones it will use in the 'encodings' member
+    of the response. Peers not aware of it ignore the unknown members.
+    'columnar' sends a result list of objects of the same class in the form
+    of DataEncoder.columnar().
+    'binary_frame' replaces the length header by a 8 bytes big endian
+    unsigned integer in both directions, starting from the message following
+    the plugin_register response.
+
     Notes:
     id field (json-rpc) is present but currently not being used.
     This is available to be expanded on later.
     """
 
     HDR_LEN = 10
+    BIN_HDR_LEN = 8
+
+    ENCODING_COLUMNAR = 'columnar'
+    ENCODING_BINARY_FRAME = 'binary_frame'
+    ENCODINGS = [ENCODING_COLUMNAR, ENCODING_BINARY_FRAME]
+
+    _BIN_HDR = struct.Struct('>Q')
+
+    # The length header comes from the peer, so the receive buffer is only
+    # grown by this much ahead of the data actually received.
+    _READ_CHUNK_MAX = 1024 * 1024
+
+    @staticmethod
+    def hdr_len(binary_frame):
+        if binary_frame:
+            return TransPort.BIN_HDR_LEN
+        return TransPort.HDR_LEN
+
+    @staticmethod
+    def hdr_pack(length, binary_frame):
+        """
+        Return the length header as bytes.
+        """
+        if binary_frame:
+            return TransPort._BIN_HDR.pack(length)
+        return str(length).zfill(TransPort.HDR_LEN).encode('ascii')
+
+    @staticmethod
+    def hdr_unpack(hdr, binary_frame):
+        """
+        Return the payload length of the header bytes.
+        """
+        if binary_frame:
+            return TransPort._BIN_HDR.unpack(bytes(hdr))[0]
+        return int(bytes(hdr))
 
     def _read_all(self, l):
         """
-        Reads l number of bytes before returning.  Will raise a SocketEOF
-        if socket returns zero bytes (i.e. socket no longer connected)
+        Reads l number of bytes into a bytearray before returning.  Will
+        raise a SocketEOF if socket returns zero bytes (i.e. socket no longer
+        connected)
         """
 
         if l < 1:
             raise ValueError("Trying to read less than 1 byte!")
 
         data = bytearray()
-        while len(data) < l:
-            r = self.s.recv(l - len(data))
+        received = 0
+        while received < l:
+            if received == len(data):
+                data.extend(
+                    bytearray(min(TransPort._READ_CHUNK_MAX, l - received)))
+            r = self.s.recv_into(memoryview(data)[received:])
             if not r:
                 raise _SocketEOF()
-            data += r
+            received += r
 
-        return data.decode("utf-8")
+        return data
+
+    def _send_buffers(self, hdr, data):
+        """
+        Send the header and the payload without concatenating them.
+        """
+        if not hasattr(self.s, 'sendmsg'):
+            # python 2
+            self.s.sendall(hdr)
+            self.s.sendall(data)
+            return
+
+        buffers = [memoryview(hdr), memoryview(data)]
+        while buffers:
+            sent = self.s.sendmsg(buffers)
+            while buffers and sent >= len(buffers[0]):
+                sent -= len(buffers[0])
+                buffers.pop(0)
+            if sent:
+                buffers[0] = buffers[0][sent:]
 
     def _send_msg(self, msg):
         """
@@ -70,9 +280,11 @@ def _send_msg(self, msg):
             raise ValueError("Msg argument empty")
 
         # Note: Don't catch io exceptions at this level!
-        s = str.zfill(str(len(msg)), self.HDR_LEN) + msg
         # common.Info("SEND: ", msg)
-        self.s.sendall(bytes(s.encode('utf-8')))
+        data = msg.encode('utf-8')
+        hdr = TransPort.hdr_pack(len(data), self._binary_frame)
+        self._send_buffers(hdr, data)
+        self._bytes_sent += len(hdr) + len(data)
 
     def _recv_msg(self):
         """
@@ -80,8 +292,12 @@ def _recv_msg(self):
         bytes of the message.
         """
         try:
-            l = self._read_all(self.HDR_LEN)
-            msg = self._read_all(int(l))
+            hdr_len = TransPort.hdr_len(self._binary_frame)
+            l = TransPort.hdr_unpack(self._read_all(hdr_len),
+                                     self._binary_frame)
+            msg = self._read_all(l).decode('utf-8')
+            self._recv_time = time.time()
+            self._bytes_received += hdr_len + l
             # common.Info("RECV: ", msg)
         except socket.error as e:
             raise LsmError(ErrorNumber.TRANSPORT_COMMUNICATION,
@@ -91,6 +307,48 @@ def _recv_msg(self):
 
     def __init__(self, socket_descriptor):
         self.s = socket_descriptor
+        self.stats = RpcStats()
+        self.stats_call_begin()
+        self._chunks_pending = False
+        # Encodings negotiated by plugin_register
+        self.encodings = []
+        self._binary_frame = False
+
+    def _encode(self, msg):
+        start = time.time()
+        data = json.dumps(msg, cls=_DataEncoder)
+        self._encode_time += time.time() - start
+        return data
+
+    def _decode(self, data):
+        start = time.time()
+        msg = json.loads(data, cls=_DataDecoder)
+        self._decode_time += time.time() - start
+        return msg
+
+    def stats_call_begin(self):
+        """
+        Reset the per call counters, invoked before sending a request or
+        reading a request.
+        """
+        self._encode_time = 0.0
+        self._decode_time = 0.0
+        self._bytes_sent = 0
+        self._bytes_received = 0
+        self._recv_time = None
+
+    def stats_call_end(self, method, start_time=None, backend_time=0.0,
+                       failed=False):
+        """
+        Record the call into self.stats. If start_time is None, the latency
+        is counted from the arrival of the last request read.
+        """
+        if start_time is None:
+            start_time = self._recv_time or time.time()
+        self.stats.record(method, time.time() - start_time,
+                          self._encode_time, self._decode_time,
+                          backend_time, self._bytes_sent,
+                          self._bytes_received, failed)
 
     @staticmethod
     def get_socket(path):
@@ -121,8 +379,9 @@ def close(self):
         Closes the transport and the underlying socket
         """
         self.s.close()
+        self.stats.export()
 
-    def send_req(self, method, args):
+    def send_req(self, method, args, encodings=None):
         """
         Sends a request given a method and arguments.
         Note: arguments must be in the form that can be automatically
@@ -130,7 +389,9 @@ def send_req(self, method, args):
         """
         try:
             msg = {'method': method, 'id': 100, 'params': args}
-            data = json.dumps(msg, cls=_DataEncoder)
+            if encodings is not None:
+                msg['encodings'] = encodings
+            data = self._encode(msg)
             self._send_msg(data)
         except socket.error as se:
             raise LsmError(ErrorNumber.TRANSPORT_COMMUNICATION,
@@ -144,16 +405,68 @@ def read_req(self):
         data = self._recv_msg()
         if len(data):
             # common.Info(str(data))
-            return json.loads(data, cls=_DataDecoder)
+            return self._decode(data)
 
-    def rpc(self, method, args):
+    def rpc(self, method, args, encodings=None):
         """
         Sends a request and waits for a response.
+        The encodings are requested for the following replies, only used
+        with plugin_register.
+        """
+        self._check_no_chunks_pending()
+        start_time = time.time()
+        failed = True
+        self.stats_call_begin()
+        try:
+            self.send_req(method, args, encodings)
+            resp = self._resp_read()
+            failed = False
+        finally:
+            self.stats_call_end(method, start_time, failed=failed)
+        assert resp['id'] == 100
+        if encodings is not None:
+            self._encodings_set(list(e for e in resp.get('encodings', [])
+                                     if e in encodings))
+        return resp['result']
+
+    def _check_no_chunks_pending(self):
+        if self._chunks_pending:
+            raise LsmError(ErrorNumber.INVALID_ARGUMENT,
+                           "Previous chunked reply is not fully read yet, "
+                           "exhaust or close its iterator first")
+
+    def rpc_chunks(self, method, args):
+        """
+        Generator sending a request and yielding the result chunks sent by
+        send_chunk(). No other request could be sent until the generator is
+        exhausted or closed, closing it early discards the remaining chunks.
         """
+        self._check_no_chunks_pending()
+        start_time = time.time()
+        failed = True
+        more = True
+        self.stats_call_begin()
         self.send_req(method, args)
-        (reply, msg_id) = self.read_resp()
-        assert msg_id == 100
-        return reply
+        self._chunks_pending = True
+        try:
+            while more:
+                (reply, msg_id, more) = self.read_chunk()
+                assert msg_id == 100
+                yield reply
+            failed = False
+        except LsmError:
+            # An error reply ends the chunks
+            more = False
+            raise
+        finally:
+            try:
+                while more:
+                    more = self.read_chunk()[2]
+            except LsmError:
+                pass
+            finally:
+                self._chunks_pending = False
+                self.stats_call_end(method, start_time, failed=failed)
 
     def send_error(self, msg_id, error_code, msg, data=None):
         """
@@ -161,111 +474,261 @@ def send_error(self, msg_id, error_code, msg, data=None):
         """
         e = {'id': msg_id, 'error': {'code': error_code, 'message': msg,
                                      'data': data}}
-        self._send_msg(json.dumps(e, cls=_DataEncoder))
+        self._send_msg(self._encode(e))
 
-    def send_resp(self, result, msg_id=100):
+    @staticmethod
+    def encodings_accept(encodings):
         """
-        Used to transmit a response
+        Return the requested encodings which are supported.
         """
-        r = {'id': msg_id, 'result': result}
-        self._send_msg(json.dumps(r, cls=_DataEncoder))
+        return list(e for e in encodings if e in TransPort.ENCODINGS)
 
-    def read_resp(self):
+    def _encodings_set(self, encodings):
+        self.encodings = encodings
+        self._binary_frame = TransPort.ENCODING_BINARY_FRAME in encodings
+
+    def _result_encode(self, result):
+        if TransPort.ENCODING_COLUMNAR in self.encodings:
+            columnar = _DataEncoder.columnar(result)
+            if columnar is not None:
+                return columnar
+        return result
+
+    def send_resp(self, result, msg_id=100, encodings=None):
+        """
+        Used to transmit a response. The encodings are only given in the
+        response of plugin_register, they apply to the following responses.
+        """
+        r = {'id': msg_id, 'result': self._result_encode(result)}
+        if encodings is not None:
+            r['encodings'] = encodings
+        self._send_msg(self._encode(r))
+        if encodings is not None:
+            self._encodings_set(encodings)
+
+    def send_chunk(self, result, more, msg_id=100):
+        """
+        Used to transmit one chunk of a response, 'more' should be False for
+        the last chunk.
+        """
+        r = {'id': msg_id, 'result': self._result_encode(result),
+             'more': more}
+        self._send_msg(self._encode(r))
+
+    def _resp_read(self):
+        """
+        Reads a response and returns the parsed message, raises LsmError for
+        an error response.
+        """
         data = self._recv_msg()
-        resp = json.loads(data, cls=_DataDecoder)
+        resp = self._decode(data)
 
         if 'result' in resp:
-            return resp['result'], resp['id']
+            return resp
         else:
             e = resp['error']
             raise LsmError(**e)
 
+    def read_resp(self):
+        return self.read_chunk()[0:2]
 
-def _server(s):
-    """
-    Test echo server for test case.
-    """
-    srv = TransPort(s)
+    def read_chunk(self):
+        """
+        Reads a response or a chunk of response, returns a tuple of
+        (result, msg_id, more).
+        """
+        resp = self._resp_read()
+        return resp['result'], resp['id'], resp.get('more', False)
 
-    msg = srv.read_req()
 
-    try:
-        while msg['method'] != 'done':
+# Test code is only defined when executed directly, hence importing this
+# module does not load unittest.
+if __name__ == "__main__":
+    import threading
+    import unittest
 
-            if msg['method'] == 'error':
-                srv.send_error(
-                    msg['id'],
-                    msg['params']['errorcode'],
-                    msg['params']['errormsg'])
-            else:
-                srv.send_resp(msg['params'])
-            msg = srv.read_req()
-        srv.send_resp(msg['params'])
-    finally:
-        s.close()
+    def _server(s):
+        """
+        Test echo server for test case.
+        """
+        srv = TransPort(s)
 
+        msg = srv.read_req()
 
-class _TestTransport(unittest.TestCase):
-    def setUp(self):
-        (self.c, self.s) = socket.socketpair(
-            socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            while msg['method'] != 'done':
+
+                if msg['method'] == 'error':
+                    srv.send_error(
+                        msg['id'],
+                        msg['params']['errorcode'],
+                        msg['params']['errormsg'])
+                elif msg['method'] == 'register':
+                    srv.send_resp(None, msg['id'], srv.encodings_accept(
+                        msg.get('encodings', [])))
+                elif msg['method'] == 'chunks':
+                    for chunk in msg['params'][:-1]:
+                        srv.send_chunk(chunk, True)
+                    srv.send_chunk(msg['params'][-1], False)
+                else:
+                    srv.send_resp(msg['params'])
+                msg = srv.read_req()
+            srv.send_resp(msg['params'])
+        finally:
+            s.close()
 
-        self.client = TransPort(self.c)
+    class _TestTransport(unittest.TestCase):
+        def setUp(self):
+            (self.c, self.s) = socket.socketpair(
+                socket.AF_UNIX, socket.SOCK_STREAM)
 
-        self.server = threading.Thread(target=_server, args=(self.s,))
-        self.server.start()
+            self.client = TransPort(self.c)
 
-    def test_simple(self):
-        tc = ['0', ' ', '   ', '{}:""', "Some text message", 'DEADBEEF']
+            self.server = threading.Thread(target=_server, args=(self.s,))
+            self.server.start()
 
-        for t in tc:
-            self.client.send_req('test', t)
-            reply, msg_id = self.client.read_resp()
-            self.assertTrue(msg_id == 100)
-            self.assertTrue(reply == t)
+        def test_simple(self):
+            tc = ['0', ' ', '   ', '{}:""', "Some text message", 'DEADBEEF']
 
-    def test_exceptions(self):
+            for t in tc:
+                self.client.send_req('test', t)
+                reply, msg_id = self.client.read_resp()
+                self.assertTrue(msg_id == 100)
+                self.assertTrue(reply == t)
 
-        e_msg = 'Test error message'
-        e_code = 100
+        def test_exceptions(self):
 
-        self.client.send_req('error', {'errorcode': e_code, 'errormsg': e_msg})
-        self.assertRaises(LsmError, self.client.read_resp)
+            e_msg = 'Test error message'
+            e_code = 100
 
-        try:
             self.client.send_req('error', {'errorcode': e_code,
                                            'errormsg': e_msg})
-            self.client.read_resp()
-        except LsmError as e:
-            self.assertTrue(e.code == e_code)
-            self.assertTrue(e.msg == e_msg)
+            self.assertRaises(LsmError, self.client.read_resp)
+
+            try:
+                self.client.send_req('error', {'errorcode': e_code,
+                                               'errormsg': e_msg})
+                self.client.read_resp()
+            except LsmError as e:
+                self.assertTrue(e.code == e_code)
+                self.assertTrue(e.msg == e_msg)
+
+        def test_slow(self):
+
+            # Try to test the receiver getting small chunks to read
+            # in a loop
+            for l in range(1, 4096, 10):
+
+                payload = "x" * l
+                msg = {'method': 'drip', 'id': 100, 'params': payload}
+                data = json.dumps(msg, cls=_DataEncoder)
+
+                wire = (str(len(data)).zfill(TransPort.HDR_LEN) +
+                        data).encode('utf-8')
+
+                self.assertTrue(len(msg) >= 1)
+
+                for i in range(0, len(wire)):
+                    self.c.send(wire[i:i + 1])
+
+                reply, msg_id = self.client.read_resp()
+                self.assertTrue(payload == reply)
+
+        def test_stats(self):
+            exported = []
+            self.client.stats.export_set(exported.append)
+
+            for i in range(0, 3):
+                self.client.rpc('test', 'x' * i)
+            self.assertRaises(LsmError, self.client.rpc, 'error',
+                              {'errorcode': 100, 'errormsg': 'Test error'})
+
+            self.client.stats.export()
+            self.assertTrue(len(exported) == 1)
+            stats = exported[0]['methods']
+            self.assertTrue(stats['test']['count'] == 3)
+            self.assertTrue(stats['test']['error_count'] == 0)
+            self.assertTrue(sum(stats['test']['latency_histogram']) == 3)
+            self.assertTrue(stats['test']['bytes_sent'] > 0)
+            self.assertTrue(stats['test']['bytes_received'] > 0)
+            self.assertTrue(stats['error']['count'] == 1)
+            self.assertTrue(stats['error']['error_count'] == 1)
+
+        def test_chunks(self):
+            chunks = [[1, 2], [3, 4], [5], []]
+            self.assertTrue(list(self.client.rpc_chunks('chunks', chunks)) ==
+                            chunks)
+
+            # Closing early discards the remaining chunks
+            it = self.client.rpc_chunks('chunks', chunks)
+            self.assertTrue(next(it) == chunks[0])
+            self.assertRaises(LsmError, self.client.rpc, 'test', 'x')
+            it.close()
+            self.assertTrue(self.client.rpc('test', 'x') == 'x')
+
+        def test_columnar(self):
+            from lsm._data import Volume
+
+            vols = list(Volume('VOL_%d' % i, 'vol %d' % i, '', 512, 1024,
+                               Volume.ADMIN_STATE_ENABLED, 'sys', 'pool')
+                        for i in range(0, 100))
+            plain = self.client.rpc('plain', vols)
+
+            self.client.rpc('register', None,
+                            ['unknown', TransPort.ENCODING_COLUMNAR])
+            self.assertTrue(self.client.encodings ==
+                            [TransPort.ENCODING_COLUMNAR])
+            columnar = self.client.rpc('columnar', vols)
+            self.assertTrue(list(v._to_dict() for v in plain) ==
+                            list(v._to_dict() for v in columnar))
+
+            stats = self.client.stats.get()['methods']
+            self.assertTrue(stats['columnar']['bytes_received'] <
+                            stats['plain']['bytes_received'])
+
+            # Mixed classes are sent as they are.
+            mixed = self.client.rpc('columnar', vols[0:1] + ['x'])
+            self.assertTrue(mixed[1] == 'x')
+            self.assertTrue(mixed[0].id == vols[0].id)
+
+        def test_binary_frame(self):
+            self.client.rpc('register', None,
+                            [TransPort.ENCODING_BINARY_FRAME])
+            self.assertTrue(self.client.encodings ==
+                            [TransPort.ENCODING_BINARY_FRAME])
+
+            for l in [0, 1, 4096, 1024 * 1024 * 4]:
+                payload = 'x' * l
+                self.assertTrue(self.client.rpc('test', payload) == payload)
+
+            # Length is sent as binary big endian number.
+            data = json.dumps({'method': 'drip', 'id': 100,
+                               'params': 'y'}).encode('utf-8')
+            self.c.sendall(TransPort.hdr_pack(len(data), True))
+            self.c.sendall(data)
+            self.assertTrue(self.client.read_resp()[0] == 'y')
+
+        def test_oversized_header(self):
+            # Peer closing after a header claiming a huge payload.
+            for (binary_frame, hdr) in [
+                    (True, TransPort.hdr_pack(2 ** 62, True)),
+                    (False, b'9' * TransPort.HDR_LEN)]:
+                (peer, s) = socket.socketpair(socket.AF_UNIX,
+                                              socket.SOCK_STREAM)
+                try:
+                    transport = TransPort(s)
+                    transport._binary_frame = binary_frame
+                    peer.sendall(hdr + b'abc')
+                    peer.close()
+                    self.assertRaises(_SocketEOF, transport._recv_msg)
+                finally:
+                    peer.close()
+                    s.close()
+
+        def tearDown(self):
+            self.client.send_req("done", None)
+            resp, msg_id = self.client.read_resp()
+            self.assertTrue(resp is None)
+            self.server.join()
 
-    def test_slow(self):
-
-        # Try to test the receiver getting small chunks to read
-        # in a loop
-        for l in range(1, 4096, 10):
-
-            payload = "x" * l
-            msg = {'method': 'drip', 'id': 100, 'params': payload}
-            data = json.dumps(msg, cls=_DataEncoder)
-
-            wire = string.zfill(len(data), TransPort.HDR_LEN) + data
-
-            self.assertTrue(len(msg) >= 1)
-
-            for i in wire:
-                self.c.send(i)
-
-            reply, msg_id = self.client.read_resp()
-            self.assertTrue(payload == reply)
-
-    def tearDown(self):
-        self.client.send_req("done", None)
-        resp, msg_id = self.client.read_resp()
-        self.assertTrue(resp is None)
-        self.server.join()
-
-
-if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,191 @@
+# Copyright (C) 2016 Red Hat, Inc.
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; If not, see <http://www.gnu.org/licenses/>.
+
+# Helpers shared by plugin_bench.py, smispy_bench.py and ontap_bench.py:
+# timing of operations, the common command line arguments, JSON output of
+# the results and comparison against a baseline.
+#
+# Results are dictionaries of benchmark name to the summary returned by
+# ms_summary(), optionally with counters like round trips added.
+
+from __future__ import print_function
+
+import json
+import platform
+import sys
+import time
+
+import lsm
+
+
+def ms_summary(durations):
+    """
+    Return min/median/mean of the durations(seconds) in milliseconds.
+    """
+    durations = sorted(durations)
+    count = len(durations)
+    if count % 2:
+        median = durations[count // 2]
+    else:
+        median = (durations[count // 2 - 1] + durations[count // 2]) / 2
+    return {
+        'unit': 'ms',
+        'count': count,
+        'min': durations[0] * 1000,
+        'median': median * 1000,
+        'mean': sum(durations) / count * 1000,
+    }
+
+
+def timed_run(record_func, name, func, *args):
+    """
+    Return func(*args) or None if LsmError raised. The
+    record_func(name, duration, error) is invoked afterwards with the
+    error code of LsmError or None.
+    """
+    error = None
+    start = time.time()
+    try:
+        result = func(*args)
+    except lsm.LsmError as lsm_error:
+        result = None
+        error = lsm_error.code
+    if record_func:
+        record_func(name, time.time() - start, error)
+    return result
+
+
+class Recorder(object):
+    """
+    Collect the durations, counters and errors of benchmark operations.
+    The counters_func() is invoked by record() and should return the
+    dictionary of counters since last invoke.
+    """
+    def __init__(self, counters_func=None):
+        self.counters_func = counters_func
+        self.durations = {}
+        self.counters = {}
+        self.errors = {}
+
+    def record(self, name, duration, error=None):
+        self.durations.setdefault(name, []).append(duration)
+        if self.counters_func:
+            for key, count in self.counters_func().items():
+                self.counters.setdefault(name, {}).setdefault(
+                    key, []).append(count)
+        if error is not None:
+            self.errors[name] = error
+
+    def results(self, counter_reduce=max):
+        """
+        Return the results. Counts of each counter are reduced to one
+        number by counter_reduce(counts).
+        """
+        results = {}
+        for name, values in self.durations.items():
+            results[name] = ms_summary(values)
+            for key, counts in self.counters.get(name, {}).items():
+                results[name][key] = counter_reduce(counts)
+            if name in self.errors:
+                results[name]['error'] = self.errors[name]
+        return results
+
+
+def args_add(parser, rounds,
+             tolerance_help='Slowdown in percent of median against baseline '
+                            'tolerated before reporting regression'):
+    """
+    Add the --rounds, --output, --baseline and --tolerance arguments.
+    """
+    parser.add_argument('--rounds', type=int, default=rounds,
+                        help='Count of samples for each operation')
+    parser.add_argument('--output', default=None,
+                        help='Write JSON result to this file')
+    parser.add_argument('--baseline', default=None,
+                        help='JSON result of earlier run to compare with')
+    parser.add_argument('--tolerance', type=float, default=20,
+                        help=tolerance_help)
+
+
+def compare(results, baseline, tolerance, counters=(), sized_counters=()):
+    """
+    Print the comparison against the baseline, return the count of
+    regressions. Median or sized_counters larger than baseline by more than
+    tolerance percent, or any increase of counters, is a regression.
+    """
+    keys = list(counters) + list(sized_counters)
+    name_len = max([len('benchmark')] + list(len(n) for n in results))
+    key_lens = list(max(len(k), 18) for k in keys)
+    print("%-*s %12s %12s %8s%s" %
+          (name_len, 'benchmark', 'baseline(ms)', 'now(ms)', 'ratio',
+           ''.join(' %*s' % (w, k) for w, k in zip(key_lens, keys))))
+
+    regressions = 0
+    limit = 1 + tolerance / 100.0
+    for name in sorted(results):
+        old = baseline.get(name)
+        if old is None:
+            continue
+        new = results[name]
+        ratio = new['median'] / max(old['median'], 1e-6)
+        cells = []
+        regression = ratio > limit
+        for key, key_len in zip(keys, key_lens):
+            if key not in old or key not in new:
+                cells.append(' %*s' % (key_len, '-'))
+                continue
+            if key in sized_counters:
+                regression |= new[key] > old[key] * limit
+            else:
+                regression |= new[key] > old[key]
+            cells.append(' %*s' % (key_len, '%d -> %d' % (old[key],
+                                                          new[key])))
+        mark = ''
+        if regression:
+            mark = ' REGRESSION'
+            regressions += 1
+        print("%-*s %12.3f %12.3f %8.2f%s%s" %
+              (name_len, name, old['median'], new['median'], ratio,
+               ''.join(cells), mark))
+    return regressions
+
+
+def report(args, meta, results, counters=(), sized_counters=(), **extra):
+    """
+    Print the JSON of results or write it to --output. Exit with 1 if any
+    regression against --baseline is found. Keyword arguments other than
+    counters and sized_counters are added to the JSON.
+    """
+    meta = dict(meta)
+    meta.update({
+        'time': time.time(),
+        'python': platform.python_version(),
+        'lsm_version': lsm.VERSION,
+        'rounds': args.rounds,
+    })
+    output = dict(extra)
+    output.update({'meta': meta, 'results': results})
+    output_json = json.dumps(output, indent=4, sort_keys=True)
+    if args.output:
+        with open(args.output, 'w') as output_file:
+            output_file.write(output_json)
+    else:
+        print(output_json)
+
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            baseline = json.load(baseline_file)['results']
+        if compare(results, baseline, args.tolerance, counters,
+                   sized_counters):
+            sys.exit(1)
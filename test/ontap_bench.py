@@ -0,0 +1,961 @@
+#!/usr/bin/env python
+# Copyright (C) 2016 Red Hat, Inc.
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; If not, see <http://www.gnu.org/licenses/>.
+
+# Performance testing of the ONTAP plugin without NetApp filer. No lsmd is
+# needed.
+#
+#   serve   Run a local HTTP server speaking the subset of the ONTAP 7-mode
+#           ZAPI XML used by the plugin, seeded with a synthetic inventory.
+#   bench   Run the server in background and drive the plugin through it.
+#
+# The inventory holds aggregates, NetApp volumes, LUNs spread over the
+# NetApp volumes, iSCSI initiator groups with LUNs mapped to them,
+# snapshots and a NFS export of each NetApp volume. LUNs, initiator
+# groups, LUN mappings, snapshots, NFS exports, file clones and NetApp
+# volumes could be changed through ZAPI. Like the real filer, basic
+# authentication is requested by HTTP 401 before any ZAPI is served.
+#
+# For each LUN count given in --scale, the benchmark operations are
+# executed in rounds, each round on a newly registered plugin. For each
+# operation, the ZAPI calls, HTTP requests(including authentication
+# challenges) and response bytes parsed by the plugin per call and the
+# min/median/mean wall time in milliseconds are measured.
+#
+# When a baseline(the JSON output of an earlier bench) is given, any
+# increase of ZAPI calls or HTTP requests, or median or bytes larger than
+# the baseline by more than the tolerance is reported as regression and
+# the exit code is 1.
+#
+# Usage:
+#   PYTHONPATH=<dir holding lsm package> python ontap_bench.py bench \
+#       [--scale 100,1000,10000] [--volumes 16] [--igroups 100] \
+#       [--snapshots 4] [--latency 5] [--rounds 10] \
+#       [--output result.json] [--baseline old.json] [--tolerance 20]
+#   PYTHONPATH=<dir holding lsm package> python ontap_bench.py serve \
+#       [--scale 1000] [--port 8080] [--latency 5]
+
+from __future__ import print_function
+
+import argparse
+import base64
+import sys
+import threading
+import time
+import uuid
+import xml.etree.ElementTree as ElementTree
+from xml.sax.saxutils import escape, quoteattr
+
+from six.moves import BaseHTTPServer, socketserver
+
+import lsm
+from lsm.external.xmltodict import convert_xml_to_dict
+from lsm.plugin.ontap.na import Filer, FilerError, to_list
+from lsm.plugin.ontap.ontap import Ontap
+
+import bench_common
+
+_TMO_MS = 30000
+_USERNAME = 'root'
+_PASSWORD = 'netapp1'
+
+_ZAPI_PATH = '/servlets/netapp.servlets.admin.XMLrequest_filer'
+
+_AGGR_COUNT = 2
+_AGGR_DISK_COUNT = 8
+_SPARE_DISK_COUNT = 4
+_DISK_BLOCKS = 585937500
+_DISK_SECTOR_SIZE = 512
+_AGGR_SIZE = 8 * 2 ** 40
+_VOL_SIZE = 2 ** 40
+_LUN_SIZE = 2 ** 30
+_LUN_MIN_SIZE = 4 * 2 ** 20
+_VOL_PREFIX = 'bench_vol_'
+_BENCH_LUN = 'bench_lun'
+_BENCH_IQN = 'iqn.1994-05.com.domain:01.bench'
+
+# Not in lsm.plugin.ontap.na
+_EAPINOTFOUND = 13005
+_EAGGRDOESNOTEXIST = 14420
+_EINITGROUPEXISTS = 9004
+_ESNAPSHOTEXISTS = 13020
+_ESNAPSHOTDOESNOTEXIST = 13021
+
+_RESPONSE_TEMPLATE = """<?xml version='1.0' encoding='UTF-8' ?>
+<!DOCTYPE netapp SYSTEM 'file:/etc/netapp_filer.dtd'>
+<netapp version='1.1' xmlns='http://www.netapp.com/filer/admin'>
+%s</netapp>
+"""
+
+
+class _ZapiError(Exception):
+    def __init__(self, errno, reason):
+        Exception.__init__(self, reason)
+        self.errno = errno
+        self.reason = reason
+
+
+def _xml_element(tag, value):
+    """
+    Convert value to XML elements named tag: dict for child elements,
+    list for repeated elements, None for empty element, anything else for
+    text.
+    """
+    if isinstance(value, list):
+        return ''.join(_xml_element(tag, v) for v in value)
+    if isinstance(value, dict):
+        content = ''.join(_xml_element(k, v) for k, v in value.items())
+    elif value is None:
+        content = ''
+    else:
+        content = escape('%s' % value)
+    return '<%s>%s</%s>' % (tag, content, tag)
+
+
+def _hostname_infos(hosts):
+    if hosts == ['*']:
+        return {'exports-hostname-info': [{'all-hosts': 'true'}]}
+    return {'exports-hostname-info': [{'name': h} for h in hosts]}
+
+
+def _lun_vol_name(path):
+    # LUN paths have the form /vol/<volume name>/<lun name>
+    return path[5:].split('/')[0]
+
+
+class _Filer(object):
+    """
+    In memory state of the emulated filer and the ZAPI implementations.
+    Each ZAPI 'foo-bar' is handled by method _zapi_foo_bar(params) which
+    returns the dictionary of result elements or raises _ZapiError.
+    """
+    def __init__(self, lun_count, vol_count, igroup_count, snapshot_count):
+        self.system_id = '0151745371'
+        self.system_name = 'bench-filer'
+        self.aggrs = {}
+        self.vols = {}
+        self.luns = {}
+        self.igroups = {}
+        # LUN path to {igroup name: LUN ID}
+        self.lun_maps = {}
+        # NetApp volume name to {snapshot name: access time}
+        self.snapshots = {}
+        # Export path to exports-rule-info
+        self.exports = {}
+        self._serial = 0
+        self._clone_id = 0
+
+        self._aggr_create('aggr0')
+        self._vol_create('vol0', 'aggr0', _VOL_SIZE)
+        for i in range(1, _AGGR_COUNT + 1):
+            self._aggr_create('aggr%d' % i)
+        for i in range(0, vol_count):
+            vol_name = '%s%d' % (_VOL_PREFIX, i)
+            self._vol_create(
+                vol_name, 'aggr%d' % (i % _AGGR_COUNT + 1), _VOL_SIZE)
+            self.exports['/vol/%s' % vol_name] = {
+                'pathname': '/vol/%s' % vol_name,
+                'read-write': _hostname_infos(['*']),
+                'root': _hostname_infos(['192.0.2.1']),
+                'sec-flavor': {'sec-flavor-info': {'flavor': 'sys'}},
+            }
+            for j in range(0, snapshot_count):
+                self.snapshots[vol_name]['hourly.%d' % j] = \
+                    '%d' % (1451606400 + j * 3600)
+        for i in range(0, igroup_count):
+            self.igroups['bench_ig_%d' % i] = {
+                'uuid': str(uuid.uuid4()),
+                'type': 'iscsi',
+                'initiators': ['%s%d' % (_BENCH_IQN, i)],
+            }
+        for i in range(0, lun_count):
+            path = '/vol/%s%d/lun_%d' % (_VOL_PREFIX, i % vol_count, i)
+            self._lun_create(path, _LUN_SIZE, True)
+            if igroup_count:
+                self.lun_maps[path]['bench_ig_%d' % (i % igroup_count)] = 0
+
+    def _aggr_create(self, name):
+        disk_names = []
+        for i in range(0, _AGGR_DISK_COUNT):
+            disk_names.append('0a.%02d' % (len(self.aggrs) *
+                                           _AGGR_DISK_COUNT + i))
+        self.aggrs[name] = {'size': _AGGR_SIZE, 'disks': disk_names}
+
+    def _vol_create(self, name, aggr_name, size):
+        self.vols[name] = {
+            'uuid': str(uuid.uuid4()),
+            'aggr': aggr_name,
+            'size': size,
+            'used': 0,
+            'state': 'online',
+            'parent': None,
+        }
+        self.snapshots[name] = {}
+
+    def _lun_create(self, path, size, reserved):
+        self._serial += 1
+        self.luns[path] = {
+            'size': size,
+            'serial': 'P3LB%08d' % self._serial,
+            'online': 'true',
+            'reserved': reserved,
+        }
+        self.lun_maps[path] = {}
+        self.vols[_lun_vol_name(path)]['used'] += size
+
+    def _lun_of(self, path):
+        if path not in self.luns:
+            raise _ZapiError(Filer.ENO_SUCH_VOLUME,
+                             'No such LUN exists')
+        return self.luns[path]
+
+    def _vol_of(self, name, errno=Filer.EFSDOESNOTEXIST):
+        if name not in self.vols:
+            raise _ZapiError(errno, 'No volume named %s exists' % name)
+        return self.vols[name]
+
+    def _igroup_of(self, name):
+        if name not in self.igroups:
+            raise _ZapiError(FilerError.NO_SUCH_IGROUP,
+                             'Initiator group %s does not exist' % name)
+        return self.igroups[name]
+
+    def _lun_info(self, path):
+        lun = self.luns[path]
+        return {
+            'path': path,
+            'size': lun['size'],
+            'size-used': 0,
+            'block-size': _DISK_SECTOR_SIZE,
+            'online': lun['online'],
+            'mapped': 'true' if self.lun_maps[path] else 'false',
+            'serial-number': lun['serial'],
+            'is-space-reservation-enabled':
+                'true' if lun['reserved'] else 'false',
+            'multiprotocol-type': 'linux',
+        }
+
+    def _aggr_info(self, name):
+        aggr = self.aggrs[name]
+        vol_names = sorted(n for n, v in self.vols.items()
+                           if v['aggr'] == name)
+        used = sum(self.vols[n]['size'] for n in vol_names)
+        return {
+            'name': name,
+            'uuid': name,
+            'size-total': aggr['size'],
+            'size-used': used,
+            'size-available': aggr['size'] - used,
+            'state': 'online',
+            'raid-status': 'raid_dp, aggr',
+            'disk-count': len(aggr['disks']),
+            'volume-count': len(vol_names),
+            'volumes': {'contained-volume-info':
+                        [{'name': n} for n in vol_names]},
+        }
+
+    def _vol_info(self, name):
+        vol = self.vols[name]
+        info = {
+            'name': name,
+            'uuid': vol['uuid'],
+            'type': 'flex',
+            'containing-aggregate': vol['aggr'],
+            'size-total': vol['size'],
+            'size-used': vol['used'],
+            'size-available': vol['size'] - vol['used'],
+            'state': vol['state'],
+            'space-reserve': 'volume',
+            'space-reserve-enabled': 'true',
+            'reserve': 0,
+            'reserve-required': 0,
+        }
+        children = sorted(n for n, v in self.vols.items()
+                          if v['parent'] == name)
+        if children:
+            info['clone-children'] = {
+                'clone-child-info': [{'clone-child-name': c}
+                                     for c in children]}
+        return info
+
+    def _igroup_info(self, name):
+        igroup = self.igroups[name]
+        return {
+            'initiator-group-name': name,
+            'initiator-group-uuid': igroup['uuid'],
+            'initiator-group-type': igroup['type'],
+            'initiator-group-os-type': 'linux',
+            'initiators': {'initiator-info': [
+                {'initiator-name': i} for i in igroup['initiators']]},
+        }
+
+    def _zapi_system_get_info(self, params):
+        return {'system-info': {
+            'system-id': self.system_id,
+            'system-name': self.system_name,
+            'system-model': 'FAS3240',
+            'system-serial-number': '700000123456',
+        }}
+
+    def _zapi_system_api_list(self, params):
+        return {'apis': {'system-api-info': [
+            {'name': n[len('_zapi_'):].replace('_', '-')}
+            for n in sorted(dir(self)) if n.startswith('_zapi_')]}}
+
+    def _zapi_disk_list_info(self, params):
+        disks = []
+        for aggr_name in sorted(self.aggrs):
+            for disk_name in self.aggrs[aggr_name]['disks']:
+                disks.append({'name': disk_name, 'raid-state': 'present',
+                              'aggregate': aggr_name})
+        for i in range(0, _SPARE_DISK_COUNT):
+            disks.append({'name': '0b.%02d' % i, 'raid-state': 'spare',
+                          'is-zeroed': 'true'})
+        for disk in disks:
+            disk.update({
+                'disk-uid': '2000000C:50A3B5F4:00000000:00000000:0000%s' %
+                            disk['name'].replace('.', ''),
+                'effective-disk-type': 'SAS',
+                'bytes-per-sector': _DISK_SECTOR_SIZE,
+                'physical-blocks': _DISK_BLOCKS,
+            })
+        return {'disk-details': {'disk-detail-info': disks}}
+
+    def _zapi_aggr_list_info(self, params):
+        if 'aggregate' in params:
+            if params['aggregate'] not in self.aggrs:
+                raise _ZapiError(_EAGGRDOESNOTEXIST,
+                                 'No aggregate named %s exists' %
+                                 params['aggregate'])
+            names = [params['aggregate']]
+        else:
+            names = sorted(self.aggrs)
+        return {'aggregates': {'aggr-info': [self._aggr_info(n)
+                                             for n in names]}}
+
+    def _zapi_volume_list_info(self, params):
+        if 'volume' in params:
+            self._vol_of(params['volume'])
+            names = [params['volume']]
+        else:
+            names = sorted(self.vols)
+        return {'volumes': {'volume-info': [self._vol_info(n)
+                                            for n in names]}}
+
+    def _zapi_volume_create(self, params):
+        name = params['volume']
+        if name in self.vols:
+            raise _ZapiError(Filer.ENAVOL_NAME_DUPE,
+                             'Volume %s already exists' % name)
+        if params['containing-aggr-name'] not in self.aggrs:
+            raise _ZapiError(_EAGGRDOESNOTEXIST,
+                             'No aggregate named %s exists' %
+                             params['containing-aggr-name'])
+        self._vol_create(name, params['containing-aggr-name'],
+                         int(params['size']))
+        self.exports['/vol/%s' % name] = {
+            'pathname': '/vol/%s' % name,
+            'read-write': _hostname_infos(['*']),
+            'sec-flavor': {'sec-flavor-info': {'flavor': 'sys'}},
+        }
+        return {}
+
+    def _zapi_volume_set_option(self, params):
+        self._vol_of(params['volume'])
+        return {}
+
+    def _zapi_volume_size(self, params):
+        vol = self._vol_of(params['volume'])
+        new_size = params['new-size']
+        size = int(new_size.lstrip('+-')[:-1]) * 1024
+        if new_size.startswith('+'):
+            vol['size'] += size
+        elif new_size.startswith('-'):
+            vol['size'] -= size
+        else:
+            vol['size'] = size
+        return {'volume-size': '%dk' % (vol['size'] // 1024)}
+
+    def _zapi_volume_offline(self, params):
+        self._vol_of(params['name'])['state'] = 'offline'
+        return {}
+
+    def _zapi_volume_online(self, params):
+        self._vol_of(params['name'])['state'] = 'online'
+        return {}
+
+    def _zapi_volume_destroy(self, params):
+        name = params['name']
+        vol = self._vol_of(name)
+        if vol['state'] != 'offline':
+            raise _ZapiError(Filer.EFSOFFLINE,
+                             'Volume %s is not offline' % name)
+        for path in list(self.luns):
+            if _lun_vol_name(path) == name:
+                del self.luns[path]
+                del self.lun_maps[path]
+        for export_path in list(self.exports):
+            if _lun_vol_name(export_path) == name:
+                del self.exports[export_path]
+        for child in self.vols.values():
+            if child['parent'] == name:
+                child['parent'] = None
+        del self.vols[name]
+        del self.snapshots[name]
+        return {}
+
+    def _zapi_volume_clone_create(self, params):
+        parent = self._vol_of(params['parent-volume'])
+        if params['volume'] in self.vols:
+            raise _ZapiError(Filer.ENAVOL_NAME_DUPE,
+                             'Volume %s already exists' % params['volume'])
+        self._vol_create(params['volume'], parent['aggr'], parent['size'])
+        self.vols[params['volume']]['parent'] = params['parent-volume']
+        return {}
+
+    def _zapi_volume_clone_split_start(self, params):
+        self._vol_of(params['volume'])['parent'] = None
+        return {}
+
+    def _zapi_volume_clone_split_status(self, params):
+        return {}
+
+    def _zapi_lun_list_info(self, params):
+        if 'path' in params:
+            self._lun_of(params['path'])
+            paths = [params['path']]
+        elif 'volume-name' in params:
+            self._vol_of(params['volume-name'],
+                         FilerError.EVDISK_ERROR_NO_SUCH_VOLUME)
+            paths = sorted(p for p in self.luns
+                           if _lun_vol_name(p) == params['volume-name'])
+        else:
+            paths = sorted(self.luns)
+        return {'luns': {'lun-info': [self._lun_info(p) for p in paths]}}
+
+    def _zapi_lun_get_minsize(self, params):
+        return {'min-size': _LUN_MIN_SIZE}
+
+    def _zapi_lun_create_by_size(self, params):
+        path = params['path']
+        size = int(params['size'])
+        vol = self._vol_of(_lun_vol_name(path),
+                           FilerError.EVDISK_ERROR_NO_SUCH_VOLUME)
+        if path in self.luns:
+            raise _ZapiError(FilerError.EVDISK_ERROR_VDISK_EXISTS,
+                             'LUN already exists')
+        if size < _LUN_MIN_SIZE:
+            raise _ZapiError(FilerError.EVDISK_ERROR_SIZE_TOO_SMALL,
+                             'Size is too small')
+        if size > vol['size'] - vol['used']:
+            raise _ZapiError(FilerError.EVDISK_ERROR_SIZE_TOO_LARGE,
+                             'Size is too large')
+        self._lun_create(
+            path, size, params.get('space-reservation-enabled') != 'false')
+        return {'actual-size': size}
+
+    def _zapi_lun_destroy(self, params):
+        path = params['path']
+        lun = self._lun_of(path)
+        if self.lun_maps[path]:
+            raise _ZapiError(FilerError.EVDISK_ERROR_VDISK_EXPORTED,
+                             'LUN is mapped')
+        self.vols[_lun_vol_name(path)]['used'] -= lun['size']
+        del self.luns[path]
+        del self.lun_maps[path]
+        return {}
+
+    def _zapi_lun_resize(self, params):
+        path = params['path']
+        lun = self._lun_of(path)
+        size = int(params['size'])
+        if size == lun['size']:
+            raise _ZapiError(FilerError.EVDISK_ERROR_SIZE_UNCHANGED,
+                             'New size is the same as current size')
+        vol = self.vols[_lun_vol_name(path)]
+        if size - lun['size'] > vol['size'] - vol['used']:
+            raise _ZapiError(FilerError.EVDISK_ERROR_RESIZE_TOO_LARGE,
+                             'Size is too large')
+        vol['used'] += size - lun['size']
+        lun['size'] = size
+        return {'actual-size': size}
+
+    def _zapi_lun_online(self, params):
+        lun = self._lun_of(params['path'])
+        if lun['online'] == 'true':
+            raise _ZapiError(FilerError.EVDISK_ERROR_VDISK_NOT_DISABLED,
+                             'LUN is not offline')
+        lun['online'] = 'true'
+        return {}
+
+    def _zapi_lun_offline(self, params):
+        lun = self._lun_of(params['path'])
+        if lun['online'] == 'false':
+            raise _ZapiError(FilerError.EVDISK_ERROR_VDISK_NOT_ENABLED,
+                             'LUN is not online')
+        lun['online'] = 'false'
+        return {}
+
+    def _zapi_lun_map(self, params):
+        path = params['path']
+        self._lun_of(path)
+        self._igroup_of(params['initiator-group'])
+        if params['initiator-group'] in self.lun_maps[path]:
+            raise _ZapiError(FilerError.EVDISK_ERROR_INITGROUP_HAS_VDISK,
+                             'LUN already mapped to this group')
+        lun_id = len(list(p for p, m in self.lun_maps.items()
+                          if params['initiator-group'] in m))
+        self.lun_maps[path][params['initiator-group']] = lun_id
+        return {'lun-id-assigned': lun_id}
+
+    def _zapi_lun_unmap(self, params):
+        path = params['path']
+        self._lun_of(path)
+        self._igroup_of(params['initiator-group'])
+        if params['initiator-group'] not in self.lun_maps[path]:
+            raise _ZapiError(FilerError.EVDISK_ERROR_NO_SUCH_LUNMAP,
+                             'LUN is not mapped to this group')
+        del self.lun_maps[path][params['initiator-group']]
+        return {}
+
+    def _zapi_lun_map_list_info(self, params):
+        path = params['path']
+        self._lun_of(path)
+        infos = []
+        for name, lun_id in sorted(self.lun_maps[path].items()):
+            info = self._igroup_info(name)
+            info['lun-id'] = lun_id
+            infos.append(info)
+        return {'initiator-groups': {'initiator-group-info': infos}}
+
+    def _zapi_lun_initiator_list_map_info(self, params):
+        infos = []
+        for path in sorted(self.lun_maps):
+            for name, lun_id in sorted(self.lun_maps[path].items()):
+                if params['initiator'] in self.igroups[name]['initiators']:
+                    infos.append({'path': path, 'initiator-group': name,
+                                  'lun-id': lun_id})
+        return {'lun-maps': {'lun-map-info': infos}}
+
+    def _zapi_igroup_list_info(self, params):
+        if 'initiator-group-name' in params:
+            self._igroup_of(params['initiator-group-name'])
+            names = [params['initiator-group-name']]
+        else:
+            names = sorted(self.igroups)
+        return {'initiator-groups': {'initiator-group-info': [
+            self._igroup_info(n) for n in names]}}
+
+    def _zapi_igroup_create(self, params):
+        name = params['initiator-group-name']
+        if name in self.igroups:
+            raise _ZapiError(_EINITGROUPEXISTS,
+                             'Initiator group %s already exists' % name)
+        self.igroups[name] = {
+            'uuid': str(uuid.uuid4()),
+            'type': params['initiator-group-type'],
+            'initiators': [],
+        }
+        return {}
+
+    def _zapi_igroup_destroy(self, params):
+        name = params['initiator-group-name']
+        self._igroup_of(name)
+        if any(name in m for m in self.lun_maps.values()):
+            raise _ZapiError(FilerError.EVDISK_ERROR_INITGROUP_MAPS_EXIST,
+                             'LUN maps for initiator group %s exist' % name)
+        del self.igroups[name]
+        return {}
+
+    def _zapi_igroup_add(self, params):
+        igroup = self._igroup_of(params['initiator-group-name'])
+        if params['initiator'] in igroup['initiators']:
+            raise _ZapiError(FilerError.IGROUP_ALREADY_HAS_INIT,
+                             'Initiator group already has the initiator')
+        igroup['initiators'].append(params['initiator'])
+        return {}
+
+    def _zapi_igroup_remove(self, params):
+        igroup = self._igroup_of(params['initiator-group-name'])
+        if params['initiator'] not in igroup['initiators']:
+            raise _ZapiError(FilerError.IGROUP_NOT_CONTAIN_GIVEN_INIT,
+                             'Initiator group does not contain the '
+                             'initiator')
+        igroup['initiators'].remove(params['initiator'])
+        return {}
+
+    def _zapi_iscsi_initiator_add_auth(self, params):
+        return {}
+
+    def _zapi_snapshot_list_info(self, params):
+        name = params['target-name']
+        self._vol_of(name)
+        return {'snapshots': {'snapshot-info': [
+            {'name': n, 'access-time': t, 'busy': 'false'}
+            for n, t in sorted(self.snapshots[name].items())]}}
+
+    def _zapi_snapshot_create(self, params):
+        snapshots = self.snapshots.get(params['volume'])
+        if snapshots is None:
+            self._vol_of(params['volume'])
+        if params['snapshot'] in snapshots:
+            raise _ZapiError(_ESNAPSHOTEXISTS,
+                             'Snapshot %s already exists' %
+                             params['snapshot'])
+        snapshots[params['snapshot']] = '%d' % time.time()
+        return {}
+
+    def _zapi_snapshot_delete(self, params):
+        snapshots = self.snapshots.get(params['volume'])
+        if snapshots is None:
+            self._vol_of(params['volume'])
+        if params['snapshot'] not in snapshots:
+            raise _ZapiError(_ESNAPSHOTDOESNOTEXIST,
+                             'Snapshot %s does not exist' %
+                             params['snapshot'])
+        del snapshots[params['snapshot']]
+        return {}
+
+    def _zapi_snapshot_restore_volume(self, params):
+        self._vol_of(params['volume'])
+        return {}
+
+    def _zapi_snapshot_restore_file(self, params):
+        return {}
+
+    def _zapi_snapshot_restore_file_info(self, params):
+        return {'sfsr-in-progress': 0}
+
+    def _zapi_clone_start(self, params):
+        src = self._lun_of(params['source-path'])
+        dst_path = params.get('destination-path', params['source-path'])
+        if dst_path not in self.luns:
+            self._vol_of(_lun_vol_name(dst_path),
+                         FilerError.EVDISK_ERROR_NO_SUCH_VOLUME)
+            self._lun_create(dst_path, src['size'], src['reserved'])
+        self._clone_id += 1
+        return {'clone-id': {'clone-id-info': {
+            'clone-op-id': self._clone_id,
+            'volume-uuid': self.vols[_lun_vol_name(dst_path)]['uuid']}}}
+
+    def _zapi_clone_list_status(self, params):
+        return {'status': {'ops-info': {'clone-state': 'completed'}}}
+
+    def _zapi_clone_clear(self, params):
+        return {}
+
+    def _zapi_nfs_get_supported_sec_flavors(self, params):
+        return {'sec-flavor': {'sec-flavor-info': [
+            {'flavor': f} for f in ['sys', 'krb5', 'krb5i', 'krb5p',
+                                    'none']]}}
+
+    def _zapi_nfs_exportfs_list_rules(self, params):
+        return {'rules': {'exports-rule-info': [
+            self.exports[p] for p in sorted(self.exports)]}}
+
+    @staticmethod
+    def _export_rule(rule2):
+        """
+        Convert exports-rule-info-2 to exports-rule-info.
+        """
+        rule = {'pathname': rule2['pathname']}
+        if 'actual-pathname' in rule2:
+            rule['actual-pathname'] = rule2['actual-pathname']
+        sec_rule = rule2['security-rules']['security-rule-info'] or {}
+        for key in ('read-only', 'read-write', 'root'):
+            if key in sec_rule:
+                rule[key] = {'exports-hostname-info': to_list(
+                    sec_rule[key]['exports-hostname-info'])}
+        if 'anon' in sec_rule:
+            rule['anon'] = sec_rule['anon']
+        flavor = 'sys'
+        if 'sec-flavor' in sec_rule:
+            flavor = to_list(
+                sec_rule['sec-flavor']['sec-flavor-info'])[0]['flavor']
+        rule['sec-flavor'] = {'sec-flavor-info': {'flavor': flavor}}
+        return rule
+
+    def _zapi_nfs_exportfs_append_rules_2(self, params):
+        for rule2 in to_list(params['rules']['exports-rule-info-2']):
+            rule = _Filer._export_rule(rule2)
+            self.exports[rule['pathname']] = rule
+        return {}
+
+    def _zapi_nfs_exportfs_modify_rule_2(self, params):
+        rule = _Filer._export_rule(params['rule']['exports-rule-info-2'])
+        self.exports[rule['pathname']] = rule
+        return {}
+
+    def _zapi_nfs_exportfs_delete_rules(self, params):
+        for pathname_info in to_list(params['pathnames']['pathname-info']):
+            self.exports.pop(pathname_info['name'], None)
+        return {}
+
+    def _zapi_fcp_adapter_list_info(self, params):
+        return {'fcp-config-adapters': {'fcp-config-adapter-info': [
+            {'adapter': '0c', 'port-name': '50:0a:09:81:86:f7:c8:b4',
+             'state': 'ONLINE'},
+            {'adapter': '0d', 'port-name': '50:0a:09:82:86:f7:c8:b4',
+             'state': 'ONLINE'}]}}
+
+    def _zapi_iscsi_node_get_name(self, params):
+        return {'node-name': 'iqn.1992-08.com.netapp:sn.%s' % self.system_id}
+
+    def _zapi_net_ifconfig_get(self, params):
+        return {'interface-config-info': {'interface-config-info': [
+            {'interface-name': 'e0a', 'mac-address': '00:a0:98:1b:0e:1a'},
+            {'interface-name': 'e0b', 'mac-address': '00:a0:98:1b:0e:1b'}]}}
+
+    def _zapi_iscsi_portal_list_info(self, params):
+        return {'iscsi-portal-list-entries': {
+            'iscsi-portal-list-entry-info': [
+                {'interface-name': 'e0a', 'ip-address': '192.0.2.10',
+                 'ip-port': 3260, 'tpgroup-tag': 1000},
+                {'interface-name': 'e0b', 'ip-address': '192.0.2.11',
+                 'ip-port': 3260, 'tpgroup-tag': 1001}]}}
+
+    def invoke(self, command, params):
+        """
+        Return the XML of the results element.
+        """
+        handler = getattr(self, '_zapi_%s' % command.replace('-', '_'),
+                          None)
+        try:
+            if handler is None:
+                raise _ZapiError(_EAPINOTFOUND,
+                                 'Unable to find API: %s' % command)
+            results = handler(params)
+        except _ZapiError as zapi_error:
+            return '<results status="failed" errno="%d" reason=%s/>' % (
+                zapi_error.errno, quoteattr(zapi_error.reason))
+        return '<results status="passed">%s</results>' % ''.join(
+            _xml_element(k, v) for k, v in results.items())
+
+
+class _ZapiServer(socketserver.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, port, filer, latency, password):
+        BaseHTTPServer.HTTPServer.__init__(
+            self, ('127.0.0.1', port), _ZapiHandler)
+        self.filer = filer
+        self.latency = latency
+        self.authorization = 'Basic %s' % base64.b64encode(
+            ('%s:%s' % (_USERNAME, password)).encode('utf-8')).decode(
+            'utf-8')
+        self.lock = threading.Lock()
+        self.stats_reset()
+
+    def stats_reset(self):
+        self.http_requests = 0
+        self.zapi_calls = 0
+        self.bytes = 0
+
+
+class _ZapiHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+    def _reply(self, code, body, headers):
+        self.send_response(code)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        server = self.server
+        body = self.rfile.read(int(self.headers['Content-Length']))
+        if server.latency:
+            time.sleep(server.latency / 1000.0)
+        with server.lock:
+            server.http_requests += 1
+        if self.path != _ZAPI_PATH:
+            self._reply(404, b'Not found', {'Content-Type': 'text/plain'})
+            return
+        if self.headers.get('Authorization') != server.authorization:
+            self._reply(401, b'Authorization required',
+                        {'Content-Type': 'text/plain',
+                         'WWW-Authenticate': 'Basic realm="Administrator"'})
+            return
+
+        cmd_element = ElementTree.fromstring(body)[0]
+        command = cmd_element.tag[cmd_element.tag.find('}') + 1:]
+        params = list(convert_xml_to_dict(cmd_element).values())[0]
+        if not isinstance(params, dict):
+            params = {}
+        with server.lock:
+            reply = (_RESPONSE_TEMPLATE %
+                     server.filer.invoke(command, params)).encode('utf-8')
+            # Counted before replying, the plugin might be measured as
+            # soon as the reply is sent.
+            server.zapi_calls += 1
+            server.bytes += len(reply)
+        self._reply(200, reply, {'Content-Type': 'text/xml'})
+
+    def log_message(self, *args):
+        pass
+
+
+def _run_operations(uri, password, record_func):
+    """
+    Run the benchmark operations on newly registered plugin. The
+    record_func(name, duration, error) is invoked after each operation.
+    Objects created by the operations are deleted afterwards.
+    """
+    plugin = Ontap()
+
+    def run(name, func, *args):
+        return bench_common.timed_run(record_func, name, func, *args)
+
+    run('plugin_register', plugin.plugin_register, uri, password, _TMO_MS)
+    try:
+        lsm_sys = run('systems', plugin.systems)[0]
+        run('capabilities', plugin.capabilities, lsm_sys)
+        lsm_pools = run('pools', plugin.pools)
+        lsm_pool = list(p for p in lsm_pools
+                        if p.name.startswith(_VOL_PREFIX))[0]
+        lsm_vols = run('volumes', plugin.volumes)
+        lsm_vol = lsm_vols[len(lsm_vols) // 2]
+        run('volumes_by_id', plugin.volumes, 'id', lsm_vol.id)
+        run('volume_raid_info', plugin.volume_raid_info, lsm_vol)
+        run('disks', plugin.disks)
+        run('pool_member_info', plugin.pool_member_info, lsm_pool)
+        lsm_ags = run('access_groups', plugin.access_groups)
+        run('access_groups_granted_to_volume',
+            plugin.access_groups_granted_to_volume, lsm_vol)
+        if lsm_ags:
+            run('volumes_accessible_by_access_group',
+                plugin.volumes_accessible_by_access_group, lsm_ags[0])
+        lsm_fss = run('fs', plugin.fs)
+        lsm_fs = list(f for f in lsm_fss if f.name == lsm_pool.name)[0]
+        run('fs_snapshots', plugin.fs_snapshots, lsm_fs)
+        run('exports', plugin.exports)
+        run('target_ports', plugin.target_ports)
+
+        new_vol = run('volume_create', plugin.volume_create, lsm_pool,
+                      _BENCH_LUN, _LUN_SIZE,
+                      lsm.Volume.PROVISION_DEFAULT)[1]
+        lsm_ag = run('access_group_create', plugin.access_group_create,
+                     'bench_ag', _BENCH_IQN,
+                     lsm.AccessGroup.INIT_TYPE_ISCSI_IQN, lsm_sys)
+        run('volume_mask', plugin.volume_mask, lsm_ag, new_vol)
+        run('volume_unmask', plugin.volume_unmask, lsm_ag, new_vol)
+        run('access_group_delete', plugin.access_group_delete, lsm_ag)
+        rep_vol = run('volume_replicate', plugin.volume_replicate, None,
+                      lsm.Volume.REPLICATE_CLONE, new_vol,
+                      '%s_clone' % _BENCH_LUN)[1]
+        plugin.volume_delete(rep_vol)
+        run('volume_delete', plugin.volume_delete, new_vol)
+
+        lsm_snap = run('fs_snapshot_create', plugin.fs_snapshot_create,
+                       lsm_fs, 'bench_snap')[1]
+        run('fs_snapshot_delete', plugin.fs_snapshot_delete, lsm_fs,
+            lsm_snap)
+        lsm_export = run('export_fs', plugin.export_fs, lsm_fs.id,
+                         '/bench_export', [], ['*'], [], -1, -1, 'sys',
+                         None)
+        run('export_remove', plugin.export_remove, lsm_export)
+    finally:
+        plugin.plugin_unregister()
+
+
+def _bench(server, password, rounds):
+    def counters():
+        with server.lock:
+            rc = dict((key, getattr(server, key))
+                      for key in ('zapi_calls', 'http_requests', 'bytes'))
+            server.stats_reset()
+        return rc
+
+    recorder = bench_common.Recorder(counters)
+    uri = 'ontap://%s@127.0.0.1:%d' % (_USERNAME, server.server_port)
+    for i in range(0, rounds):
+        with server.lock:
+            server.stats_reset()
+        _run_operations(uri, password, recorder.record)
+
+    # Per call, the largest of all rounds.
+    return recorder.results(max)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='ONTAP plugin benchmark against emulated filer')
+    parser.add_argument('action', choices=['serve', 'bench'])
+    parser.add_argument('--scale', default='100,1000,10000',
+                        help='Comma separated LUN counts to benchmark at. '
+                             'Only the first is used by serve')
+    parser.add_argument('--volumes', type=int, default=16,
+                        help='Count of NetApp volumes holding the LUNs')
+    parser.add_argument('--igroups', type=int, default=100,
+                        help='Count of initiator groups, LUNs are mapped '
+                             'to them in turn')
+    parser.add_argument('--snapshots', type=int, default=4,
+                        help='Count of snapshots of each NetApp volume')
+    parser.add_argument('--password', default=_PASSWORD,
+                        help='Password of user %s' % _USERNAME)
+    parser.add_argument('--port', type=int, default=0,
+                        help='Port of ZAPI server. Default: 8080 for '
+                             'serve, random for bench')
+    parser.add_argument('--latency', type=float, default=0,
+                        help='Injected latency in milliseconds of each '
+                             'HTTP request')
+    bench_common.args_add(
+        parser, rounds=10,
+        tolerance_help='Increase in percent of median and bytes against '
+                       'baseline tolerated before reporting regression')
+    args = parser.parse_args()
+
+    scales = list(int(s) for s in args.scale.split(','))
+
+    if args.action == 'serve':
+        filer = _Filer(scales[0], args.volumes, args.igroups,
+                       args.snapshots)
+        server = _ZapiServer(args.port or 8080, filer, args.latency,
+                             args.password)
+        print("Serving ontap://%s@127.0.0.1:%d" %
+              (_USERNAME, server.server_port), file=sys.stderr)
+        server.serve_forever()
+        return
+
+    results = {}
+    for scale in sorted(scales):
+        filer = _Filer(scale, args.volumes, args.igroups, args.snapshots)
+        server = _ZapiServer(args.port, filer, args.latency, args.password)
+        server_thread = threading.Thread(target=server.serve_forever)
+        server_thread.daemon = True
+        server_thread.start()
+        try:
+            for name, summary in _bench(
+                    server, args.password, args.rounds).items():
+                results['%s@%d' % (name, scale)] = summary
+        finally:
+            server.shutdown()
+            server.server_close()
+        print("done with %d LUNs" % scale, file=sys.stderr)
+
+    meta = {
+        'latency': args.latency,
+        'scales': sorted(scales),
+        'volumes': args.volumes,
+        'igroups': args.igroups,
+        'snapshots': args.snapshots,
+    }
+    bench_common.report(args, meta, results,
+                        counters=['zapi_calls', 'http_requests'],
+                        sized_counters=['bytes'])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,228 @@
+#!/usr/bin/env python
+# Copyright (C) 2016 Red Hat, Inc.
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; If not, see <http://www.gnu.org/licenses/>.
+
+# Benchmark the client library and the simulator plugins (sim:// and
+# simc://) through lsmd, with the simulator state scaled to given volume
+# counts. No storage hardware is needed.
+#
+# For each URI and each scale, the median/min/mean latency in milliseconds
+# of these operations is measured:
+#   volumes             List all volumes.
+#   volumes_by_id       List volumes with search_key 'id'.
+#   volume_create       Submit a volume creation (the job is waited later).
+#   volume_delete       Submit a volume deletion.
+#   volume_mask         Mask volume to an access group.
+#   volume_unmask       Unmask volume from an access group.
+#   job_status          Poll status of a job.
+#   encode / decode     JSON serialization of the volume list with
+#                       DataEncoder/DataDecoder, no plugin involved.
+#
+# Results are written as JSON, named '<uri> <operation>@<scale>'. When a
+# baseline(the JSON output of an earlier run) is given, medians slower than
+# the baseline by more than the tolerance are reported as regressions and
+# the exit code is 1.
+#
+# The state file of both simulators is prefilled directly through the
+# BackStore of the python simulator, hence lsmd should be able to read and
+# write the temporary directory.
+#
+# Usage:
+#   PYTHONPATH=<dir holding lsm package> python plugin_bench.py \
+#       [--uri sim:// --uri simc://] [--scale 1000,10000,100000] \
+#       [--rounds 20] [--output result.json] [--baseline old.json] \
+#       [--tolerance 20]
+
+from __future__ import print_function
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+import lsm
+from lsm._data import DataDecoder, DataEncoder
+from lsm.plugin.sim.simarray import BackStore
+
+import bench_common
+
+_VOL_SIZE = 1024 * 1024
+_POOL_NAME = 'lsm_test_aggr'
+_PREFILL_PREFIX = 'bench_prefill_'
+_JOB_WAIT_TIMEOUT = 60000
+
+
+def _time_it(func, *args):
+    start = time.time()
+    func(*args)
+    return time.time() - start
+
+
+class _Bench(object):
+    def __init__(self, uri, password, rounds):
+        self.rounds = rounds
+        self.statefile = tempfile.mktemp(prefix='lsm_bench_')
+        self.vol_count = 0
+
+        self.bs_obj = BackStore(self.statefile, 30000)
+        self.bs_obj.check_version_and_init()
+        os.chmod(self.statefile, 0o666)
+        self.sim_pool_id = list(p['id'] for p in self.bs_obj.sim_pools()
+                                if p['name'] == _POOL_NAME)[0]
+
+        if '?' in uri:
+            uri += '&statefile=%s' % self.statefile
+        else:
+            uri += '?statefile=%s' % self.statefile
+        self.c = lsm.Client(uri, password)
+        self.pool = list(p for p in self.c.pools()
+                         if p.name == _POOL_NAME)[0]
+        self.system = self.c.systems()[0]
+
+    def close(self):
+        self.c.close()
+        if os.path.exists(self.statefile):
+            os.unlink(self.statefile)
+
+    def prefill(self, vol_count):
+        """
+        Create volumes in single transaction until the simulator holds
+        vol_count volumes.
+        """
+        self.bs_obj.trans_begin()
+        while self.vol_count < vol_count:
+            self.bs_obj.sim_vol_create(
+                '%s%d' % (_PREFILL_PREFIX, self.vol_count), _VOL_SIZE,
+                self.sim_pool_id)
+            self.vol_count += 1
+        self.bs_obj.trans_commit()
+
+    def _jobs_finish(self, job_ids):
+        """
+        Wait and free the jobs, return the list of completed items.
+        """
+        job_ids = list(j for j in job_ids if j is not None)
+        results = []
+        if job_ids:
+            results = self.c.job_wait(job_ids, _JOB_WAIT_TIMEOUT,
+                                      lsm.Client.FLAG_JOB_WAIT_ALL)
+        for job_id in job_ids:
+            self.c.job_free(job_id)
+        return list(r[2] for r in results)
+
+    def run(self):
+        recorder = bench_common.Recorder()
+        record = recorder.record
+
+        vols = self.c.volumes()
+        vol_id = vols[len(vols) // 2].id
+
+        for i in range(0, self.rounds):
+            record('volumes', _time_it(self.c.volumes))
+            record('volumes_by_id',
+                   _time_it(self.c.volumes, 'id', vol_id))
+
+        for i in range(0, self.rounds):
+            start = time.time()
+            data = json.dumps(vols, cls=DataEncoder)
+            record('encode', time.time() - start)
+            start = time.time()
+            json.loads(data, cls=DataDecoder)
+            record('decode', time.time() - start)
+
+        new_vols = []
+        job_ids = []
+        for i in range(0, self.rounds):
+            start = time.time()
+            (job_id, vol) = self.c.volume_create(
+                self.pool, 'bench_vol_%d' % i, _VOL_SIZE,
+                lsm.Volume.PROVISION_DEFAULT)
+            record('volume_create', time.time() - start)
+            job_ids.append(job_id)
+            if vol is not None:
+                new_vols.append(vol)
+
+        if job_ids[0] is not None:
+            for i in range(0, self.rounds):
+                record('job_status',
+                       _time_it(self.c.job_status, job_ids[0]))
+
+        new_vols.extend(self._jobs_finish(job_ids))
+
+        # Timing of volumes sharing an ID with another volume is worthless.
+        new_vol_ids = set(v.id for v in new_vols)
+        if len(new_vol_ids) != len(new_vols) or \
+           new_vol_ids & set(v.id for v in vols):
+            raise RuntimeError("Created volumes got duplicate IDs: %s" %
+                               ', '.join(sorted(new_vol_ids)))
+
+        ag = self.c.access_group_create(
+            'bench_ag', 'iqn.1994-05.com.domain:01.89bd01',
+            lsm.AccessGroup.INIT_TYPE_ISCSI_IQN, self.system)
+        for vol in new_vols:
+            record('volume_mask', _time_it(self.c.volume_mask, ag, vol))
+        for vol in new_vols:
+            record('volume_unmask',
+                   _time_it(self.c.volume_unmask, ag, vol))
+        self.c.access_group_delete(ag)
+
+        job_ids = []
+        for vol in new_vols:
+            start = time.time()
+            job_ids.append(self.c.volume_delete(vol))
+            record('volume_delete', time.time() - start)
+        self._jobs_finish(job_ids)
+
+        return recorder.results()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Simulator plugin benchmark')
+    parser.add_argument('--uri', action='append',
+                        help='Simulator URI, could be repeated. '
+                             'Default: sim:// and simc://')
+    parser.add_argument('--password', default=None,
+                        help='Password for the URI')
+    parser.add_argument('--scale', default='1000,10000,100000',
+                        help='Comma separated volume counts to benchmark at')
+    bench_common.args_add(parser, rounds=20)
+    args = parser.parse_args()
+
+    uris = args.uri or ['sim://', 'simc://']
+    scales = sorted(int(s) for s in args.scale.split(','))
+
+    results = {}
+    rpc_stats = {}
+    for uri in uris:
+        bench = _Bench(uri, args.password, args.rounds)
+        try:
+            for scale in scales:
+                bench.prefill(scale)
+                for name, summary in bench.run().items():
+                    results['%s %s@%d' % (uri, name, scale)] = summary
+                print("%s: done with %d volumes" % (uri, scale),
+                      file=sys.stderr)
+            rpc_stats[uri] = bench.c.rpc_stats_get()
+        finally:
+            bench.close()
+
+    bench_common.report(args, {'scales': scales}, results,
+                        rpc_stats=rpc_stats)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+# Copyright (C) 2016 Red Hat, Inc.
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; If not, see <http://www.gnu.org/licenses/>.
+
+# Measure the latency of simulator volume creation as the state grows.
+# With pool space tracked by counters, the latency should stay flat no
+# matter how many volumes already exist in the pool.
+#
+# Usage:
+#   PYTHONPATH=<dir holding lsm package> python sim_backstore_bench.py \
+#       [--count 100000] [--step 10000]
+
+from __future__ import print_function
+
+import argparse
+import os
+import tempfile
+import time
+
+from lsm.plugin.sim.simarray import BackStore
+
+_VOL_SIZE = 1024 * 1024
+_SAMPLE_COUNT = 100
+_POOL_NAME = 'lsm_test_aggr'
+
+
+def _vol_create(bs_obj, name, sim_pool_id):
+    bs_obj.trans_begin()
+    bs_obj.sim_vol_create(name, _VOL_SIZE, sim_pool_id)
+    bs_obj.trans_commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Simulator volume creation latency benchmark')
+    parser.add_argument('--count', type=int, default=100000,
+                        help='Total count of volumes to create')
+    parser.add_argument('--step', type=int, default=10000,
+                        help='Volume count between each latency sample')
+    args = parser.parse_args()
+
+    statefile = tempfile.mktemp(prefix='lsm_sim_bench_')
+    try:
+        bs_obj = BackStore(statefile, 30000)
+        bs_obj.check_version_and_init()
+        sim_pool_id = list(p['id'] for p in bs_obj.sim_pools()
+                           if p['name'] == _POOL_NAME)[0]
+
+        print("%10s %16s" % ('volumes', 'create(ms)'))
+        vol_count = 0
+        while vol_count < args.count:
+            start = time.time()
+            for i in range(0, _SAMPLE_COUNT):
+                _vol_create(bs_obj, 'bench_%d' % vol_count, sim_pool_id)
+                vol_count += 1
+            print("%10d %16.3f" %
+                  (vol_count,
+                   (time.time() - start) * 1000 / _SAMPLE_COUNT))
+
+            # Fill up to next step in single transaction.
+            bs_obj.trans_begin()
+            while vol_count % args.step and vol_count < args.count:
+                bs_obj.sim_vol_create(
+                    'bench_%d' % vol_count, _VOL_SIZE, sim_pool_id)
+                vol_count += 1
+            bs_obj.trans_commit()
+
+        bs_obj.sim_pool_space_check()
+    finally:
+        if os.path.exists(statefile):
+            os.unlink(statefile)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,313 @@
+#!/usr/bin/env python
+# Copyright (C) 2016 Red Hat, Inc.
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; If not, see <http://www.gnu.org/licenses/>.
+
+# Offline performance testing of the SMI-S plugin with a recorded provider
+# session. Requires pywbem, no lsmd is needed.
+#
+#   record  Run the benchmark operations once against a live SMI-S
+#           provider with the 'record_path' URI parameter, which appends
+#           every CIM-XML request and reply to the record file.
+#   serve   Serve the record file as a local HTTP CIM-XML responder.
+#   bench   Serve the record file in background and run the benchmark
+#           operations against it.
+#
+# The benchmark operations are:
+#   plugin_register, systems, pools, volumes, disks, access_groups,
+#   target_ports and capabilities(of each system).
+# For each operation, the round trips to the provider(replay server) and
+# the min/median/mean wall time in milliseconds are measured. Each round
+# uses a newly registered plugin, so plugin side caches start cold.
+#
+# Requests are matched to the recording by the CIM-XML body with message
+# ID, whitespace between tags and order of PropertyList ignored. Identical
+# requests get their recorded replies in order, the last reply is repeated
+# afterwards.
+# Unmatched requests are counted as 'misses' and get CIM_ERR_NOT_SUPPORTED.
+#
+# When a baseline(the JSON output of an earlier bench) is given, any
+# increase of round trips or median slower than the baseline by more than
+# the tolerance is reported as regression and the exit code is 1.
+#
+# Usage:
+#   PYTHONPATH=<dir holding lsm package> python smispy_bench.py record \
+#       --uri 'smispy+ssl://admin@array?no_ssl_verify=yes' --password pass \
+#       --record array.jsonl
+#   PYTHONPATH=<dir holding lsm package> python smispy_bench.py bench \
+#       --uri 'smispy+ssl://admin@array?no_ssl_verify=yes' \
+#       --record array.jsonl [--latency 5] [--rounds 10] \
+#       [--output result.json] [--baseline old.json] [--tolerance 20]
+#   PYTHONPATH=<dir holding lsm package> python smispy_bench.py serve \
+#       --record array.jsonl [--port 5988] [--latency 5]
+
+from __future__ import print_function
+
+import argparse
+import json
+import os
+import re
+import sys
+import threading
+import time
+import xml.etree.ElementTree as ElementTree
+
+from six.moves import BaseHTTPServer, socketserver
+
+import lsm
+from lsm.plugin.smispy.smis import Smis
+
+import bench_common
+
+_TMO_MS = 30000
+
+_MSG_ID_REGEX = re.compile(r'<MESSAGE\s+ID="([^"]*)"')
+_XML_DECL_REGEX = re.compile(r'^\s*<\?xml[^>]*\?>')
+_TAG_SPACE_REGEX = re.compile(r'>\s+<')
+_PROPERTY_LIST_REGEX = re.compile(
+    r'(<IPARAMVALUE NAME="PropertyList"><VALUE.ARRAY>)(.*?)(</VALUE.ARRAY>)')
+_VALUE_REGEX = re.compile(r'<VALUE>.*?</VALUE>')
+
+# URI parameters only meaningful to the live provider.
+_LIVE_URI_PARAMETERS = ['record_path', 'debug_path', 'no_ssl_verify']
+
+_OPERATIONS = ['systems', 'pools', 'volumes', 'disks', 'access_groups',
+               'target_ports', 'capabilities']
+
+_NOT_RECORDED_REPLY = \
+    '<?xml version="1.0" encoding="utf-8" ?>' \
+    '<CIM CIMVERSION="2.0" DTDVERSION="2.0">' \
+    '<MESSAGE ID="%(msg_id)s" PROTOCOLVERSION="1.0"><SIMPLERSP>' \
+    '<%(rsp_tag)s NAME="%(name)s">' \
+    '<ERROR CODE="7" DESCRIPTION="Request not found in the recording"/>' \
+    '</%(rsp_tag)s></SIMPLERSP></MESSAGE></CIM>'
+
+
+def _request_key(request_xml):
+    """
+    Return the CIM-XML request without XML declaration, message ID and
+    whitespace between tags. The PropertyList is sorted as the plugin does
+    not keep the order of merged property lists.
+    """
+    request_xml = _XML_DECL_REGEX.sub('', request_xml)
+    request_xml = _MSG_ID_REGEX.sub('<MESSAGE ID=""', request_xml)
+    request_xml = _TAG_SPACE_REGEX.sub('><', request_xml).strip()
+    return _PROPERTY_LIST_REGEX.sub(
+        lambda m: m.group(1) + ''.join(
+            sorted(_VALUE_REGEX.findall(m.group(2)))) + m.group(3),
+        request_xml)
+
+
+class _Replay(object):
+    """
+    The recorded replies indexed by request and the statistics of served
+    requests.
+    """
+    def __init__(self, record_path, latency):
+        self.latency = latency
+        self._replies_of = {}
+        self._served_count = {}
+        self._lock = threading.Lock()
+        self.round_trips = 0
+        self.misses = 0
+        with open(record_path) as record_file:
+            for line in record_file:
+                if not line.strip():
+                    continue
+                exchange = json.loads(line)
+                self._replies_of.setdefault(
+                    _request_key(exchange['request']), []).append(
+                    exchange['reply'])
+
+    def stats_reset(self):
+        with self._lock:
+            self.round_trips = 0
+            self.misses = 0
+
+    @staticmethod
+    def _not_recorded(request_xml, msg_id):
+        rsp_tag = 'IMETHODRESPONSE'
+        name = ''
+        try:
+            root = ElementTree.fromstring(request_xml.encode('utf-8'))
+            for call_tag, tag in (('IMETHODCALL', 'IMETHODRESPONSE'),
+                                  ('METHODCALL', 'METHODRESPONSE')):
+                call = root.find('.//%s' % call_tag)
+                if call is not None:
+                    rsp_tag = tag
+                    name = call.get('NAME', '')
+                    break
+        except ElementTree.ParseError:
+            pass
+        return _NOT_RECORDED_REPLY % {
+            'msg_id': msg_id, 'rsp_tag': rsp_tag, 'name': name}
+
+    def reply(self, request_xml):
+        msg_id = ''
+        match = _MSG_ID_REGEX.search(request_xml)
+        if match:
+            msg_id = match.group(1)
+        key = _request_key(request_xml)
+        with self._lock:
+            self.round_trips += 1
+            replies = self._replies_of.get(key)
+            if not replies:
+                self.misses += 1
+                return _Replay._not_recorded(request_xml, msg_id)
+            served = self._served_count.get(key, 0)
+            self._served_count[key] = served + 1
+            reply_xml = replies[min(served, len(replies) - 1)]
+        return _MSG_ID_REGEX.sub('<MESSAGE ID="%s"' % msg_id, reply_xml, 1)
+
+
+class _ReplayHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers['Content-Length']))
+        replay = self.server.replay
+        reply = replay.reply(body.decode('utf-8')).encode('utf-8')
+        if replay.latency:
+            time.sleep(replay.latency / 1000.0)
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/xml; charset="utf-8"')
+        self.send_header('Content-Length', str(len(reply)))
+        self.send_header('CIMOperation', 'MethodResponse')
+        self.end_headers()
+        self.wfile.write(reply)
+
+    def log_message(self, *args):
+        pass
+
+
+class _ReplayServer(socketserver.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, port, replay):
+        BaseHTTPServer.HTTPServer.__init__(
+            self, ('127.0.0.1', port), _ReplayHandler)
+        self.replay = replay
+
+
+def _replay_uri(uri, port):
+    """
+    Point the URI used for recording to the local replay server.
+    """
+    u = lsm.uri_parse(uri)
+    uri = 'smispy://%s@127.0.0.1:%d' % (u['username'], port)
+    parameters = list('%s=%s' % (k, v)
+                      for k, v in sorted(u['parameters'].items())
+                      if k not in _LIVE_URI_PARAMETERS)
+    if parameters:
+        uri += '?' + '&'.join(parameters)
+    return uri
+
+
+def _run_operations(uri, password, record_func=None):
+    """
+    Run the benchmark operations on newly registered plugin. The
+    record_func(name, duration, error) is invoked after each operation.
+    """
+    plugin = Smis()
+
+    def run(name, func, *args):
+        return bench_common.timed_run(record_func, name, func, *args)
+
+    run('plugin_register', plugin.plugin_register, uri, password, _TMO_MS)
+    try:
+        lsm_syss = run('systems', plugin.systems) or []
+        for name in _OPERATIONS:
+            if name == 'systems':
+                continue
+            if name == 'capabilities':
+                for lsm_sys in lsm_syss:
+                    run(name, plugin.capabilities, lsm_sys)
+                continue
+            run(name, getattr(plugin, name))
+    finally:
+        plugin.plugin_unregister()
+
+
+def _bench(uri, password, replay, port, rounds):
+    def counters():
+        rc = {'round_trips': replay.round_trips, 'misses': replay.misses}
+        replay.stats_reset()
+        return rc
+
+    recorder = bench_common.Recorder(counters)
+    uri = _replay_uri(uri, port)
+    for i in range(0, rounds):
+        _run_operations(uri, password, recorder.record)
+        replay.stats_reset()
+
+    # Round trips of all systems are summed for capabilities.
+    return recorder.results(lambda counts: sum(counts) // rounds)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='SMI-S plugin record/replay benchmark')
+    parser.add_argument('action', choices=['record', 'serve', 'bench'])
+    parser.add_argument('--record', required=True,
+                        help='Record file of CIM-XML requests and replies')
+    parser.add_argument('--uri', default='smispy://admin@127.0.0.1',
+                        help='URI of the live SMI-S provider')
+    parser.add_argument('--password', default=None,
+                        help='Password for the URI')
+    parser.add_argument('--port', type=int, default=0,
+                        help='Port of replay server. Default: 5988 for '
+                             'serve, random for bench')
+    parser.add_argument('--latency', type=float, default=0,
+                        help='Injected latency in milliseconds of each '
+                             'replayed reply')
+    bench_common.args_add(parser, rounds=10)
+    args = parser.parse_args()
+
+    if args.action == 'record':
+        if os.path.exists(args.record):
+            os.unlink(args.record)
+        separator = '&' if '?' in args.uri else '?'
+        _run_operations(
+            '%s%srecord_path=%s' % (args.uri, separator, args.record),
+            args.password)
+        return
+
+    replay = _Replay(args.record, args.latency)
+
+    if args.action == 'serve':
+        server = _ReplayServer(args.port or 5988, replay)
+        print("Serving %s on port %d" % (args.record, server.server_port),
+              file=sys.stderr)
+        server.serve_forever()
+        return
+
+    server = _ReplayServer(args.port, replay)
+    server_thread = threading.Thread(target=server.serve_forever)
+    server_thread.daemon = True
+    server_thread.start()
+    try:
+        results = _bench(args.uri, args.password, replay,
+                         server.server_port, args.rounds)
+    finally:
+        server.shutdown()
+
+    meta = {
+        'record': os.path.basename(args.record),
+        'latency': args.latency,
+    }
+    bench_common.report(args, meta, results, counters=['round_trips'])
+
+
+if __name__ == '__main__':
+    main()
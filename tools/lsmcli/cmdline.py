@@ -15,10 +15,12 @@
 # Author: tasleson
 #         Gris Ge <fge@redhat.com>
 
+import copy
 import os
 import sys
 import getpass
-import time
+import shlex
+import traceback
 import tty
 import termios
 from argparse import ArgumentParser
@@ -28,7 +30,7 @@
                  Volume, JobStatus, ErrorNumber, BlockRange,
                  uri_parse, Proxy, size_human_2_size_bytes,
                  AccessGroup, FileSystem, NfsExport, TargetPort, LocalDisk,
-                 Battery)
+                 Battery, System, fleet_inventory)
 
 from lsm.lsmcli.data_display import (
     DisplayData, PlugData, out,
@@ -39,7 +41,21 @@
                              'local-disk-ident-led-on',
                              'local-disk-ident-led-off',
                              'local-disk-fault-led-on',
-                             'local-disk-fault-led-off']
+                             'local-disk-fault-led-off',
+                             'fleet-list']
+
+# List methods of lsm.Client used to look up objects by ID.
+_LIST_METHOD_OF = {
+    System: 'systems',
+    Pool: 'pools',
+    Volume: 'volumes',
+    AccessGroup: 'access_groups',
+    FileSystem: 'fs',
+    NfsExport: 'exports',
+}
+
+_BATCH_PROMPT = 'lsmcli> '
+_BATCH_EXIT_COMMANDS = ['exit', 'quit']
 
 if six.PY3:
     long = int
@@ -52,6 +68,12 @@
     from ordereddict import OrderedDict
 
 
+def _lsm_error_exit_code(lsm_err):
+    if lsm_err.code == ErrorNumber.PERMISSION_DENIED:
+        return 13   # common error code for EACCES
+    return 4
+
+
 # Wraps the invocation to the command line
 # @param    c   Object to invoke calls on (optional)
 def cmd_line_wrapper(c=None):
@@ -71,17 +93,13 @@ def cmd_line_wrapper(c=None):
     except LsmError as le:
         sys.stderr.write(str(le) + "\n")
         sys.stderr.flush()
-        if le.code == ErrorNumber.PERMISSION_DENIED:
-            err_exit = 13   # common error code for EACCES
-        else:
-            err_exit = 4
+        err_exit = _lsm_error_exit_code(le)
     except KeyboardInterrupt:
         err_exit = 1
     except SystemExit as se:
         # argparse raises a SystemExit
         err_exit = se.code
     except:
-        import traceback
         traceback.print_exc(file=sys.stdout)
         # We get *any* other exception don't return a successful error code
         err_exit = 2
@@ -132,6 +150,10 @@ def _upper(s):
     return s.upper()
 
 
+def _lower(s):
+    return s.lower()
+
+
 def _add_common_options(arg_parser, is_child=False):
     """
     As https://bugs.python.org/issue23058 indicate, argument parser should
@@ -200,7 +222,11 @@ def _add_common_options(arg_parser, is_child=False):
         arg_parser.set_defaults(**default_dict)
 
 
+# The objects could be shared with the client list cache and sent to the
+# plugin again by later commands of batch, hence the disk paths are only
+# added to copies.
 def _add_sd_paths(lsm_obj):
+    lsm_obj = copy.copy(lsm_obj)
     lsm_obj.sd_paths = []
     try:
         if len(lsm_obj.vpd83) > 0:
@@ -211,6 +237,34 @@ def _add_sd_paths(lsm_obj):
     return lsm_obj
 
 
+def _vpd83_of(lsm_obj):
+    try:
+        return lsm_obj.vpd83
+    except LsmError as lsm_err:
+        if lsm_err.code != ErrorNumber.NO_SUPPORT:
+            raise
+    return ''
+
+
+def _add_sd_paths_list(lsm_objs):
+    """
+    Same as _add_sd_paths() but resolving all the objects in single
+    LocalDisk.vpd83_search_many() call.
+    """
+    lsm_objs = list(copy.copy(o) for o in lsm_objs)
+    vpd83s = list(_vpd83_of(o) for o in lsm_objs)
+    sd_paths_dict = {}
+    try:
+        sd_paths_dict = LocalDisk.vpd83_search_many(
+            list(set(vpd83 for vpd83 in vpd83s if len(vpd83) > 0)))
+    except LsmError as lsm_err:
+        if lsm_err.code != ErrorNumber.NO_SUPPORT:
+            raise
+    for lsm_obj, vpd83 in zip(lsm_objs, vpd83s):
+        lsm_obj.sd_paths = sd_paths_dict.get(vpd83, [])
+    return lsm_objs
+
+
 # This class represents a command line argument error
 class ArgError(Exception):
     def __init__(self, message, *args, **kwargs):
@@ -303,6 +357,20 @@ def _get_item(l, the_id, friendly_name='item', raise_error=True):
 local_disk_path_opt = dict(name='--path', help="Local disk path",
                            metavar='<DISK_PATH>')
 
+# fleet-list types and their lsm.Client methods.
+fleet_list_methods = OrderedDict([
+    ('SYSTEMS', 'systems'),
+    ('POOLS', 'pools'),
+    ('VOLUMES', 'volumes'),
+    ('DISKS', 'disks'),
+    ('ACCESS_GROUPS', 'access_groups'),
+    ('FS', 'fs'),
+    ('EXPORTS', 'exports'),
+    ('TARGET_PORTS', 'target_ports'),
+    ('BATTERIES', 'batteries'),
+])
+fleet_list_default = ['SYSTEMS', 'POOLS', 'VOLUMES', 'DISKS']
+
 cmds = (
     dict(
         name='list',
@@ -325,6 +393,19 @@ def _get_item(l, the_id, friendly_name='item', raise_error=True):
             dict(fs_id_opt),
             dict(nfs_export_id_filter_opt),
             dict(tgt_id_opt),
+            dict(name='--stream', action='store_true', default=False,
+                 help='Display each record as soon as it is retrieved '
+                      'instead of aligning the columns of all records'),
+            dict(name='--format', metavar='<FORMAT>',
+                 choices=DisplayData.EXPORT_FORMATS, type=_lower,
+                 help='Display one record per line in machine readable '
+                      'format:\n    ' +
+                      '\n    '.join(DisplayData.EXPORT_FORMATS) +
+                      '\njsonl always holds raw values. Could not be used '
+                      'with -s, -t or --header'),
+            dict(name='--columns', metavar='<COLUMN,...>',
+                 help='Comma separated property names to display with '
+                      '--format, like: id,name'),
         ],
     ),
 
@@ -874,6 +955,55 @@ def _get_item(l, the_id, friendly_name='item', raise_error=True):
             dict(local_disk_path_opt),
         ],
     ),
+    dict(
+        name='batch',
+        help='Run commands through a single connection, one per line',
+        optional=[
+            dict(name='--file', metavar='<FILE>', default='-',
+                 help='File holding one command per line without "lsmcli",'
+                      '\nlike: volume-delete --vol <VOL_ID> -f\n'
+                      'Empty lines and lines starting with "#" are ignored.'
+                      '\nDefault is standard input, which is read as an '
+                      'interactive\nshell when it is a terminal.'),
+            dict(name='--stop-on-error', action='store_true', default=False,
+                 help='Stop at the first failed command'),
+        ],
+    ),
+    dict(
+        name='fleet-list',
+        help='List records of many storage systems concurrently',
+        args=[
+            dict(name='--uri-file', metavar='<FILE>',
+                 help='File holding one URI per line, "-" for standard '
+                      'input.\nEmpty lines and lines starting with "#" are '
+                      'ignored.\nThe password of LSMCLI_PASSWORD or -P is '
+                      'used for all URIs.'),
+        ],
+        optional=[
+            dict(name='--type', metavar='<TYPE>', action='append',
+                 choices=list(fleet_list_methods.keys()), type=_upper,
+                 help='List records of type, repeatable:\n    ' +
+                      '\n    '.join(fleet_list_methods.keys()) +
+                      '\nDefault: ' + ', '.join(fleet_list_default)),
+            dict(name='--concurrency', metavar='<COUNT>', type=int,
+                 default=16,
+                 help='Maximum count of storage systems queried at the '
+                      'same time, default 16'),
+            dict(name='--array-timeout', metavar='<MS>', type=int,
+                 help='Time limit in milliseconds for all queries of a '
+                      'single storage system'),
+            dict(name='--format', metavar='<FORMAT>',
+                 choices=DisplayData.EXPORT_FORMATS, type=_lower,
+                 default=DisplayData.EXPORT_FORMAT_JSONL,
+                 help='Display one record per line in machine readable '
+                      'format, prefixed by the uri and the type:\n    ' +
+                      '\n    '.join(DisplayData.EXPORT_FORMATS) +
+                      '\nDefault: ' + DisplayData.EXPORT_FORMAT_JSONL),
+            dict(name='--columns', metavar='<COLUMN,...>',
+                 help='Comma separated property names to display, '
+                      'like: id,name'),
+        ],
+    ),
 )
 
 aliases = dict(
@@ -954,8 +1084,9 @@ def confirm_prompt(self, deleting):
     # @param    objects    Data, first row is header all other data.
     def display_data(self, objects):
         display_all = False
+        flag_stream = getattr(self.args, 'stream', False)
 
-        if len(objects) == 0:
+        if not flag_stream and len(objects) == 0:
             return
 
         display_way = DisplayData.DISPLAY_WAY_DEFAULT
@@ -969,12 +1100,89 @@ def display_data(self, objects):
         if self.args.script:
             display_way = DisplayData.DISPLAY_WAY_SCRIPT
 
-        DisplayData.display_data(
+        columns = self._export_columns()
+        if getattr(self.args, 'format', None):
+            return DisplayData.display_data_export(
+                objects, self.args.format, columns,
+                flag_human=self.args.human, flag_enum=self.args.enum)
+
+        if flag_stream:
+            display_func = DisplayData.display_data_stream
+        else:
+            display_func = DisplayData.display_data
+
+        display_func(
             objects, display_way=display_way, flag_human=self.args.human,
             flag_enum=self.args.enum,
             splitter=self.args.sep, flag_with_header=flag_with_header,
             flag_dsp_all_data=display_all)
 
+    def _export_format_check(self):
+        """
+        Raise ArgError on display options not applicable to --format.
+        """
+        export_format = getattr(self.args, 'format', None)
+        if not export_format:
+            return
+        if self.args.script or self.args.sep or self.args.header:
+            raise ArgError("--format could not be used with -s, --script, "
+                           "-t, --terse or --header")
+        if export_format == DisplayData.EXPORT_FORMAT_JSONL and \
+           self.args.human:
+            raise ArgError("--format jsonl always displays sizes in bytes, "
+                           "could not be used with -H, --human")
+
+    def _export_columns(self):
+        if getattr(self.args, 'columns', None) is None:
+            return None
+        if not getattr(self.args, 'format', None):
+            raise ArgError("--columns requires --format")
+        return list(c.strip() for c in self.args.columns.split(',')
+                    if len(c.strip()) > 0)
+
+    def _list(self, method, lsm_class, search_key=None, search_value=None):
+        """
+        Invoke the list method, when streaming, retrieve the objects in
+        chunks if supported.
+        """
+        if getattr(self.args, 'stream', False):
+            # Client.items_iter() falls back to the list method by itself.
+            return self.c.items_iter(lsm_class, search_key, search_value)
+        if search_key is None:
+            return getattr(self.c, method)()
+        return getattr(self.c, method)(search_key, search_value)
+
+    def _sd_paths_add(self, lsm_objs):
+        """
+        Use bulk query unless streaming where objects are handled one
+        by one. Skip the lookup if disk paths are not displayed.
+        """
+        columns = self._export_columns()
+        if columns is not None and 'sd_paths' not in columns:
+            return lsm_objs
+        if getattr(self.args, 'stream', False):
+            return (_add_sd_paths(lsm_obj) for lsm_obj in lsm_objs)
+        return _add_sd_paths_list(lsm_objs)
+
+    def _item_get(self, lsm_class, the_id, friendly_name='item',
+                  raise_error=True):
+        """
+        Look up the object in the ID index of the client list cache, which
+        is kept across the commands of a batch session.
+        """
+        try:
+            lsm_obj = self.c.item_get(lsm_class, the_id)
+        except LsmError as lsm_err:
+            if lsm_err.code != ErrorNumber.NO_SUPPORT:
+                raise
+            # Plug-in invoked directly, no list cache.
+            return _get_item(getattr(self.c, _LIST_METHOD_OF[lsm_class])(),
+                             the_id, friendly_name, raise_error)
+        if lsm_obj is None and raise_error:
+            raise ArgError('%s with ID %s not found!' %
+                           (friendly_name, the_id))
+        return lsm_obj
+
     def display_available_plugins(self):
         d = []
         sep = '<}{>'
@@ -987,16 +1195,19 @@ def display_available_plugins(self):
         self.display_data(d)
 
     @staticmethod
-    def handle_alias():
+    def handle_alias(argv=None):
         """
         Walk the command line argument list and build up a new command line
         with the appropriate substitutions which is then passed to argparse, so
         that we can avoid adding more sub parsers and do all argument parsing
         before the need to talk to the library
+        :param argv: arguments to expand, sys.argv[1:] if None
         :return copy of command line args with alias expansion:
         """
+        if argv is None:
+            argv = sys.argv[1:]
         rc = []
-        for i in sys.argv[1:]:
+        for i in argv:
             if i in aliases:
                 rc.extend(aliases[i].split(" "))
             else:
@@ -1059,7 +1270,10 @@ def cli(self):
 
         self.parser = parser
 
-        known_args = parser.parse_args(args=CmdLine.handle_alias())
+        return self._args_parse(CmdLine.handle_alias())
+
+    def _args_parse(self, argv):
+        known_args = self.parser.parse_args(args=argv)
         # Copy child value to root.
 
         for k, v in vars(known_args).items():
@@ -1085,6 +1299,7 @@ def display_nfs_client_authentication(self):
     # Method that calls the appropriate method based on what the list type is
     # @param    args    Argparse argument object
     def list(self, args):
+        self._export_format_check()
         search_key = None
         search_value = None
         if args.sys:
@@ -1117,8 +1332,8 @@ def list(self, args):
             if search_key == 'volume_id':
                 search_key = 'id'
             if search_key == 'access_group_id':
-                lsm_ag = _get_item(self.c.access_groups(), args.ag,
-                                   "Access Group", raise_error=False)
+                lsm_ag = self._item_get(AccessGroup, args.ag, "Access Group",
+                                        raise_error=False)
                 if lsm_ag:
                     lsm_vols = self.c.volumes_accessible_by_access_group(
                         lsm_ag)
@@ -1126,9 +1341,10 @@ def list(self, args):
                 raise ArgError("Search key '%s' is not supported by "
                                "volume listing." % search_key)
             else:
-                lsm_vols = self.c.volumes(search_key, search_value)
+                lsm_vols = self._list('volumes', Volume, search_key,
+                                      search_value)
 
-            self.display_data(list(_add_sd_paths(v) for v in lsm_vols))
+            self.display_data(self._sd_paths_add(lsm_vols))
 
         elif args.type == 'POOLS':
             if search_key == 'pool_id':
@@ -1137,7 +1353,7 @@ def list(self, args):
                 raise ArgError("Search key '%s' is not supported by "
                                "pool listing." % search_key)
             self.display_data(
-                self.c.pools(search_key, search_value))
+                self._list('pools', Pool, search_key, search_value))
         elif args.type == 'FS':
             if search_key == 'fs_id':
                 search_key = 'id'
@@ -1145,11 +1361,12 @@ def list(self, args):
                search_key not in FileSystem.SUPPORTED_SEARCH_KEYS:
                 raise ArgError("Search key '%s' is not supported by "
                                "volume listing." % search_key)
-            self.display_data(self.c.fs(search_key, search_value))
+            self.display_data(
+                self._list('fs', FileSystem, search_key, search_value))
         elif args.type == 'SNAPSHOTS':
             if args.fs is None:
                 raise ArgError("--fs <file system id> required")
-            fs = _get_item(self.c.fs(), args.fs, 'File System')
+            fs = self._item_get(FileSystem, args.fs, 'File System')
             self.display_data(self.c.fs_snapshots(fs))
         elif args.type == 'EXPORTS':
             if search_key == 'nfs_export_id':
@@ -1158,15 +1375,16 @@ def list(self, args):
                search_key not in NfsExport.SUPPORTED_SEARCH_KEYS:
                 raise ArgError("Search key '%s' is not supported by "
                                "NFS Export listing" % search_key)
-            self.display_data(self.c.exports(search_key, search_value))
+            self.display_data(
+                self._list('exports', NfsExport, search_key, search_value))
         elif args.type == 'NFS_CLIENT_AUTH':
             self.display_nfs_client_authentication()
         elif args.type == 'ACCESS_GROUPS':
             if search_key == 'access_group_id':
                 search_key = 'id'
             if search_key == 'volume_id':
-                lsm_vol = _get_item(self.c.volumes(), args.vol,
-                                    "Volume", raise_error=False)
+                lsm_vol = self._item_get(Volume, args.vol, "Volume",
+                                         raise_error=False)
                 if lsm_vol:
                     return self.display_data(
                         self.c.access_groups_granted_to_volume(lsm_vol))
@@ -1177,11 +1395,12 @@ def list(self, args):
                 raise ArgError("Search key '%s' is not supported by "
                                "Access Group listing" % search_key)
             self.display_data(
-                self.c.access_groups(search_key, search_value))
+                self._list('access_groups', AccessGroup, search_key,
+                           search_value))
         elif args.type == 'SYSTEMS':
             if search_key:
                 raise ArgError("System listing with search is not supported")
-            self.display_data(self.c.systems())
+            self.display_data(self._list('systems', System))
         elif args.type == 'DISKS':
             if search_key == 'disk_id':
                 search_key = 'id'
@@ -1189,8 +1408,8 @@ def list(self, args):
                 raise ArgError("Search key '%s' is not supported by "
                                "disk listing" % search_key)
             self.display_data(
-                list(_add_sd_paths(d)
-                     for d in self.c.disks(search_key, search_value)))
+                self._sd_paths_add(self._list('disks', Disk, search_key,
+                                              search_value)))
         elif args.type == 'TARGET_PORTS':
             if search_key == 'tgt_port_id':
                 search_key = 'id'
@@ -1199,7 +1418,8 @@ def list(self, args):
                 raise ArgError("Search key '%s' is not supported by "
                                "target port listing" % search_key)
             self.display_data(
-                self.c.target_ports(search_key, search_value))
+                self._list('target_ports', TargetPort, search_key,
+                           search_value))
         elif args.type == 'PLUGINS':
             self.display_available_plugins()
         elif args.type == 'BATTERIES':
@@ -1208,20 +1428,151 @@ def list(self, args):
                 raise ArgError("Search key '%s' is not supported by "
                                "battery listing" % search_key)
             self.display_data(
-                self.c.batteries(search_key, search_value))
+                self._list('batteries', Battery, search_key, search_value))
         else:
             raise ArgError("unsupported listing type=%s" % args.type)
 
+    def fleet_list(self, args):
+        self._export_format_check()
+        if args.uri_file == '-':
+            lines = sys.stdin.readlines()
+        else:
+            with open(args.uri_file) as uri_file:
+                lines = uri_file.readlines()
+        uris = list(l.strip() for l in lines
+                    if l.strip() and not l.strip().startswith('#'))
+        if len(uris) == 0:
+            raise ArgError("No URI found in %s" % args.uri_file)
+        if args.concurrency < 1:
+            raise ArgError("--concurrency requires a positive integer")
+        # Records of different types have different columns, which could
+        # not share the single header of a CSV stream.
+        if args.format == DisplayData.EXPORT_FORMAT_CSV and \
+           (args.type is None or len(set(args.type)) != 1):
+            raise ArgError("--format csv requires exactly one --type")
+
+        password = os.getenv('LSMCLI_PASSWORD')
+        if args.prompt:
+            password = getpass.getpass()
+
+        methods = list(fleet_list_methods[t]
+                       for t in (args.type or fleet_list_default))
+        columns = self._export_columns()
+        failed = False
+        flag_header = True
+        for (uri, method, lsm_objs, lsm_err) in fleet_inventory(
+                uris, password, methods, args.concurrency, self.tmo,
+                args.array_timeout):
+            if lsm_err is not None:
+                failed = True
+                sys.stderr.write("%s: %s: %s\n" % (uri, method, lsm_err))
+                sys.stderr.flush()
+                continue
+            if method in ('volumes', 'disks'):
+                lsm_objs = self._sd_paths_add(lsm_objs)
+            if DisplayData.display_data_export(
+                    lsm_objs, args.format, columns, flag_human=args.human,
+                    flag_enum=args.enum,
+                    tags=OrderedDict([('uri', uri), ('type', method)]),
+                    flag_header=flag_header):
+                flag_header = False
+
+        if failed:
+            # Same exit code as LsmError
+            sys.exit(4)
+
+    def _batch_lines(self, args):
+        if args.file != '-':
+            with open(args.file) as batch_file:
+                for line in batch_file:
+                    yield line
+        elif sys.stdin.isatty():
+            while True:
+                try:
+                    line = six.moves.input(_BATCH_PROMPT)
+                except EOFError:
+                    out("")
+                    return
+                if line.strip() in _BATCH_EXIT_COMMANDS:
+                    return
+                yield line
+        else:
+            for line in sys.stdin:
+                yield line
+
+    def _batch_run(self, line):
+        """
+        Run single command of batch, return its exit code.
+        """
+        try:
+            try:
+                argv = shlex.split(line)
+            except ValueError as ve:
+                raise ArgError("%s: %s" % (ve, line))
+            args = self._args_parse(CmdLine.handle_alias(argv))
+            if args.func == self.batch:
+                raise ArgError("batch command could not be nested")
+            self.args = args
+            args.func(args)
+        except ArgError as ae:
+            sys.stderr.write("lsmcli: error: %s\n" % ae.msg)
+            return 2
+        except LsmError as le:
+            sys.stderr.write(str(le) + "\n")
+            return _lsm_error_exit_code(le)
+        except SystemExit as se:
+            # Raised by argparse(including -h) and commands exiting with
+            # specific code.
+            return se.code or 0
+        except KeyboardInterrupt:
+            raise
+        except Exception:
+            traceback.print_exc(file=sys.stdout)
+            return 2
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+        return 0
+
+    def batch(self, args):
+        """
+        Commands of the batch share the connection and the list cache of
+        the client, so IDs are not resolved by new queries to the plugin for
+        every command.
+        """
+        batch_args = self.args
+        # The connection is closed after the last command, not by the
+        # commands exiting early, like with the -b option.
+        cleanup = self.cleanup
+        self.cleanup = None
+        err_exit = 0
+        try:
+            for line in self._batch_lines(args):
+                line = line.strip()
+                if not line or line.startswith('#'):
+                    continue
+                rc = self._batch_run(line)
+                if rc:
+                    err_exit = rc
+                    if args.stop_on_error:
+                        break
+        finally:
+            self.args = batch_args
+            self.cleanup = cleanup
+
+        if err_exit:
+            self.shutdown(err_exit)
+
     # Creates an access group.
     def access_group_create(self, args):
-        system = _get_item(self.c.systems(), args.sys, "System")
+        system = self._item_get(System, args.sys, "System")
         (init_id, init_type) = parse_convert_init(args.init)
         access_group = self.c.access_group_create(args.name, init_id,
                                                   init_type, system)
         self.display_data([access_group])
 
     def _add_rm_access_grp_init(self, args, op):
-        lsm_ag = _get_item(self.c.access_groups(), args.ag, "Access Group")
+        lsm_ag = self._item_get(AccessGroup, args.ag, "Access Group")
         (init_id, init_type) = parse_convert_init(args.init)
 
         if op:
@@ -1240,10 +1591,9 @@ def access_group_remove(self, args):
         self.display_data([self._add_rm_access_grp_init(args, False)])
 
     def access_group_volumes(self, args):
-        agl = self.c.access_groups()
-        group = _get_item(agl, args.ag, "Access Group")
+        group = self._item_get(AccessGroup, args.ag, "Access Group")
         vols = self.c.volumes_accessible_by_access_group(group)
-        self.display_data(list(_add_sd_paths(v) for v in vols))
+        self.display_data(_add_sd_paths_list(vols))
 
     def iscsi_chap(self, args):
         (init_id, init_type) = parse_convert_init(args.init)
@@ -1256,25 +1606,24 @@ def iscsi_chap(self, args):
                                self.args.out_pass)
 
     def volume_access_group(self, args):
-        vol = _get_item(self.c.volumes(), args.vol, "Volume")
+        vol = self._item_get(Volume, args.vol, "Volume")
         groups = self.c.access_groups_granted_to_volume(vol)
         self.display_data(groups)
 
     # Used to delete access group
     def access_group_delete(self, args):
-        agl = self.c.access_groups()
-        group = _get_item(agl, args.ag, "Access Group")
+        group = self._item_get(AccessGroup, args.ag, "Access Group")
         return self.c.access_group_delete(group)
 
     # Used to delete a file system
     def fs_delete(self, args):
-        fs = _get_item(self.c.fs(), args.fs, "File System")
+        fs = self._item_get(FileSystem, args.fs, "File System")
         if self.confirm_prompt(True):
             self._wait_for_it("fs-delete", self.c.fs_delete(fs), None)
 
     # Used to create a file system
     def fs_create(self, args):
-        p = _get_item(self.c.pools(), args.pool, "Pool")
+        p = self._item_get(Pool, args.pool, "Pool")
         fs = self._wait_for_it("fs-create",
                                *self.c.fs_create(p, args.name,
                                                  self._size(args.size)))
@@ -1282,7 +1631,7 @@ def fs_create(self, args):
 
     # Used to resize a file system
     def fs_resize(self, args):
-        fs = _get_item(self.c.fs(), args.fs, "File System")
+        fs = self._item_get(FileSystem, args.fs, "File System")
         size = self._size(args.size)
 
         if self.confirm_prompt(False):
@@ -1292,8 +1641,7 @@ def fs_resize(self, args):
 
     # Used to clone a file system
     def fs_clone(self, args):
-        src_fs = _get_item(
-            self.c.fs(), args.src_fs, "Source File System")
+        src_fs = self._item_get(FileSystem, args.src_fs, "Source File System")
 
         ss = None
         if args.backing_snapshot:
@@ -1307,7 +1655,7 @@ def fs_clone(self, args):
 
     # Used to clone a file(s)
     def file_clone(self, args):
-        fs = _get_item(self.c.fs(), args.fs, "File System")
+        fs = self._item_get(FileSystem, args.fs, "File System")
         if self.args.backing_snapshot:
             # go get the snapshot
             ss = _get_item(self.c.fs_snapshots(fs),
@@ -1343,7 +1691,7 @@ def _cp(self, cap, val):
         out("%s%s%s" % (cap, s, v))
 
     def capabilities(self, args):
-        s = _get_item(self.c.systems(), args.sys, "System")
+        s = self._item_get(System, args.sys, "System")
 
         cap = self.c.capabilities(s)
         sup_caps = sorted(cap.get_supported().values())
@@ -1375,7 +1723,7 @@ def plugin_info(self, args):
     # Creates a volume
     def volume_create(self, args):
         # Get pool
-        p = _get_item(self.c.pools(), args.pool, "Pool")
+        p = self._item_get(Pool, args.pool, "Pool")
         vol = self._wait_for_it(
             "volume-create",
             *self.c.volume_create(
@@ -1388,7 +1736,7 @@ def volume_create(self, args):
     # Creates a snapshot
     def fs_snap_create(self, args):
         # Get fs
-        fs = _get_item(self.c.fs(), args.fs, "File System")
+        fs = self._item_get(FileSystem, args.fs, "File System")
         ss = self._wait_for_it("snapshot-create",
                                *self.c.fs_snapshot_create(
                                    fs,
@@ -1399,7 +1747,7 @@ def fs_snap_create(self, args):
     # Restores a snap shot
     def fs_snap_restore(self, args):
         # Get snapshot
-        fs = _get_item(self.c.fs(), args.fs, "File System")
+        fs = self._item_get(FileSystem, args.fs, "File System")
         ss = _get_item(self.c.fs_snapshots(fs), args.snap, "Snapshot")
 
         flag_all_files = True
@@ -1420,14 +1768,14 @@ def fs_snap_restore(self, args):
 
     # Deletes a volume
     def volume_delete(self, args):
-        v = _get_item(self.c.volumes(), args.vol, "Volume")
+        v = self._item_get(Volume, args.vol, "Volume")
         if self.confirm_prompt(True):
             self._wait_for_it("volume-delete", self.c.volume_delete(v),
                               None)
 
     # Deletes a snap shot
     def fs_snap_delete(self, args):
-        fs = _get_item(self.c.fs(), args.fs, "File System")
+        fs = self._item_get(FileSystem, args.fs, "File System")
         ss = _get_item(self.c.fs_snapshots(fs), args.snap, "Snapshot")
 
         if self.confirm_prompt(True):
@@ -1450,12 +1798,14 @@ def _wait_for_it(self, msg, job, item):
                 self.shutdown(ErrorNumber.JOB_STARTED)
 
             while True:
-                (s, percent, item) = self.c.job_status(job)
+                # Bounded by the plugin time-out, so the plugin is not
+                # blocked by a long running job.
+                (s, percent, item) = self.c.job_wait([job], self.tmo)[0]
 
                 if s == JobStatus.INPROGRESS:
                     # Add an option to spit out progress?
                     # print "%s - Percent %s complete" % (job, percent)
-                    time.sleep(0.25)
+                    continue
                 elif s == JobStatus.COMPLETE:
                     self.c.job_free(job)
                     return item
@@ -1480,9 +1830,9 @@ def job_status(self, args):
     def volume_replicate(self, args):
         p = None
         if args.pool:
-            p = _get_item(self.c.pools(), args.pool, "Pool")
+            p = self._item_get(Pool, args.pool, "Pool")
 
-        v = _get_item(self.c.volumes(), args.vol, "Volume")
+        v = self._item_get(Volume, args.vol, "Volume")
 
         rep_type = vol_rep_type_str_to_type(args.rep_type)
         if rep_type == Volume.REPLICATE_UNKNOWN:
@@ -1495,9 +1845,8 @@ def volume_replicate(self, args):
 
     # Replicates a range of a volume
     def volume_replicate_range(self, args):
-        src = _get_item(self.c.volumes(), args.src_vol, "Source Volume")
-        dst = _get_item(self.c.volumes(), args.dst_vol,
-                        "Destination Volume")
+        src = self._item_get(Volume, args.src_vol, "Source Volume")
+        dst = self._item_get(Volume, args.dst_vol, "Destination Volume")
 
         rep_type = vol_rep_type_str_to_type(args.rep_type)
         if rep_type == Volume.REPLICATE_UNKNOWN:
@@ -1524,22 +1873,22 @@ def volume_replicate_range(self, args):
     # Returns the block size in bytes for each block represented in
     # volume_replicate_range
     def volume_replicate_range_block_size(self, args):
-        s = _get_item(self.c.systems(), args.sys, "System")
+        s = self._item_get(System, args.sys, "System")
         out(self.c.volume_replicate_range_block_size(s))
 
     def volume_mask(self, args):
-        vol = _get_item(self.c.volumes(), args.vol, 'Volume')
-        ag = _get_item(self.c.access_groups(), args.ag, 'Access Group')
+        vol = self._item_get(Volume, args.vol, 'Volume')
+        ag = self._item_get(AccessGroup, args.ag, 'Access Group')
         self.c.volume_mask(ag, vol)
 
     def volume_unmask(self, args):
-        ag = _get_item(self.c.access_groups(), args.ag, "Access Group")
-        vol = _get_item(self.c.volumes(), args.vol, "Volume")
+        ag = self._item_get(AccessGroup, args.ag, "Access Group")
+        vol = self._item_get(Volume, args.vol, "Volume")
         return self.c.volume_unmask(ag, vol)
 
     # Re-sizes a volume
     def volume_resize(self, args):
-        v = _get_item(self.c.volumes(), args.vol, "Volume")
+        v = self._item_get(Volume, args.vol, "Volume")
         size = self._size(args.size)
 
         if self.confirm_prompt(False):
@@ -1549,22 +1898,22 @@ def volume_resize(self, args):
 
     # Enable a volume
     def volume_enable(self, args):
-        v = _get_item(self.c.volumes(), args.vol, "Volume")
+        v = self._item_get(Volume, args.vol, "Volume")
         self.c.volume_enable(v)
 
     # Disable a volume
     def volume_disable(self, args):
-        v = _get_item(self.c.volumes(), args.vol, "Volume")
+        v = self._item_get(Volume, args.vol, "Volume")
         self.c.volume_disable(v)
 
     # Removes a nfs export
     def fs_unexport(self, args):
-        export = _get_item(self.c.exports(), args.export, "NFS Export")
+        export = self._item_get(NfsExport, args.export, "NFS Export")
         self.c.export_remove(export)
 
     # Exports a file system as a NFS export
     def fs_export(self, args):
-        fs = _get_item(self.c.fs(), args.fs, "File System")
+        fs = self._item_get(FileSystem, args.fs, "File System")
 
         # Check to see if we have some type of access specified
         if len(args.rw_host) == 0 \
@@ -1585,25 +1934,25 @@ def fs_export(self, args):
 
     # Displays volume dependants.
     def volume_dependants(self, args):
-        v = _get_item(self.c.volumes(), args.vol, "Volume")
+        v = self._item_get(Volume, args.vol, "Volume")
         rc = self.c.volume_child_dependency(v)
         out(rc)
 
     # Removes volume dependants.
     def volume_dependants_rm(self, args):
-        v = _get_item(self.c.volumes(), args.vol, "Volume")
+        v = self._item_get(Volume, args.vol, "Volume")
         self._wait_for_it("volume-dependant-rm",
                           self.c.volume_child_dependency_rm(v), None)
 
     def volume_raid_info(self, args):
-        lsm_vol = _get_item(self.c.volumes(), args.vol, "Volume")
+        lsm_vol = self._item_get(Volume, args.vol, "Volume")
         self.display_data(
             [
                 VolumeRAIDInfo(
                     lsm_vol.id, *self.c.volume_raid_info(lsm_vol))])
 
     def pool_member_info(self, args):
-        lsm_pool = _get_item(self.c.pools(), args.pool, "Pool")
+        lsm_pool = self._item_get(Pool, args.pool, "Pool")
         self.display_data(
             [
                 PoolRAIDInfo(
@@ -1639,37 +1988,37 @@ def volume_raid_create(self, args):
                     args.name, raid_type, lsm_disks, strip_size))])
 
     def volume_raid_create_cap(self, args):
-        lsm_sys = _get_item(self.c.systems(), args.sys, "System")
+        lsm_sys = self._item_get(System, args.sys, "System")
         self.display_data([
             VcrCap(lsm_sys.id, *self.c.volume_raid_create_cap_get(lsm_sys))])
 
     def volume_ident_led_on(self, args):
-        lsm_volume = _get_item(self.c.volumes(), args.vol, "Volume")
+        lsm_volume = self._item_get(Volume, args.vol, "Volume")
 
         self.c.volume_ident_led_on(lsm_volume)
 
     def volume_ident_led_off(self, args):
-        lsm_volume = _get_item(self.c.volumes(), args.vol, "Volume")
+        lsm_volume = self._item_get(Volume, args.vol, "Volume")
 
         self.c.volume_ident_led_off(lsm_volume)
 
     def system_read_cache_pct_update(self, args):
-        lsm_system = _get_item(self.c.systems(), args.sys, "System")
+        lsm_system = self._item_get(System, args.sys, "System")
         read_pct = int(args.read_pct)
 
         self.c.system_read_cache_pct_update(lsm_system, read_pct)
-        lsm_system = _get_item(self.c.systems(), args.sys, "System")
+        lsm_system = self._item_get(System, args.sys, "System")
         self.display_data([lsm_system])
 
     # Displays file system dependants
     def fs_dependants(self, args):
-        fs = _get_item(self.c.fs(), args.fs, "File System")
+        fs = self._item_get(FileSystem, args.fs, "File System")
         rc = self.c.fs_child_dependency(fs, args.file)
         out(rc)
 
     # Removes file system dependants
     def fs_dependants_rm(self, args):
-        fs = _get_item(self.c.fs(), args.fs, "File System")
+        fs = self._item_get(FileSystem, args.fs, "File System")
         self._wait_for_it("fs-dependants-rm",
                           self.c.fs_child_dependency_rm(fs,
                                                         args.file),
@@ -1782,6 +2131,10 @@ def process(self, cli=None):
             else:
                 # Going across the ipc pipe
                 self.c = Proxy(Client(self.uri, self.password, self.tmo))
+                # Commands resolve IDs through the ID index of the cached
+                # lists, shared by all commands of a batch. Only mutating
+                # methods of this client could change them.
+                self.c.cache_enable()
 
                 if os.getenv('LSM_DEBUG_PLUGIN'):
                     input("Attach debugger to plug-in, "
@@ -1794,47 +2147,26 @@ def process(self, cli=None):
 
     def local_disk_list(self, args):
         local_disks = []
-        func_dict = {
-            "vpd83": LocalDisk.vpd83_get,
-            "rpm": LocalDisk.rpm_get,
-            "link_type": LocalDisk.link_type_get,
-            "serial_num": LocalDisk.serial_num_get,
-            "led_status": LocalDisk.led_status_get,
-        }
-        for disk_path in LocalDisk.list():
-            info_dict = {
-                "vpd83": "",
-                "rpm": Disk.RPM_NO_SUPPORT,
-                "link_type": Disk.LINK_TYPE_NO_SUPPORT,
-                "serial_num": "",
-                "led_status": Disk.LED_STATUS_UNKNOWN,
-            }
-            for key in info_dict.keys():
-                try:
-                    info_dict[key] = func_dict[key](disk_path)
-                except LsmError as lsm_err:
-                    if lsm_err.code != ErrorNumber.NO_SUPPORT:
-                        raise
-
+        for info in LocalDisk.info_list():
             local_disks.append(
-                LocalDiskInfo(disk_path,
-                              info_dict["vpd83"],
-                              info_dict["rpm"],
-                              info_dict["link_type"],
-                              info_dict["serial_num"],
-                              info_dict["led_status"]))
+                LocalDiskInfo(info["disk_path"],
+                              info["vpd83"],
+                              info["rpm"],
+                              info["link_type"],
+                              info["serial_num"],
+                              info["led_status"]))
 
         self.display_data(local_disks)
 
     def volume_cache_info(self, args):
-        lsm_vol = _get_item(self.c.volumes(), args.vol, "Volume")
+        lsm_vol = self._item_get(Volume, args.vol, "Volume")
         self.display_data(
             [
                 VolumeRAMCacheInfo(
                     lsm_vol.id, *self.c.volume_cache_info(lsm_vol))])
 
     def volume_phy_disk_cache_update(self, args):
-        lsm_vol = _get_item(self.c.volumes(), args.vol, "Volume")
+        lsm_vol = self._item_get(Volume, args.vol, "Volume")
         if args.policy == "ENABLE":
             policy = Volume.READ_CACHE_POLICY_ENABLED
         else:
@@ -1846,7 +2178,7 @@ def volume_phy_disk_cache_update(self, args):
                     lsm_vol.id, *self.c.volume_cache_info(lsm_vol))])
 
     def volume_read_cache_policy_update(self, args):
-        lsm_vol = _get_item(self.c.volumes(), args.vol, "Volume")
+        lsm_vol = self._item_get(Volume, args.vol, "Volume")
         if args.policy == "ENABLE":
             policy = Volume.PHYSICAL_DISK_CACHE_ENABLED
         else:
@@ -1858,7 +2190,7 @@ def volume_read_cache_policy_update(self, args):
                     lsm_vol.id, *self.c.volume_cache_info(lsm_vol))])
 
     def volume_write_cache_policy_update(self, args):
-        lsm_vol = _get_item(self.c.volumes(), args.vol, "Volume")
+        lsm_vol = self._item_get(Volume, args.vol, "Volume")
         if args.policy == 'WB':
             policy = Volume.WRITE_CACHE_POLICY_WRITE_BACK
         elif args.policy == 'AUTO':
@@ -13,6 +13,8 @@
 # License along with this library; If not, see <http://www.gnu.org/licenses/>.
 #
 # Author: Gris Ge <fge@redhat.com>
+import csv
+import json
 import sys
 from datetime import datetime
 
@@ -478,6 +480,17 @@ def r_cache_status_to_str(r_cache_status):
             r_cache_status, VolumeRAMCacheInfo._R_CACHE_STATUS_MAP)
 
 
+class _LineBuffer(object):
+    """
+    File like object holding the last line written by csv.writer.
+    """
+    def __init__(self):
+        self.line = ''
+
+    def write(self, data):
+        self.line = data
+
+
 class DisplayData(object):
 
     def __init__(self):
@@ -490,6 +503,11 @@ def __init__(self):
 
     DEFAULT_SPLITTER = ' | '
 
+    EXPORT_FORMAT_JSONL = 'jsonl'
+    EXPORT_FORMAT_CSV = 'csv'
+
+    EXPORT_FORMATS = [EXPORT_FORMAT_JSONL, EXPORT_FORMAT_CSV]
+
     VALUE_CONVERT = {}
 
     # lsm.System
@@ -978,6 +996,170 @@ def display_data(objs, display_way=None,
                 data_dict_list, splitter, flag_with_header)
         return True
 
+    @staticmethod
+    def display_data_stream(objs, display_way=None,
+                            flag_human=True, flag_enum=False,
+                            extra_properties=None,
+                            splitter=None,
+                            flag_with_header=True,
+                            flag_dsp_all_data=False):
+        """
+        Same as display_data(), but objs could be any iterable and each
+        object is displayed as soon as it is taken out of objs. Memory usage
+        does not grow with the count of objects, hence the columns are not
+        aligned with each other.
+        """
+        if display_way is None:
+            display_way = DisplayData.DISPLAY_WAY_DEFAULT
+
+        if splitter is None:
+            splitter = DisplayData.DEFAULT_SPLITTER
+
+        flag_first_obj = True
+        for obj in objs:
+            if type(obj) not in list(DisplayData.VALUE_CONVERT.keys()):
+                return None
+            data_dict = DisplayData._data_dict_gen(
+                obj, flag_human, flag_enum, display_way,
+                extra_properties, flag_dsp_all_data)
+            if display_way == DisplayData.DISPLAY_WAY_SCRIPT or \
+               flag_dsp_all_data:
+                DisplayData._display_obj_script_way_stream(
+                    data_dict, splitter, flag_first_obj)
+            elif display_way == DisplayData.DISPLAY_WAY_COLUMN:
+                DisplayData._display_obj_column_way_stream(
+                    data_dict, splitter, flag_first_obj and flag_with_header)
+            flag_first_obj = False
+
+        if flag_first_obj:
+            return None
+        return True
+
+    @staticmethod
+    def _display_obj_script_way_stream(data_dict, splitter, flag_first_obj):
+        key_column_width = max(len(k) for k in list(data_dict.keys()))
+        row_format = '%%-%ds%s%%s' % (key_column_width, splitter)
+        sub_row_format = '%s%s%%s' % (' ' * key_column_width, splitter)
+        obj_splitter = '-' * (key_column_width + len(splitter))
+
+        if not flag_first_obj:
+            out(obj_splitter)
+        for key_name in data_dict:
+            value = data_dict[key_name]
+            if isinstance(value, list):
+                flag_first_data = True
+                for sub_value in value:
+                    if flag_first_data:
+                        out(row_format % (key_name, str(sub_value)))
+                        flag_first_data = False
+                    else:
+                        out(sub_row_format % str(sub_value))
+            else:
+                out(row_format % (key_name, str(value)))
+
+    @staticmethod
+    def _display_obj_column_way_stream(data_dict, splitter, flag_header):
+        if flag_header:
+            header = splitter.join(list(data_dict.keys()))
+            out(header)
+            out('-' * len(header))
+
+        values = list(data_dict.values())
+        row_count = 1
+        for value in values:
+            if isinstance(value, list) and len(value) > row_count:
+                row_count = len(value)
+
+        for row_index in range(0, row_count):
+            row = []
+            for value in values:
+                if isinstance(value, list):
+                    if row_index < len(value):
+                        row.append(str(value[row_index]))
+                    else:
+                        row.append('')
+                elif row_index == 0:
+                    row.append(str(value))
+                else:
+                    row.append('')
+            out(splitter.join(row))
+
+    @staticmethod
+    def _export_keys(obj_type, columns):
+        headers = DisplayData.VALUE_CONVERT[obj_type]['headers']
+        if not columns:
+            return list(headers.keys())
+        for key in columns:
+            if key not in headers:
+                raise LsmError(
+                    ErrorNumber.INVALID_ARGUMENT,
+                    "Invalid column '%s', supported columns are: %s" %
+                    (key, ", ".join(list(headers.keys()))))
+        return list(columns)
+
+    @staticmethod
+    def display_data_export(objs, export_format, columns=None,
+                            flag_human=False, flag_enum=False, tags=None,
+                            flag_header=True):
+        """
+        Display each object of objs(any iterable) as a line of export_format,
+        one of DisplayData.EXPORT_FORMATS, using property names as keys.
+        If columns(list of property names) is defined, only these properties
+        are retrieved and converted. Raise LsmError with
+        ErrorNumber.INVALID_ARGUMENT on unknown property name.
+        If tags(OrderedDict) is defined, its keys and values are displayed
+        before the properties on every line.
+        The CSV header line is skipped if flag_header is False, for callers
+        continuing the stream of a previous call.
+        JSONL always holds the raw values: numbers for enumerated types and
+        sizes in bytes, flag_human and flag_enum are ignored.
+        """
+        if export_format not in DisplayData.EXPORT_FORMATS:
+            raise LsmError(ErrorNumber.INVALID_ARGUMENT,
+                           "Invalid export format '%s'" % export_format)
+        if export_format == DisplayData.EXPORT_FORMAT_JSONL:
+            flag_human = False
+            flag_enum = True
+        if tags is None:
+            tags = OrderedDict()
+        keys = None
+        csv_buff = _LineBuffer()
+        csv_writer = csv.writer(csv_buff, lineterminator='')
+
+        for obj in objs:
+            if keys is None:
+                if type(obj) not in list(DisplayData.VALUE_CONVERT.keys()):
+                    return None
+                value_convert = DisplayData.VALUE_CONVERT[type(obj)]
+                value_conv_enum = value_convert['value_conv_enum']
+                value_conv_human = value_convert['value_conv_human']
+                keys = DisplayData._export_keys(type(obj), columns)
+                if export_format == DisplayData.EXPORT_FORMAT_CSV and \
+                   flag_header:
+                    csv_writer.writerow(list(tags.keys()) + keys)
+                    out(csv_buff.line)
+
+            values = list(
+                DisplayData._get_man_pro_value(
+                    obj, key, value_conv_enum, value_conv_human, flag_human,
+                    flag_enum)
+                for key in keys)
+
+            if export_format == DisplayData.EXPORT_FORMAT_JSONL:
+                line = OrderedDict(tags)
+                line.update(zip(keys, values))
+                out(json.dumps(line))
+            else:
+                csv_writer.writerow(list(tags.values()) + list(
+                    BIT_MAP_STRING_SPLITTER.join(str(v) for v in value)
+                    if isinstance(value, list) else value
+                    for value in values))
+                out(csv_buff.line)
+
+        if keys is None:
+            return None
+        return True
+
     @staticmethod
     def display_data_script_way(data_dict_list, splitter):
         key_column_width = 1